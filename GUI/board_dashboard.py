@@ -0,0 +1,199 @@
+from dataclasses import dataclass, field
+from tkinter import Canvas, Toplevel
+
+import ttkbootstrap as ttk
+
+from message_formatter.message_formatter import MessageFormatter
+from message_formatter.sensor_decoder import SENSOR_COUNT, changed_sensors, sensor_state
+
+SENSOR_ON = "blue"
+SENSOR_OFF = "red"
+UNKNOWN = "#cccccc"
+
+
+@dataclass
+class BoardState:
+    mask: int = None
+    values: list = field(default_factory=lambda: [None] * MessageFormatter.LOAD_CELL_COUNT)
+    connected: bool = None
+    version: int = 0
+
+
+class BoardDashboard(Toplevel):
+    """
+    Sensors and load cells of many boards as tiles on one scrollable canvas.
+
+    Board updates only change BoardState, and may come from any thread. At most
+    `max_fps` times per second the window draws the tiles in view. Tile items are tagged
+    "board<index>" and are created when a tile scrolls into view and deleted when it leaves,
+    so the canvas holds items for the visible boards only. A visible tile only reconfigures
+    the items whose value changed since it was last drawn.
+    """
+
+    TILE_WIDTH = 290
+    TILE_HEIGHT = 140
+
+    def __init__(self, master, boards, max_fps=10, on_close=None):
+        super().__init__(master)
+        self.title("보드 대시보드")
+        self.geometry("1200x800")
+        self.boards = list(boards)
+        self.states = {board: BoardState() for board in self.boards}
+        self.tiles = {}  # board index -> item ids and the state they show
+        self.columns = 1
+        self.frame_interval = int(1000 / max_fps)
+        self.dirty = True
+        self.closed = False
+        self.on_close = on_close
+        self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.after(self.frame_interval, self.redraw)
+
+    def create_widgets(self):
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.scroll)
+        scrollbar.pack(side="right", fill="y")
+        self.canvas = Canvas(self, background="white", highlightthickness=0, yscrollcommand=scrollbar.set,
+                             yscrollincrement=self.TILE_HEIGHT // 4)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.layout())
+        self.canvas.bind("<MouseWheel>", lambda event: self.scroll("scroll", -event.delta // 120, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.scroll("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll("scroll", 1, "units"))
+
+    def scroll(self, *args):
+        self.canvas.yview(*args)
+        self.mark_dirty()
+
+    def update_sensor(self, board, mask):
+        state = self.states.get(board)
+        if state is not None and state.mask != mask:
+            state.mask = mask
+            state.version += 1
+            self.dirty = True
+
+    def update_load_cells(self, board, values, first_index=1):
+        state = self.states.get(board)
+        if state is None:
+            return
+        updated = list(state.values)
+        updated[first_index - 1:first_index - 1 + len(values)] = values
+        state.values = updated
+        state.version += 1
+        self.dirty = True
+
+    def set_connected(self, board, connected):
+        state = self.states.get(board)
+        if state is not None and state.connected != connected:
+            state.connected = connected
+            state.version += 1
+            self.dirty = True
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def layout(self):
+        width = self.canvas.winfo_width()
+        self.columns = max(1, width // self.TILE_WIDTH)
+        rows = (len(self.boards) + self.columns - 1) // self.columns
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.TILE_WIDTH, rows * self.TILE_HEIGHT))
+        # Tile positions depend on the column count, so start over
+        self.canvas.delete("tile")
+        self.tiles.clear()
+        self.mark_dirty()
+
+    def visible_boards(self):
+        """
+        :return: range of board indexes whose tiles intersect the visible part of the canvas
+        """
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first_row = max(0, int(top // self.TILE_HEIGHT))
+        last_row = int(bottom // self.TILE_HEIGHT)
+        return range(first_row * self.columns, min(len(self.boards), (last_row + 1) * self.columns))
+
+    def redraw(self):
+        if self.closed:
+            return
+        if self.dirty:
+            self.dirty = False
+            visible = self.visible_boards()
+            for index in [index for index in self.tiles if index not in visible]:
+                self.canvas.delete(f"board{index}")
+                del self.tiles[index]
+            for index in visible:
+                self.draw_tile(index)
+        self.after(self.frame_interval, self.redraw)
+
+    def create_tile(self, index):
+        left = index % self.columns * self.TILE_WIDTH + 4
+        top = index // self.columns * self.TILE_HEIGHT + 4
+        tags = ("tile", f"board{index}")
+        create_text = self.canvas.create_text
+        self.canvas.create_rectangle(left, top, left + self.TILE_WIDTH - 8, top + self.TILE_HEIGHT - 8,
+                                     outline="#bbbbbb", tags=tags)
+        create_text(left + 6, top + 4, anchor="nw", text=self.boards[index], font=("Helvetica", 9, "bold"), tags=tags)
+        tile = {
+            "status": create_text(left + self.TILE_WIDTH - 14, top + 4, anchor="ne", text="", font=("Helvetica", 8),
+                                  tags=tags),
+            "sensors": [],
+            "values": [],
+            "mask": None,
+            "shown_values": [None] * MessageFormatter.LOAD_CELL_COUNT,
+            "connected": None,
+            "version": -1,
+        }
+
+        # Sensors 1-8 and 9-16 in two rows
+        create_text(left + 6, top + 30, anchor="w", text="1", font=("Helvetica", 7), tags=tags)
+        create_text(left + 6, top + 48, anchor="w", text="9", font=("Helvetica", 7), tags=tags)
+        for sensor in range(SENSOR_COUNT):
+            x = left + 24 + sensor % 8 * 18
+            y = top + 30 + sensor // 8 * 18
+            tile["sensors"].append(self.canvas.create_oval(x - 6, y - 6, x + 6, y + 6, fill=UNKNOWN, outline="",
+                                                           tags=tags + ("sensor",)))
+
+        # Load cells in a 4 x 4 grid
+        for cell in range(MessageFormatter.LOAD_CELL_COUNT):
+            x = left + 6 + cell % 4 * 70
+            y = top + 64 + cell // 4 * 16
+            tile["values"].append(create_text(x, y, anchor="nw", text=f"{cell + 1}: -", font=("Helvetica", 8),
+                                              tags=tags + ("load_cell",)))
+        self.tiles[index] = tile
+        return tile
+
+    def draw_tile(self, index):
+        tile = self.tiles.get(index)
+        if tile is None:
+            tile = self.create_tile(index)
+        state = self.states[self.boards[index]]
+        if tile["version"] == state.version:
+            return
+        tile["version"] = state.version
+        itemconfig = self.canvas.itemconfig
+
+        mask = state.mask
+        if mask is not None and mask != tile["mask"]:
+            if tile["mask"] is None:
+                changes = ((sensor, sensor_state(mask, sensor)) for sensor in range(1, SENSOR_COUNT + 1))
+            else:
+                changes = changed_sensors(tile["mask"], mask)
+            for sensor, status in changes:
+                itemconfig(tile["sensors"][sensor - 1], fill=SENSOR_ON if status else SENSOR_OFF)
+            tile["mask"] = mask
+
+        shown = tile["shown_values"]
+        for cell, value in enumerate(state.values):
+            if value is not None and value != shown[cell]:
+                itemconfig(tile["values"][cell], text=f"{cell + 1}: {value:.2f}")
+                shown[cell] = value
+
+        if state.connected is not None and state.connected != tile["connected"]:
+            itemconfig(tile["status"], text="연결" if state.connected else "끊김",
+                       fill="green" if state.connected else "red")
+            tile["connected"] = state.connected
+
+    def close(self):
+        self.closed = True
+        if self.on_close is not None:
+            self.on_close()
+        self.destroy()
@@ -1,16 +1,40 @@
-import struct
+import asyncio
+import os
 import sys
 import threading
 import queue
 import time
-from tkinter import Canvas, Label, messagebox
+from concurrent.futures import Future
+from functools import partial
+from tkinter import Canvas, Label, TclError, filedialog, messagebox
 
 import ttkbootstrap as ttk
 
+from GUI.board_dashboard import BoardDashboard
+from GUI.log_console import LogConsole
+from GUI.telemetry_panel import TelemetryPanel
+from GUI.trend_plot import LoadCellTrendWindow, MinMaxHistory
 from Log.gui_log_sink import StdoutRedirector
-from Log.logger_config import setup_logger, logger
+from Log.logger_config import LOG_DIRECTORY, setup_logger, setup_file_logging, flush_logs, logger
+from certification.board_result import BoardResult, StepResult
+from certification.load_cell_stats import AcquisitionSettings, LoadCellAcquisition, verdict_step
+from certification.loopback import LoopbackTest, default_channels, run_loopback
+from certification.results_store import ResultsStore
+from connection.backoff import ExponentialBackoff
+from connection.board_discovery import discover, parse_targets
+from connection.board_monitor import BoardMonitor
+from connection.command_dispatcher import CommandDispatcher
+from connection.poll_scheduler import PollScheduler
 from connection.tcp_client import TcpClient
+from connection.wire_capture import CaptureReader, ReplayDecoder, WireCapture, capture_path, replay
 from message_formatter.message_formatter import MessageFormatter
+from message_formatter.protocol_schema import COMMAND_NAMES, LOAD_CELL_COMMAND, SENSOR_COMMAND
+from message_formatter.sensor_decoder import changed_sensors, response_sensor_mask
+from recorder.exporter import export_history
+from recorder.stream_recorder import StreamRecorder, wall_clock
+
+REPLAY_SPEEDS = ("1x", "10x", "100x", "최대")
+REPLAY_QUEUE_LIMIT = 5000
 
 
 class SensorStatusDisplay(ttk.Frame):
@@ -18,9 +42,11 @@ class SensorStatusDisplay(ttk.Frame):
         super().__init__(master)
         self.sensors = {f"센서 {i + 1}": 0 for i in range(num_sensors)}
         self.sensors = {}
+        self.sensor_mask = 0
         self.font = ("Helvetica", 10)
+        self.polling_rate_var = ttk.DoubleVar(value=10.0)  # Hz
         self.create_sensor_displays()
-        self.polling_interval = 2000  # milliseconds
+        self.create_polling_controls()
 
     def create_sensor_displays(self):
         for i in range(4):
@@ -42,11 +68,45 @@ class SensorStatusDisplay(ttk.Frame):
 
             self.sensors[f"센서 {i + 1}"] = (label, canvas, circle)
 
+    def create_polling_controls(self):
+        frame = ttk.Frame(self)
+        frame.grid(row=4, column=0, columnspan=4, pady=(0, 5))
+
+        rate_label = ttk.Label(frame, text="폴링 주기 (Hz):", font=self.font)
+        rate_label.pack(side=ttk.LEFT, padx=(0, 2))
+
+        rate_spinbox = ttk.Spinbox(frame, from_=1, to=PollScheduler.MAX_RATE, increment=10, width=6,
+                                   textvariable=self.polling_rate_var)
+        rate_spinbox.pack(side=ttk.LEFT)
+
+        self.polling_stats_label = ttk.Label(frame, text="", font=self.font)
+        self.polling_stats_label.pack(side=ttk.LEFT, padx=(10, 0))
+
+    def get_polling_rate(self):
+        try:
+            return float(self.polling_rate_var.get())
+        except (ValueError, TclError):
+            return None
+
+    def update_polling_stats(self, stats):
+        self.polling_stats_label.config(
+            text=f"실제 {stats['achieved_hz']:.1f} Hz | 지터 {stats['jitter_ms']:.2f} ms | "
+                 f"최대 지연 {stats['max_late_ms']:.1f} ms | 누락 {stats['missed']}")
+
     def update_ui(self, sensor_name, status):
         label, canvas, circle_id = self.sensors[sensor_name]
         color = "blue" if status == 1 else "red"
         canvas.itemconfig(circle_id, fill=color)
 
+    def update_sensor_mask(self, mask):
+        """
+        Redraw only the sensors whose state flipped since the last mask
+        :param mask: 16-bit sensor mask, bit (n - 1) for sensor n
+        """
+        for sensor_number, status in changed_sensors(self.sensor_mask, mask):
+            self.update_ui(f"센서 {sensor_number}", status)
+        self.sensor_mask = mask
+
 
 class LoadCellDisplay(ttk.Frame):
     def __init__(self, master, app, num_load_cells=16):
@@ -55,7 +115,11 @@ class LoadCellDisplay(ttk.Frame):
         self.app = app  # FirmwareTesterApp
         self.load_cell_labels = {}
         self.font = ("Helvetica", 11)
+        self.continuous_var = ttk.BooleanVar(value=False)
+        self.sweep_rate_var = ttk.DoubleVar(value=2.0)  # sweeps per second
+        self.sample_count_var = ttk.IntVar(value=50)  # most samples per cell for a measurement
         self.create_load_cell_displays()
+        self.create_sweep_controls()
 
     def create_load_cell_displays(self):
         for i in range(8):
@@ -82,43 +146,106 @@ class LoadCellDisplay(ttk.Frame):
 
             self.load_cell_labels[load_cell_name] = value_label
 
+    def create_sweep_controls(self):
+        frame = ttk.Frame(self)
+        frame.grid(row=2, column=0, columnspan=8, pady=(0, 5))
+
+        read_all_button = ttk.Button(frame, text="전체 읽기", command=self.app.read_all_load_cells,
+                                     style='primary.TButton')
+        read_all_button.pack(side=ttk.LEFT, padx=5)
+
+        continuous_check = ttk.Checkbutton(frame, text="연속 읽기", variable=self.continuous_var,
+                                           command=self.app.toggle_load_cell_sweep)
+        continuous_check.pack(side=ttk.LEFT, padx=5)
+
+        rate_label = ttk.Label(frame, text="주기 (Hz):")
+        rate_label.pack(side=ttk.LEFT, padx=(10, 2))
+
+        rate_spinbox = ttk.Spinbox(frame, from_=0.1, to=50, increment=0.5, width=6, textvariable=self.sweep_rate_var)
+        rate_spinbox.pack(side=ttk.LEFT)
+
+        trend_button = ttk.Button(frame, text="추세 보기", command=self.app.open_load_cell_trends,
+                                  style='primary.TButton')
+        trend_button.pack(side=ttk.LEFT, padx=(10, 5))
+
+        samples_label = ttk.Label(frame, text="측정 횟수:")
+        samples_label.pack(side=ttk.LEFT, padx=(10, 2))
+
+        samples_spinbox = ttk.Spinbox(frame, from_=5, to=1000, increment=5, width=6,
+                                      textvariable=self.sample_count_var)
+        samples_spinbox.pack(side=ttk.LEFT)
+
+        self.measure_button = ttk.Button(frame, text="통계 측정", command=self.app.measure_load_cells,
+                                         style='primary.TButton')
+        self.measure_button.pack(side=ttk.LEFT, padx=5)
+
+    def get_sample_count(self):
+        try:
+            return max(1, int(self.sample_count_var.get()))
+        except (ValueError, TclError):
+            return 50
+
+    def get_sweep_period(self):
+        try:
+            rate = float(self.sweep_rate_var.get())
+        except (ValueError, TclError):
+            rate = 1.0
+        return 1.0 / max(rate, 0.1)
+
     def update_load_cell_value(self, load_cell_index, value):
         load_cell_name = f"로드셀 {load_cell_index}"
         if load_cell_name in self.load_cell_labels:
             label = self.load_cell_labels[load_cell_name]
             label.config(text=f"{value}")
 
+    def update_load_cell_values(self, values):
+        for index, value in enumerate(values, start=1):
+            self.update_load_cell_value(index, round(value, 2))
 
-class FirmwareTesterApp:
-    _operation = False
-    _operation_lock = threading.Lock()
-
-    @classmethod
-    def get_operation_variable(cls):
-        with cls._operation_lock:
-            return cls._operation
 
-    @classmethod
-    def set_operation_variable(cls, value: bool):
-        with cls._operation_lock:
-            cls._operation = value
-            return True
+class FirmwareTesterApp:
 
     def __init__(self, master):
         self.master = master
         self.master.title("보드 테스트 프로그램")
-        self.tcp_client = TcpClient()
+        self.tcp_client = TcpClient(timeout=2.0)
+        self.dispatcher = CommandDispatcher(self.tcp_client)
         self.message_formatter = MessageFormatter()
         self.sensor_queue = queue.Queue()
         self.load_cell_queue = queue.Queue()
+        self.response_queue = queue.Queue()
+        self.sweep_in_flight = False
+        self.sweep_started = 0.0
+        self.sweep_job = None  # pending after() of the continuous sweep
+        self.poll_scheduler = PollScheduler()
+        self.poll_error_shown = False
         self.is_connected = False
+        self.ui_queue = queue.Queue()  # callables from worker threads, run on the Tk thread
+        self.connect_requested = threading.Event()
+        self.stop_event = threading.Event()
+        self.backoff = ExponentialBackoff()
         self.log_queue = queue.Queue()
         self.logger = self.setup_logging()
+        self.recorder = StreamRecorder(self.session_id, self.tcp_client.name)
+        self.results_store = ResultsStore()
+        self.results_store.start_session(self.session_id, "gui")
+        self.load_cell_histories = [MinMaxHistory() for _ in range(MessageFormatter.LOAD_CELL_COUNT)]
+        self.trend_window = None
+        self.dashboard = None
+        self.board_monitor = None
+        self.capture = None
+        self.replaying = False  # live polling pauses and replayed values are not stored
+        self.replay_stop = threading.Event()
         self.font = ("Helvetica", 10)
 
         self.create_styles()
         self.create_widgets()
         self.poll_queues()
+        self.update_polling()
+        self.update_telemetry()
+        self.tcp_client.metrics.start_export(os.path.join(LOG_DIRECTORY, "metrics.prom"),
+                                             labels=lambda: {"board": self.tcp_client.name})
+        self.dispatcher.start()
         self.tcp_thread = threading.Thread(target=self.tcp_worker, daemon=True)
         self.tcp_thread.start()
 
@@ -139,19 +266,20 @@ class FirmwareTesterApp:
         connection_frame.place(relx=margin, rely=0.03, relwidth=1 - 2 * margin, relheight=0.2, anchor='nw')
         self.create_connection_widgets(connection_frame)
 
+        # Transport telemetry, right of the log
+        telemetry_frame = ttk.Frame(connection_frame, padding="10", relief="solid", borderwidth=2)
+        telemetry_frame.pack(side='right', fill='y', pady=(10, 0), padx=(10, 0))
+        self.telemetry_panel = TelemetryPanel(telemetry_frame, font=self.font)
+        self.telemetry_panel.pack(fill='both', expand=True)
+
         # Log Frame within Connection Frame
         log_frame = ttk.Frame(connection_frame, padding="10", relief="solid", borderwidth=2)
         log_frame.pack(fill='both', expand=True, pady=(10, 0))
 
         # Log Text with Scrollbar
-        log_text = ttk.Text(log_frame, wrap=ttk.WORD, state='disabled', font=self.font)
-        log_text.pack(side="left", fill="both", expand=True)
-
-        log_scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=log_text.yview)
-        log_scrollbar.pack(side="right", fill="y")
-        log_text.configure(yscrollcommand=log_scrollbar.set)
-
-        self.log_text = log_text
+        self.log_console = LogConsole(log_frame, self.log_queue, font=self.font)
+        self.log_console.pack(fill="both", expand=True)
+        self.log_text = self.log_console.text
 
         # Sensor Display Frame
         sensor_frame = ttk.Frame(main_frame, padding="10", relief="solid", borderwidth=2)
@@ -196,11 +324,59 @@ class FirmwareTesterApp:
         self.load_cell_display.pack(fill='both', expand=True)
 
     def create_connection_widgets(self, frame):
-        self.connect_button = ttk.Button(frame, text="연결 시도", command=self.connect, style='primary.TButton')
-        self.connect_button.pack(pady=(10, 5))
+        inner_frame = ttk.Frame(frame)
+        inner_frame.pack(pady=(10, 5))
+
+        board_label = ttk.Label(inner_frame, text="보드:")
+        board_label.pack(side=ttk.LEFT, padx=(0, 2))
+
+        self.board_var = ttk.StringVar(value=f"{self.tcp_client.host}:{self.tcp_client.port}")
+        self.board_combobox = ttk.Combobox(inner_frame, textvariable=self.board_var, width=20)
+        self.board_combobox.pack(side=ttk.LEFT, padx=(0, 5))
+
+        self.connect_button = ttk.Button(inner_frame, text="연결 시도", command=self.connect, style='primary.TButton')
+        self.connect_button.pack(side=ttk.LEFT, padx=5)
+
+        subnet_label = ttk.Label(inner_frame, text="검색 범위:")
+        subnet_label.pack(side=ttk.LEFT, padx=(20, 2))
+
+        self.subnet_var = ttk.StringVar(value=f"{self.tcp_client.host.rsplit('.', 1)[0]}.0/24")
+        subnet_entry = ttk.Entry(inner_frame, textvariable=self.subnet_var, width=18)
+        subnet_entry.pack(side=ttk.LEFT, padx=(0, 5))
+
+        self.discover_button = ttk.Button(inner_frame, text="보드 검색", command=self.discover_boards,
+                                          style='primary.TButton')
+        self.discover_button.pack(side=ttk.LEFT, padx=5)
+
+        tools_frame = ttk.Frame(frame)
+        tools_frame.pack(pady=(0, 5))
+
+        self.export_button = ttk.Button(tools_frame, text="기록 내보내기", command=self.export_history,
+                                        style='primary.TButton')
+        self.export_button.pack(side=ttk.LEFT, padx=5)
+
+        self.capture_var = ttk.BooleanVar(value=False)
+        capture_check = ttk.Checkbutton(tools_frame, text="통신 캡처", variable=self.capture_var,
+                                        command=self.toggle_capture)
+        capture_check.pack(side=ttk.LEFT, padx=(20, 5))
+
+        self.replay_button = ttk.Button(tools_frame, text="캡처 재생", command=self.toggle_replay,
+                                        style='primary.TButton')
+        self.replay_button.pack(side=ttk.LEFT, padx=5)
+
+        self.replay_speed_var = ttk.StringVar(value=REPLAY_SPEEDS[0])
+        replay_speed_menu = ttk.Combobox(tools_frame, textvariable=self.replay_speed_var, values=REPLAY_SPEEDS,
+                                         width=6, state="readonly")
+        replay_speed_menu.pack(side=ttk.LEFT, padx=(0, 5))
+
+        self.dashboard_button = ttk.Button(tools_frame, text="대시보드", command=self.open_dashboard,
+                                           style='primary.TButton')
+        self.dashboard_button.pack(side=ttk.LEFT, padx=(20, 5))
 
     def setup_logging(self):
         logger = setup_logger(self.log_queue)
+        self.session_id = setup_file_logging()
+        logger.info(f"세션 시작: {self.session_id}")
 
         # Redirect stdout and stderr
         sys.stdout = StdoutRedirector(self.log_queue)
@@ -209,32 +385,358 @@ class FirmwareTesterApp:
         return logger
 
     def log_message(self, message):
-        self.log_text.insert(ttk.END, message + '\n')
-        self.log_text.see(ttk.END)
+        self.log_console.write(message + '\n')
 
     def connect(self):
-        if self.tcp_client.connect():
-            self.is_connected = True
-            self.connect_button.config(text="연결 완료")
-            self.poll_queues()
-        else:
+        # The worker does the actual connect; this only wakes it up
+        host, _, port = self.board_var.get().strip().partition(':')
+        try:
+            port = int(port) if port else self.tcp_client.port
+        except ValueError:
+            logger.error(f"잘못된 보드 주소: {self.board_var.get()}")
+            return
+        if (host, port) != (self.tcp_client.host, self.tcp_client.port):
             self.is_connected = False
-            self.connect_button.config(text="연결 실패")
+            self.dispatcher.submit_call(self.tcp_client.set_address, host, port,
+                                        priority=CommandDispatcher.PRIORITY_CONNECT)
+            previous, self.recorder = self.recorder, StreamRecorder(self.session_id, f"{host}:{port}")
+            previous.close()
+            if self.capture is not None:
+                # One capture file per board
+                self.stop_capture()
+                self.start_capture(f"{host}:{port}")
+        self.connect_button.config(text="연결 중...")
+        self.backoff.reset()
+        self.connect_requested.set()
+
+    def discover_boards(self):
+        subnet = self.subnet_var.get().strip()
+        self.discover_button.config(text="검색 중...", state="disabled")
+        logger.info(f"보드 검색 시작: {subnet}")
+
+        def run():
+            # Expanding a large range takes a while, so it happens here rather than on the Tk thread
+            try:
+                hosts = parse_targets(subnet)
+            except ValueError as e:
+                logger.error(f"잘못된 검색 범위: {e}")
+                self.show_error_message("보드 검색", f"잘못된 검색 범위입니다.\n{e}")
+                self.post_ui(self.discover_button.config, {"text": "보드 검색", "state": "normal"})
+                return
+            try:
+                boards = asyncio.run(discover(hosts, port=self.tcp_client.port))
+            except Exception as e:
+                logger.error(f"보드 검색 에러: {e}")
+                boards = []
+            self.post_ui(self._on_boards_discovered, boards)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_boards_discovered(self, boards):
+        self.discover_button.config(text="보드 검색", state="normal")
+        names = [board.name for board in boards]
+        self.board_combobox.config(values=names)
+        for board in boards:
+            logger.info(f"보드 발견: {board.name} ({board.rtt_ms:.1f} ms)")
+        logger.info(f"보드 검색 완료: {len(boards)}개")
+        if names and self.board_var.get() not in names and not self.is_connected:
+            self.board_var.set(names[0])
+
+    def open_dashboard(self):
+        if self.dashboard is not None and not self.dashboard.closed:
+            self.dashboard.lift()
+            return
+        boards = list(self.board_combobox.cget("values") or ()) or [self.tcp_client.name]
+        if self.tcp_client.name not in boards:
+            boards.insert(0, self.tcp_client.name)
+        addresses = []
+        for board in boards:
+            host, _, port = board.rpartition(':')
+            # The connected board is fed from this window's own polling, not a second connection
+            if board != self.tcp_client.name and host and port.isdigit():
+                addresses.append((host, int(port)))
+
+        self.dashboard = BoardDashboard(self.master, boards, on_close=self._on_dashboard_closed)
+        self.dashboard.set_connected(self.tcp_client.name, self.is_connected)
+        self.board_monitor = BoardMonitor(addresses)
+        self.board_monitor.on_sensor = self.dashboard.update_sensor
+        self.board_monitor.on_load_cells = self.dashboard.update_load_cells
+        self.board_monitor.on_status = self.dashboard.set_connected
+        self.board_monitor.start()
+        logger.info(f"대시보드 시작: 보드 {len(boards)}개")
+
+    def _on_dashboard_closed(self):
+        monitor, self.board_monitor = self.board_monitor, None
+        if monitor is not None:
+            # Joining the monitor thread can take a moment; keep it off the Tk thread
+            threading.Thread(target=monitor.stop, daemon=True).start()
+
+    def export_history(self):
+        path = filedialog.asksaveasfilename(title="기록 내보내기", initialfile=f"session_{self.session_id}",
+                                            filetypes=[("CSV", "*.csv"), ("Columnar", "*.bcc")])
+        if not path:
+            return
+        prefix, extension = os.path.splitext(path)
+        export_format = "columnar" if extension == ".bcc" else "csv"
+        self.recorder.flush()
+        self.export_button.config(state="disabled")
+
+        def progress(done, total):
+            self.post_ui(self.export_button.config, {"text": f"내보내는 중 {done / max(total, 1):.0%}"})
+
+        def run():
+            try:
+                paths = export_history(prefix, export_format, session=self.session_id, progress=progress)
+                logger.info(f"기록 내보내기 완료: {', '.join(paths)}")
+            except Exception as e:
+                logger.error(f"기록 내보내기 에러: {e}")
+            self.post_ui(self.export_button.config, {"text": "기록 내보내기", "state": "normal"})
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def toggle_capture(self):
+        if self.capture_var.get():
+            self.start_capture(self.tcp_client.name)
+        else:
+            self.stop_capture()
+
+    def start_capture(self, board):
+        self.capture = WireCapture(capture_path(self.session_id, board), board)
+        self.tcp_client.capture = self.capture
+        logger.info(f"통신 캡처 시작: {self.capture.path}")
+
+    def stop_capture(self):
+        if self.capture is not None:
+            self.tcp_client.capture = None
+            self.capture.close()
+            logger.info(f"통신 캡처 종료: {self.capture.frames}개 프레임")
+            self.capture = None
+
+    def toggle_replay(self):
+        if self.replaying:
+            self.replay_stop.set()
+            return
+        path = filedialog.askopenfilename(title="캡처 재생", filetypes=[("Capture", "*.cap")])
+        if not path:
+            return
+        try:
+            reader = CaptureReader(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"캡처 파일 에러: {e}")
+            return
+        speed = self.replay_speed_var.get()
+        speed = None if speed == REPLAY_SPEEDS[-1] else float(speed.rstrip('x'))
+        self.replaying = True
+        self.replay_stop.clear()
+        self.replay_button.config(text="재생 중지")
+        logger.info(f"캡처 재생 시작: {reader.label} ({self.replay_speed_var.get()})")
+        threading.Thread(target=self.replay_worker, args=(reader, speed), daemon=True).start()
+
+    def replay_worker(self, reader, speed):
+        """
+        Feed captured responses into the same queues the live worker and dispatcher fill
+        """
+        decoder = ReplayDecoder()
+        frames = 0
+        start = time.perf_counter()
+        try:
+            for captured in replay(reader, speed, self.replay_stop):
+                event = decoder.feed(captured)
+                if event is None:
+                    continue
+                command, index, frame = event
+                if command == SENSOR_COMMAND:
+                    self.sensor_queue.put(frame)
+                elif command == LOAD_CELL_COMMAND and index is not None:
+                    self.response_queue.put((self._completed(frame), partial(self._on_load_cell_response, index),
+                                             f"Error reading load cell {index}"))
+                frames += 1
+                # Unpaced replay must not outrun the Tk thread by more than a few ticks
+                while (self.sensor_queue.qsize() + self.response_queue.qsize() > REPLAY_QUEUE_LIMIT
+                       and not self.replay_stop.wait(0.01)):
+                    pass
+        except Exception as e:
+            logger.error(f"캡처 재생 에러: {e}")
+        elapsed = time.perf_counter() - start
+        # Queued behind the replayed responses, so it runs after the last of them
+        self.response_queue.put((self._completed(None), lambda _: self._on_replay_finished(frames, elapsed),
+                                 "캡처 재생 에러"))
+
+    @staticmethod
+    def _completed(result):
+        future = Future()
+        future.set_result(result)
+        return future
+
+    def _on_replay_finished(self, frames, elapsed):
+        self.replaying = False
+        self.replay_button.config(text="캡처 재생")
+        logger.info(f"캡처 재생 완료: 응답 {frames}개, {elapsed:.1f}초 ({frames / max(elapsed, 1e-9):.0f}/s)")
+
+    def post_ui(self, callback, *args):
+        """
+        Run callback(*args) on the Tk thread; safe to call from any thread
+        """
+        self.ui_queue.put((callback, args))
+
+    def set_connection_state(self, text):
+        self.connect_button.config(text=text)
+        if self.dashboard is not None:
+            self.dashboard.set_connected(self.tcp_client.name, self.is_connected)
+
+    def submit_command(self, command, on_response, error_message):
+        """
+        Send a command through the dispatcher without blocking the Tk thread
+        :param command: request frame
+        :param on_response: called on the Tk thread with the response frame (or None)
+        :param error_message: log prefix if the request or on_response fails
+        """
+        started = time.perf_counter()
+        future = self.dispatcher.submit(command, CommandDispatcher.PRIORITY_COMMAND)
+
+        def done(f):
+            self.record_command(command, f, time.perf_counter() - started)
+            self.response_queue.put((f, on_response, error_message))
+
+        future.add_done_callback(done)
+
+    def record_command(self, command, future, elapsed):
+        response = None if future.exception() else future.result()
+        step = StepResult(f"{COMMAND_NAMES.get(command[1], hex(command[1]))} {command[2:-1].hex(' ')}".strip(),
+                          command.hex(' '), response.hex(' ') if response else None, response is not None,
+                          elapsed * 1000)
+        self.results_store.record_step(self.session_id, self.tcp_client.name, step)
 
     def read_load_cell(self, load_cell_index):
         if self.is_connected:
-            try:
-                command = self.message_formatter.get_loadcell_value_message(load_cell_index)
-                response = self.tcp_client.send_message(command)
-                logger.debug(f"request: {command}")
-                logger.debug(f"request: {response}")
-                if response:
-                    value = struct.unpack('f', response[2:6])[0]
-                    rounded_value = round(value, 2)
-                    self.load_cell_display.update_load_cell_value(load_cell_index, rounded_value)
-            except Exception as e:
-                logger.error(f"Error reading load cell {load_cell_index}: {e}")
-                print(f"Error reading load cell {load_cell_index}: {e}")
+            command = self.message_formatter.get_loadcell_value_message(load_cell_index)
+            logger.debug(f"request: {command}")
+            self.submit_command(command, lambda response: self._on_load_cell_response(load_cell_index, response),
+                                f"Error reading load cell {load_cell_index}")
+
+    def _on_load_cell_response(self, load_cell_index, response):
+        logger.debug(f"response: {response}")
+        if response:
+            value = self.message_formatter.parse_load_cell_response(response)
+            self.record_load_cells([value], first_index=load_cell_index)
+            rounded_value = round(value, 2)
+            self.load_cell_display.update_load_cell_value(load_cell_index, rounded_value)
+
+    def read_all_load_cells(self):
+        if not self.is_connected or self.sweep_in_flight or self.replaying:
+            return
+        self.sweep_in_flight = True
+        self.sweep_started = time.perf_counter()
+        future = self.dispatcher.submit_batch(self.message_formatter.load_cell_sweep_messages())
+        future.add_done_callback(lambda f: self.response_queue.put((f, self._on_load_cell_sweep, "로드셀 전체 읽기 에러")))
+
+    def record_load_cells(self, values, first_index=1):
+        timestamp = wall_clock()
+        if not self.replaying:
+            self.recorder.record_load_cells(values, first_index, timestamp)
+            self.results_store.record_load_cells(self.session_id, self.tcp_client.name, values, first_index,
+                                                 timestamp)
+        for index, value in enumerate(values, start=first_index - 1):
+            self.load_cell_histories[index].append(timestamp, value)
+        if self.trend_window is not None:
+            self.trend_window.mark_dirty()
+        if self.dashboard is not None:
+            self.dashboard.update_load_cells(self.tcp_client.name, values, first_index)
+
+    def measure_load_cells(self):
+        if not self.is_connected or self.sweep_in_flight or self.replaying:
+            return
+        # Holds off the continuous sweep until the measurement is done
+        self.sweep_in_flight = True
+        self.load_cell_display.measure_button.config(state="disabled")
+        samples = self.load_cell_display.get_sample_count()
+        settings = AcquisitionSettings(samples=samples, min_samples=min(5, samples),
+                                       rate_hz=1.0 / self.load_cell_display.get_sweep_period())
+        logger.info(f"로드셀 통계 측정 시작: 최대 {samples}회, {settings.rate_hz:g} Hz")
+        self.submit_sample_sweep(LoadCellAcquisition(range(1, MessageFormatter.LOAD_CELL_COUNT + 1), settings))
+
+    def submit_sample_sweep(self, acquisition):
+        # One batch per sweep, paced from the Tk side, so polls and commands go in between
+        if not self.is_connected or self.replaying:
+            self._on_load_cells_measured(acquisition.finish(lost=True))
+            return
+        started = time.perf_counter()
+        future = self.dispatcher.submit_batch(acquisition.requests())
+        future.add_done_callback(lambda f: self.response_queue.put(
+            (f, partial(self._on_sample_sweep, acquisition, started), "로드셀 통계 측정 에러")))
+
+    def _on_sample_sweep(self, acquisition, started, responses):
+        next_sweep = False
+        try:
+            if responses is not None:
+                cells, values = acquisition.add_sweep(responses)
+                for cell, value in zip(cells, values):
+                    self.record_load_cells([value], first_index=cell)
+                    self.load_cell_display.update_load_cell_value(cell, round(value, 2))
+                if not acquisition.done:
+                    delay = max(0.0, 1.0 / acquisition.settings.rate_hz - (time.perf_counter() - started))
+                    self.master.after(int(delay * 1000), self.submit_sample_sweep, acquisition)
+                    next_sweep = True
+                    return
+            self._on_load_cells_measured(acquisition.finish(lost=responses is None))
+        finally:
+            # An error anywhere above must not leave the measurement button and the continuous sweep locked
+            if not next_sweep:
+                self.sweep_in_flight = False
+                self.load_cell_display.measure_button.config(state="normal")
+
+    def _on_load_cells_measured(self, verdicts):
+        self.sweep_in_flight = False
+        self.load_cell_display.measure_button.config(state="normal")
+        for verdict in verdicts or []:
+            step = verdict_step(verdict)
+            self.results_store.record_step(self.session_id, self.tcp_client.name, step)
+            if verdict.samples:
+                self.load_cell_display.update_load_cell_value(verdict.cell, round(verdict.mean, 2))
+            (logger.info if step.passed else logger.warning)(f"{step.name}: {step.message}")
+        if self.load_cell_display.continuous_var.get():
+            self.schedule_load_cell_sweep(0.0)
+
+    def open_load_cell_trends(self):
+        if self.trend_window is not None and not self.trend_window.closed:
+            self.trend_window.lift()
+            return
+        self.trend_window = LoadCellTrendWindow(self.master, self.load_cell_histories)
+
+    def toggle_load_cell_sweep(self):
+        if self.load_cell_display.continuous_var.get():
+            self.schedule_load_cell_sweep(0.0)
+        elif self.sweep_job is not None:
+            self.master.after_cancel(self.sweep_job)
+            self.sweep_job = None
+
+    def schedule_load_cell_sweep(self, delay):
+        # A single pending tick, so toggling or a finished measurement never starts a second chain
+        if self.sweep_job is not None:
+            self.master.after_cancel(self.sweep_job)
+        self.sweep_job = self.master.after(int(delay * 1000), self._continuous_sweep)
+
+    def _continuous_sweep(self):
+        self.sweep_job = None
+        if not self.load_cell_display.continuous_var.get():
+            return
+        if self.is_connected and not self.sweep_in_flight and not self.replaying:
+            self.read_all_load_cells()  # _on_load_cell_sweep schedules the next tick
+        else:
+            # Disconnected, replaying or measuring: keep ticking so sweeping resumes by itself
+            self.schedule_load_cell_sweep(self.load_cell_display.get_sweep_period())
+
+    def _on_load_cell_sweep(self, responses):
+        self.sweep_in_flight = False
+        try:
+            if responses:
+                values = self.message_formatter.parse_load_cell_responses(responses)
+                self.record_load_cells(values)
+                self.load_cell_display.update_load_cell_values(values)
+        finally:
+            if self.load_cell_display.continuous_var.get():
+                elapsed = time.perf_counter() - self.sweep_started
+                self.schedule_load_cell_sweep(max(0.0, self.load_cell_display.get_sweep_period() - elapsed))
 
     def internal_motor_callback(self, motor, direction):
         if self.is_connected:
@@ -243,28 +745,21 @@ class FirmwareTesterApp:
                     command = self.message_formatter.internal_motor_cw_message(motor)
                 else:
                     command = self.message_formatter.internal_motor_ccw_message(motor)
-                FirmwareTesterApp.set_operation_variable(True)
-                response = self.tcp_client.send_message(command)
-                logger.debug(f"Motor {motor} turned {direction}: {response}")
-                print(f"Motor {motor} turned {direction}: {response}")
             except Exception as e:
                 logger.error(f"모터 컨트롤 에러: {e}")
-                print(f"Error during motor control: {e}")
-            finally:
-                FirmwareTesterApp.set_operation_variable(False)
+                return
+            self.submit_command(command, lambda response: logger.debug(f"Motor {motor} turned {direction}: {response}"),
+                                "모터 컨트롤 에러")
 
     def external_motor_callback(self, motor):
         if self.is_connected:
             try:
                 command = self.message_formatter.external_motor_control_message(motor)
-                FirmwareTesterApp.set_operation_variable(True)
-                response = self.tcp_client.send_message(command)
-                print(f"Motor {motor}: {response}")
             except Exception as e:
                 logger.error(f"외부 모터 제어 에러: {e}")
-                print(f"Error during external motor control: {e}")
-            finally:
-                FirmwareTesterApp.set_operation_variable(False)
+                return
+            self.submit_command(command, lambda response: logger.debug(f"Motor {motor}: {response}"),
+                                "외부 모터 제어 에러")
 
     def create_internal_motor_controls(self, frame):
         motor_var = ttk.StringVar()
@@ -341,14 +836,30 @@ class FirmwareTesterApp:
                 command = self.message_formatter.relay_on_message(relay_number)
             else:
                 command = self.message_formatter.relay_off_message(relay_number)
-            FirmwareTesterApp.set_operation_variable(True)
-            response = self.tcp_client.send_message(command)
-            print(f"Relay {relay_number} turned {state}: {response}")
         except Exception as e:
             logger.error(f"릴레이 제어 에러: {e}")
-            print(f"Error during relay control: {e}")
-        finally:
-            FirmwareTesterApp.set_operation_variable(False)
+            return
+        self.submit_command(command, lambda response: logger.debug(f"Relay {relay_number} turned {state}: {response}"),
+                            "릴레이 제어 에러")
+
+    def run_loopback_test(self):
+        if not self.is_connected or self.replaying:
+            return
+        self.loopback_button.config(state="disabled")
+        result = BoardResult(self.tcp_client.host, self.tcp_client.port, connected=True)
+        logger.info("루프백 테스트 시작")
+        # Runs on the dispatcher thread, so sensor polling waits until the measurement is done
+        future = self.dispatcher.submit_call(run_loopback, self.tcp_client, LoopbackTest(default_channels()), result)
+        future.add_done_callback(lambda f: self.response_queue.put(
+            (f, lambda _: self._on_loopback_done(result), "루프백 테스트 에러")))
+
+    def _on_loopback_done(self, result):
+        self.loopback_button.config(state="normal")
+        for step in result.steps:
+            self.results_store.record_step(self.session_id, result.name, step)
+            if step.passed:
+                logger.info(f"{step.name}: {step.message}")
+        logger.info(f"루프백 테스트 {'통과' if result.passed else '실패'}")
 
     def create_relay_controls(self, frame):
         inner_frame = ttk.Frame(frame)
@@ -377,6 +888,10 @@ class FirmwareTesterApp:
                                      style='primary.TButton', width=10)
         self.off_button.pack(side=ttk.LEFT, padx=5)
 
+        self.loopback_button = ttk.Button(button_frame, text="루프백 테스트", command=self.run_loopback_test,
+                                          style='primary.TButton')
+        self.loopback_button.pack(side=ttk.LEFT, padx=(20, 5))
+
         # Center the button_frame
         button_frame.grid_columnconfigure(0, weight=1)
         button_frame.grid_columnconfigure(1, weight=1)
@@ -385,87 +900,123 @@ class FirmwareTesterApp:
         inner_frame.grid_columnconfigure(1, weight=1)
 
     def tcp_worker(self):
-        while True:
-            if self.is_connected:
+        sensor_command = self.message_formatter.sensor_message()
+        last_mask = None
+        while not self.stop_event.is_set():
+            if self.replaying:
+                self.stop_event.wait(0.1)
+            elif self.is_connected:
+                self.poll_scheduler.wait(self.stop_event)
                 try:
-                    sensor_command = self.message_formatter.sensor_message()
-                    sensor_response = self.tcp_client.send_message(sensor_command)
-                    if not FirmwareTesterApp.get_operation_variable():
-                        if sensor_response is None or len(sensor_response) == 0:
-                            print(f"FirmwareTesterApp.get_operation_variable()")
-                            self.show_error_message("에러", "tcp 통신 에러 발생했습니다. 랜선 연결을 확인하고 다시 프로그램을 실행해주세요.")
-                    if sensor_response:
-                        self.sensor_queue.put(sensor_response)
-
+                    sensor_response = self.dispatcher.submit(sensor_command, CommandDispatcher.PRIORITY_POLL).result()
                 except Exception as e:
                     logger.error(f"TCP 통신 에러: {e}")
-                    self.connect_button.config(text="연결 실패")
-                    print(f"Error in TCP communication: {e}")
+                    sensor_response = None
+                if sensor_response:
+                    self.poll_error_shown = False
+                    self.recorder.record_sensor(sensor_response)
+                    mask = response_sensor_mask(sensor_response)
+                    if mask != last_mask:
+                        self.results_store.record_sensor_event(self.session_id, self.tcp_client.name, mask)
+                        last_mask = mask
+                    self.sensor_queue.put(sensor_response)
+                    continue
+
+                self.is_connected = False
+                self.post_ui(self.set_connection_state, "연결 끊김")
+                # One dialog per outage, not one per failed poll
+                if not self.poll_error_shown:
+                    self.poll_error_shown = True
+                    self.show_error_message("에러", "tcp 통신 에러 발생했습니다. 랜선 연결을 확인하고 다시 프로그램을 실행해주세요.")
             else:
+                connected = False
                 try:
-                    self.tcp_client.connect()
+                    connected = self.dispatcher.connect().result()
                 except Exception as e:
                     logger.error(f"재연결 에러: {e}")
-                    print(f"Error reconnecting: {e}")
-
-            time.sleep(1)
+                if connected:
+                    self.backoff.reset()
+                    self.poll_scheduler.reset()
+                    self.is_connected = True
+                    self.post_ui(self.set_connection_state, "연결 완료")
+                    continue
+
+                delay = self.backoff.next_delay()
+                logger.debug(f"{delay:.1f}초 후 재연결 시도")
+                self.post_ui(self.set_connection_state, "연결 실패")
+                # Sleep out the backoff unless the operator asks to connect now or the app closes
+                self.connect_requested.wait(delay)
+                self.connect_requested.clear()
 
     def poll_queues(self):
+        self.process_ui_queue()
         self.process_sensor_queue()
+        self.process_response_queue()
         self.process_log_queue()
         self.master.after(100, self.poll_queues)
 
+    def update_telemetry(self):
+        self.telemetry_panel.update_metrics(self.tcp_client.metrics.snapshot())
+        self.master.after(1000, self.update_telemetry)
+
+    def update_polling(self):
+        rate = self.sensor_display.get_polling_rate()
+        if rate and abs(rate - self.poll_scheduler.rate_hz) > 1e-6:
+            self.poll_scheduler.set_rate(rate)
+        self.sensor_display.update_polling_stats(self.poll_scheduler.stats())
+        self.master.after(500, self.update_polling)
+
     def process_log_queue(self):
-        while not self.log_queue.empty():
-            message = self.log_queue.get()
-            self.log_text.configure(state='normal')
-            self.log_text.insert(ttk.END, str(message))
-            self.log_text.see(ttk.END)
-            self.log_text.configure(state='disabled')
+        self.log_console.drain()
+
+    def process_response_queue(self):
+        while not self.response_queue.empty():
+            future, on_response, error_message = self.response_queue.get()
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.error(f"{error_message}: {e}")
+                response = None
+            try:
+                on_response(response)
+            except Exception as e:
+                logger.error(f"{error_message}: {e}")
+
+    def process_ui_queue(self):
+        while not self.ui_queue.empty():
+            callback, args = self.ui_queue.get()
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"UI 업데이트 에러: {e}")
 
     def process_sensor_queue(self):
+        mask = None
         while not self.sensor_queue.empty():
             response = self.sensor_queue.get()
-            sensor_value_1 = response[2]
-            sensor_value_2 = response[3]
-            sensor_value_1_map = self._parse_sensor_value_1(sensor_value_1)
-            sensor_value_2_map = self._parse_sensor_value_2(sensor_value_2)
-
-            for sensor_name, status in {**sensor_value_1_map, **sensor_value_2_map}.items():
-                self.sensor_display.update_ui(sensor_name, status)
+            mask = response_sensor_mask(response)
 
-    @staticmethod
-    def _parse_sensor_value_1(sensor_value):
-        sensor_value_1_map = {
-            '센서 1': (sensor_value >> 7) & 1,
-            '센서 2': (sensor_value >> 6) & 1,
-            '센서 3': (sensor_value >> 5) & 1,
-            '센서 4': (sensor_value >> 4) & 1,
-            '센서 9': (sensor_value >> 3) & 1,
-            '센서 10': (sensor_value >> 2) & 1,
-            '센서 11': (sensor_value >> 1) & 1,
-            '센서 12': (sensor_value >> 0) & 1,
-        }
-        return sensor_value_1_map
-
-    @staticmethod
-    def _parse_sensor_value_2(sensor_value):
-        sensor_value_2_map = {
-            '센서 5': (sensor_value >> 7) & 1,
-            '센서 6': (sensor_value >> 6) & 1,
-            '센서 7': (sensor_value >> 5) & 1,
-            '센서 8': (sensor_value >> 4) & 1,
-            '센서 13': (sensor_value >> 3) & 1,
-            '센서 14': (sensor_value >> 2) & 1,
-            '센서 15': (sensor_value >> 1) & 1,
-            '센서 16': (sensor_value >> 0) & 1,
-        }
-        return sensor_value_2_map
+        # Only the newest frame is visible; intermediate ones would be redrawn over immediately
+        if mask is not None:
+            self.sensor_display.update_sensor_mask(mask)
+            if self.dashboard is not None:
+                self.dashboard.update_sensor(self.tcp_client.name, mask)
 
     def show_error_message(self, title, message):
-        self.master.after(0, lambda: messagebox.showerror(title, message))
+        self.post_ui(messagebox.showerror, title, message)
 
     def on_close(self):
-        FirmwareTesterApp.set_operation_variable(False)
+        self.stop_event.set()
+        self.replay_stop.set()
+        self.connect_requested.set()
+        if self.board_monitor is not None:
+            self.board_monitor.stop()
+        self.dispatcher.stop()
+        self.tcp_client.metrics.stop_export()
         self.tcp_client.close_connection()
+        self.recorder.close()
+        if self.capture is not None:
+            self.capture.close()
+        self.results_store.close()
+        flush_logs()
         self.master.destroy()
@@ -0,0 +1,86 @@
+import queue
+import time
+
+import ttkbootstrap as ttk
+
+
+class LogConsole(ttk.Frame):
+    """
+    Read-only log view fed from a queue.
+
+    Each drain() pulls as many messages as fit in a small time budget and writes them
+    with a single insert. The widget keeps at most max_lines lines, and a backlog larger
+    than max_backlog messages is discarded instead of rendered; both are counted in the
+    status line.
+    """
+
+    def __init__(self, master, log_queue, font=None, max_lines=2000, max_backlog=20000, time_budget=0.01):
+        super().__init__(master)
+        self.log_queue = log_queue
+        self.max_lines = max_lines
+        self.max_backlog = max_backlog
+        self.time_budget = time_budget
+        self.dropped = 0
+        self.create_widgets(font)
+
+    def create_widgets(self, font):
+        self.status_label = ttk.Label(self, text="", anchor="e")
+        self.status_label.pack(side="bottom", fill="x")
+
+        self.text = ttk.Text(self, wrap=ttk.WORD, state='disabled', font=font, undo=False)
+        self.text.pack(side="left", fill="both", expand=True)
+
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.text.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.text.configure(yscrollcommand=scrollbar.set)
+
+    def drain(self):
+        dropped = self._discard_backlog()
+
+        messages = []
+        deadline = time.perf_counter() + self.time_budget
+        while True:
+            try:
+                messages.append(str(self.log_queue.get_nowait()))
+            except queue.Empty:
+                break
+            if len(messages) % 64 == 0 and time.perf_counter() > deadline:
+                break
+
+        if messages:
+            dropped += self.write(''.join(messages))
+        if dropped:
+            self.dropped += dropped
+            self.status_label.config(text=f"표시 생략된 로그: {self.dropped}")
+
+    def write(self, text):
+        """
+        Append text in one insert and trim the widget to max_lines
+        :return: number of lines that were never displayed
+        """
+        skipped = 0
+        line_count = text.count('\n')
+        if line_count > self.max_lines:
+            lines = text.split('\n')
+            keep = self.max_lines + 1  # the part after the last newline is not a full line
+            skipped = len(lines) - keep
+            text = '\n'.join(lines[-keep:])
+
+        self.text.configure(state='normal')
+        self.text.insert(ttk.END, text)
+        total_lines = int(self.text.index('end-1c').split('.')[0])
+        if total_lines > self.max_lines:
+            self.text.delete('1.0', f"{total_lines - self.max_lines + 1}.0")
+        self.text.see(ttk.END)
+        self.text.configure(state='disabled')
+        return skipped
+
+    def _discard_backlog(self):
+        discarded = 0
+        while self.log_queue.qsize() > self.max_backlog:
+            try:
+                self.log_queue.get_nowait()
+            except queue.Empty:
+                break
+            discarded += 1
+        return discarded
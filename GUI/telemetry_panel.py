@@ -0,0 +1,43 @@
+import ttkbootstrap as ttk
+
+
+class TelemetryPanel(ttk.Frame):
+    """
+    Compact per-command view of TransportMetrics.snapshot().
+    """
+
+    COLUMNS = (
+        ("command", "명령", 90),
+        ("count", "요청", 60),
+        ("p50_ms", "p50 ms", 60),
+        ("p95_ms", "p95 ms", 60),
+        ("p99_ms", "p99 ms", 60),
+        ("timeouts", "타임아웃", 60),
+    )
+
+    def __init__(self, master, font=None):
+        super().__init__(master)
+        self.rows = {}
+        self.create_widgets(font)
+
+    def create_widgets(self, font):
+        self.table = ttk.Treeview(self, columns=[column for column, _, _ in self.COLUMNS], show="headings", height=5)
+        for column, heading, width in self.COLUMNS:
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, anchor="e" if column != "command" else "w", stretch=False)
+        self.table.pack(fill="both", expand=True)
+
+        self.totals_label = ttk.Label(self, text="", font=font)
+        self.totals_label.pack(fill="x")
+
+    def update_metrics(self, snapshot):
+        for command, values in snapshot["commands"].items():
+            row = (command, values["count"], f"{values['p50_ms']:.2f}", f"{values['p95_ms']:.2f}",
+                   f"{values['p99_ms']:.2f}", values["timeouts"])
+            if command in self.rows:
+                self.table.item(self.rows[command], values=row)
+            else:
+                self.rows[command] = self.table.insert("", "end", values=row)
+
+        self.totals_label.config(text=f"재연결 {snapshot['reconnects']} | "
+                                      f"송신 {snapshot['bytes_sent']:,} B | 수신 {snapshot['bytes_received']:,} B")
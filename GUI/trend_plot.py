@@ -0,0 +1,236 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from tkinter import Canvas, Toplevel
+
+import ttkbootstrap as ttk
+
+from recorder.stream_recorder import wall_clock
+
+
+class MinMaxHistory:
+    """
+    Sample history of one signal kept as a min/max pyramid: level 0 holds raw samples and
+    every level above holds one (start time, min, max) bin per `factor` entries of the level
+    below. Each level keeps at most `capacity` entries, so memory is fixed while the
+    coarsest level still spans capacity * factor ** (levels - 1) samples.
+    """
+
+    def __init__(self, capacity=2048, factor=8, levels=6):
+        self.capacity = capacity
+        self.factor = factor
+        self.levels = [(array('d'), array('d'), array('d')) for _ in range(levels)]
+        self.partial = [None] * levels  # open bin per level: [start, low, high, entries, last sample time]
+        self.last_time = [0.0] * levels  # time of the newest sample folded into a closed bin
+        self.last_value = None
+
+    def __len__(self):
+        return len(self.levels[0][0])
+
+    def append(self, timestamp, value):
+        self.last_value = value
+        self._push(0, timestamp, value, value, timestamp)
+
+    def _push(self, level, start, low, high, last):
+        times, lows, highs = self.levels[level]
+        times.append(start)
+        lows.append(low)
+        highs.append(high)
+        self.last_time[level] = last
+        if len(times) > self.capacity:
+            # drop the oldest half at once so trimming stays amortized O(1)
+            half = self.capacity // 2
+            del times[:half], lows[:half], highs[:half]
+
+        parent = level + 1
+        if parent == len(self.levels):
+            return
+        partial = self.partial[parent]
+        if partial is None:
+            self.partial[parent] = [start, low, high, 1, last]
+            return
+        partial[1] = min(partial[1], low)
+        partial[2] = max(partial[2], high)
+        partial[3] += 1
+        partial[4] = last
+        if partial[3] == self.factor:
+            self.partial[parent] = None
+            self._push(parent, partial[0], partial[1], partial[2], partial[4])
+
+    def oldest(self):
+        for times, _, _ in reversed(self.levels):
+            if times:
+                return times[0]
+        return None
+
+    def _first(self, level, start_time):
+        times = self.levels[level][0]
+        if level == 0:
+            return bisect_left(times, start_time)
+        # A bin that starts before start_time may still hold samples inside the window
+        return max(0, bisect_right(times, start_time) - 1)
+
+    def _entries(self, level, start_time, end_time):
+        times, lows, highs = self.levels[level]
+        first = self._first(level, start_time)
+        last = bisect_left(times, end_time)
+        return zip(times[first:last], lows[first:last], highs[first:last])
+
+    def view(self, start_time, end_time, max_entries):
+        """
+        Entries covering start_time..end_time from the finest level that both reaches back
+        to start_time and has at most max_entries entries in the range, so the cost depends
+        on max_entries and not on how many samples were recorded.
+        :return: list of (time, min, max)
+        """
+        chosen = len(self.levels) - 1
+        for level, (times, _, _) in enumerate(self.levels):
+            if not times:
+                break
+            covers = times[0] <= start_time or level == len(self.levels) - 1 or not self.levels[level + 1][0]
+            count = bisect_left(times, end_time) - bisect_right(times, start_time)
+            if covers and count <= max_entries:
+                chosen = level
+                break
+
+        entries = list(self._entries(chosen, start_time, end_time))
+        # Samples newer than the last closed bin at `chosen` live in finer levels
+        for level in range(chosen - 1, -1, -1):
+            times, lows, highs = self.levels[level]
+            first = max(bisect_right(times, self.last_time[level + 1]), self._first(level, start_time))
+            last = bisect_left(times, end_time)
+            entries.extend(zip(times[first:last], lows[first:last], highs[first:last]))
+        entries.sort()
+        return entries
+
+
+def decimate(entries, start_time, end_time, width):
+    """
+    Fold (time, min, max) entries into one min/max pair per pixel column
+    :return: list of (x, min, max)
+    """
+    span = end_time - start_time
+    if span <= 0 or width <= 0:
+        return []
+    columns = {}
+    for timestamp, low, high in entries:
+        x = int((timestamp - start_time) / span * (width - 1))
+        x = min(max(x, 0), width - 1)
+        column = columns.get(x)
+        if column is None:
+            columns[x] = [low, high]
+        else:
+            if low < column[0]:
+                column[0] = low
+            if high > column[1]:
+                column[1] = high
+    return [(x, low, high) for x, (low, high) in sorted(columns.items())]
+
+
+class LoadCellTrendWindow(Toplevel):
+    """
+    Trend charts of all load cells on one canvas. Redraws at most `max_fps` times per
+    second and only when new samples arrived, and each redraw walks about one entry per
+    pixel column of every chart.
+    """
+
+    SPANS = (("1분", 60), ("10분", 600), ("1시간", 3600), ("8시간", 8 * 3600), ("24시간", 24 * 3600))
+
+    def __init__(self, master, histories, columns=4, max_fps=10):
+        super().__init__(master)
+        self.title("로드셀 추세")
+        self.geometry("1000x700")
+        self.histories = histories
+        self.columns = columns
+        self.frame_interval = int(1000 / max_fps)
+        self.dirty = True
+        self.closed = False
+        self.span_var = ttk.StringVar(value=self.SPANS[0][0])
+        self.panels = []
+        self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.after(self.frame_interval, self.redraw)
+
+    def create_widgets(self):
+        controls = ttk.Frame(self, padding=5)
+        controls.pack(fill="x")
+        ttk.Label(controls, text="표시 구간:").pack(side=ttk.LEFT, padx=(0, 2))
+        span_box = ttk.Combobox(controls, textvariable=self.span_var, values=[name for name, _ in self.SPANS],
+                                width=8, state="readonly")
+        span_box.pack(side=ttk.LEFT)
+        span_box.bind("<<ComboboxSelected>>", lambda event: self.mark_dirty())
+
+        self.canvas = Canvas(self, background="white", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.layout())
+        for index in range(len(self.histories)):
+            self.panels.append({
+                "frame": self.canvas.create_rectangle(0, 0, 0, 0, outline="#bbbbbb"),
+                "line": self.canvas.create_line(0, 0, 0, 0, fill="#1f77b4"),
+                "title": self.canvas.create_text(0, 0, anchor="nw", text=f"로드셀 {index + 1}",
+                                                 font=("Helvetica", 9, "bold")),
+                "range": self.canvas.create_text(0, 0, anchor="ne", text="", font=("Helvetica", 8)),
+                "box": (0, 0, 0, 0),
+            })
+
+    def layout(self):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        rows = (len(self.panels) + self.columns - 1) // self.columns
+        cell_width = width / self.columns
+        cell_height = height / rows
+        for index, panel in enumerate(self.panels):
+            left = index % self.columns * cell_width + 4
+            top = index // self.columns * cell_height + 4
+            right = left + cell_width - 8
+            bottom = top + cell_height - 8
+            panel["box"] = (left, top + 16, right, bottom)
+            self.canvas.coords(panel["frame"], left, top + 16, right, bottom)
+            self.canvas.coords(panel["title"], left, top)
+            self.canvas.coords(panel["range"], right, top)
+        self.mark_dirty()
+
+    def span(self):
+        return dict(self.SPANS).get(self.span_var.get(), self.SPANS[0][1])
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def redraw(self):
+        if self.closed:
+            return
+        if self.dirty:
+            self.dirty = False
+            end_time = wall_clock()
+            start_time = end_time - self.span()
+            for panel, history in zip(self.panels, self.histories):
+                self.draw_panel(panel, history, start_time, end_time)
+        self.after(self.frame_interval, self.redraw)
+
+    def draw_panel(self, panel, history, start_time, end_time):
+        left, top, right, bottom = panel["box"]
+        width = int(right - left)
+        if width < 2 or bottom - top < 2:
+            return
+        columns = decimate(history.view(start_time, end_time, 2 * width), start_time, end_time, width)
+        if not columns:
+            self.canvas.coords(panel["line"], 0, 0, 0, 0)
+            self.canvas.itemconfig(panel["range"], text="")
+            return
+
+        low = min(column[1] for column in columns)
+        high = max(column[2] for column in columns)
+        padding = (high - low) * 0.05 or 1.0
+        low, high = low - padding, high + padding
+        scale = (bottom - top) / (high - low)
+
+        points = []
+        for x, column_low, column_high in columns:
+            points.extend((left + x, bottom - (column_high - low) * scale,
+                           left + x, bottom - (column_low - low) * scale))
+        self.canvas.coords(panel["line"], *points)
+        self.canvas.itemconfig(panel["range"], text=f"{history.last_value:.2f}  "
+                                                    f"[{low + padding:.2f} ~ {high - padding:.2f}]")
+
+    def close(self):
+        self.closed = True
+        self.destroy()
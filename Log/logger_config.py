@@ -1,15 +1,99 @@
 # logger_config.py
+import json
+import os
+import sys
+from datetime import datetime
+
 from loguru import logger
 
 from Log.gui_log_sink import GuiLogSink
 
+LOG_DIRECTORY = "logs"
+LOG_MAX_BYTES = 20 * 1024 * 1024
+LOG_ROTATION_INTERVAL = 24 * 60 * 60  # seconds
+
+TEXT_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} {level: <8} [{extra[session]}] [{extra[board]}] {message}"
+
+
+def new_session_id():
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
 
 def setup_logger(log_queue):
     logger.remove()  # Remove existing handlers
+    logger.configure(extra={"session": "-", "board": "-"})
     logger.add(GuiLogSink(log_queue), format="{time} {level} {message}")
 
-    # You can add other configurations here if needed
-    # For example, adding a file sink:
-    # logger.add("file_{time}.log", rotation="1 day")
+    return logger
+
+
+def setup_console_logger(level="INFO"):
+    logger.remove()
+    logger.configure(extra={"session": "-", "board": "-"})
+    logger.add(sys.stderr, format="{time:HH:mm:ss.SSS} {level: <8} {message}", level=level)
 
     return logger
+
+
+class SizeAndTimeRotation:
+    """
+    loguru rotation condition: rotate when the file would exceed max_bytes or when
+    interval seconds have passed since the file was opened.
+    """
+
+    def __init__(self, max_bytes=LOG_MAX_BYTES, interval=LOG_ROTATION_INTERVAL):
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._rotate_at = None
+
+    def __call__(self, message, file):
+        now = message.record["time"].timestamp()
+        if self._rotate_at is None:
+            self._rotate_at = now + self.interval
+        if file.tell() + len(message) > self.max_bytes or now >= self._rotate_at:
+            self._rotate_at = now + self.interval
+            return True
+        return False
+
+
+def _json_line(record):
+    # Compact one-object-per-line record; stashed in extra so loguru does not parse its braces
+    entry = {
+        "t": record["time"].timestamp(),
+        "level": record["level"].name,
+        "session": record["extra"].get("session"),
+        "board": record["extra"].get("board"),
+        "source": f"{record['name']}:{record['line']}",
+        "msg": record["message"],
+    }
+    if record["exception"] is not None:
+        entry["exc"] = repr(record["exception"].value)
+    record["extra"]["_json"] = json.dumps(entry, ensure_ascii=False)
+    return "{extra[_json]}\n"
+
+
+def setup_file_logging(session_id=None, log_directory=LOG_DIRECTORY, level="DEBUG"):
+    """
+    Persist every log record of this session to disk.
+
+    Both sinks are enqueued, so callers only format the record and a loguru worker thread
+    does the file I/O, rotation and compression.
+    :param session_id: tag stored on every record, defaults to the start timestamp
+    :param log_directory: directory for the session files
+    :param level: minimum level written to disk
+    :return: session id
+    """
+    session_id = session_id or new_session_id()
+    os.makedirs(log_directory, exist_ok=True)
+    logger.configure(extra={"session": session_id, "board": "-"})
+
+    logger.add(os.path.join(log_directory, "session_{time:YYYYMMDD_HHmmss}.log"), format=TEXT_FORMAT,
+               level=level, rotation=SizeAndTimeRotation(), compression="zip", enqueue=True, encoding="utf-8")
+    logger.add(os.path.join(log_directory, "session_{time:YYYYMMDD_HHmmss}.jsonl"), format=_json_line,
+               level=level, rotation=SizeAndTimeRotation(), compression="gz", enqueue=True, encoding="utf-8")
+    return session_id
+
+
+def flush_logs():
+    # Wait for enqueued records to reach disk, e.g. before the process exits
+    logger.complete()
@@ -0,0 +1,354 @@
+"""
+Benchmarks for the protocol, transport and UI update paths, run against the local simulator.
+
+    python -m benchmarks.run_benchmarks --output benchmarks/results/latest.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/baseline.json
+
+UI benchmarks need a display; without one they are reported as skipped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from Log.logger_config import setup_console_logger
+from connection.board_engine import MultiBoardEngine
+from connection.frame_decoder import FrameDecoder
+from connection.tcp_client import TcpClient
+from connection.wire_capture import WireCapture, replay_summary
+from message_formatter.message_formatter import MessageFormatter
+from message_formatter.sensor_decoder import encode_sensor_mask, response_sensor_mask
+from simulator.board_simulator import BoardSimulator, SimulatorConfig
+
+# Metric names (the last part of the flattened key) by the direction that is better;
+# anything else, e.g. times, is lower-is-better
+HIGHER_IS_BETTER = ("per_s", "boards_per_hour", "passed")
+# Counts that describe the run rather than measure it
+NOT_COMPARED = ("boards", "visible_boards", "frames", "ticks")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def rate(function, duration=0.5):
+    """
+    :return: calls of function per second, measured for about `duration` seconds
+    """
+    calls = 0
+    batch = 1
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            function()
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            return calls / elapsed
+        batch = min(batch * 2, 10000)
+
+
+class SimulatorThread:
+    """
+    Runs a BoardSimulator on its own event loop thread so synchronous clients can use it.
+    """
+
+    def __init__(self, count=1, port=15020, config=None):
+        self.simulator = BoardSimulator(count, port=port, config=config or SimulatorConfig(), seed=0)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.simulator.start(), self.loop).result()
+        return self.simulator
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.simulator.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def bench_protocol():
+    load_cell_response = bytes([0x7E, 0xB4]) + bytes(4) + bytes([0xAA])
+    sweep_responses = [load_cell_response] * MessageFormatter.LOAD_CELL_COUNT
+    sweep_keys = [(MessageFormatter.LOAD_CELL_COMMAND, index) for index in range(MessageFormatter.LOAD_CELL_COUNT)]
+    return {
+        "relay_encode_per_s": rate(lambda: MessageFormatter.relay_on_message(3)),
+        "internal_motor_encode_per_s": rate(lambda: MessageFormatter.internal_motor_cw_message("Internal Motor 2")),
+        "load_cell_encode_per_s": rate(lambda: MessageFormatter.get_loadcell_value_message(7)),
+        "sweep_batch_encode_per_s": rate(lambda: MessageFormatter.batch_message(sweep_keys)),
+        "load_cell_decode_per_s": rate(lambda: MessageFormatter.parse_load_cell_response(load_cell_response)),
+        "sweep_decode_per_s": rate(lambda: MessageFormatter.parse_load_cell_responses(sweep_responses)),
+    }
+
+
+def bench_frame_decoder(frames=100000):
+    sensor_value_1, sensor_value_2 = encode_sensor_mask(0xA5A5)
+    sensor = bytes([0x7E, 0xB0, sensor_value_1, sensor_value_2, 0xAA])
+    load_cell = bytes([0x7E, 0xB4, 0xAA, 0x7E, 0xAA, 0x7E, 0xAA])
+    stream = (sensor + load_cell) * (frames // 2)
+    chunk = 1400  # roughly one TCP segment
+
+    decoder = FrameDecoder()
+    decoded = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), chunk):
+        decoder.feed(stream[offset:offset + chunk])
+        for _ in decoder.frames():
+            decoded += 1
+    elapsed = time.perf_counter() - start
+    return {"frames_per_s": decoded / elapsed, "mbytes_per_s": len(stream) / elapsed / 1e6}
+
+
+def bench_round_trip(port, samples=2000):
+    results = {}
+    with SimulatorThread(1, port=port):
+        tcp_client = TcpClient('127.0.0.1', port, timeout=2.0)
+        tcp_client.connect()
+        for name, message in (("sensor", MessageFormatter.sensor_message()),
+                              ("relay", MessageFormatter.relay_on_message(1)),
+                              ("load_cell", MessageFormatter.get_loadcell_value_message(1))):
+            latencies = []
+            for _ in range(samples):
+                start = time.perf_counter()
+                tcp_client.send_message(message)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            results[name] = {
+                "p50_ms": percentile(latencies, 0.50),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "max_ms": latencies[-1],
+                "round_trips_per_s": 1000 / statistics.fmean(latencies),
+            }
+
+        sweep = MessageFormatter.load_cell_sweep_messages()
+        latencies = []
+        for _ in range(samples // 10):
+            start = time.perf_counter()
+            tcp_client.send_batch(sweep)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        results["load_cell_sweep"] = {"p50_ms": percentile(latencies, 0.50), "p99_ms": percentile(latencies, 0.99)}
+        tcp_client.close_connection()
+    return results
+
+
+def bench_replay(port, polls=5000, sweeps=200):
+    # Capture a polling session from the simulator once, then time the decode path on it at full speed
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.cap")
+        capture = WireCapture(path, f"127.0.0.1:{port}")
+        with SimulatorThread(1, port=port):
+            tcp_client = TcpClient('127.0.0.1', port, timeout=2.0, capture=capture)
+            tcp_client.connect()
+            sensor = MessageFormatter.sensor_message()
+            sweep = MessageFormatter.load_cell_sweep_messages()
+            for index in range(polls):
+                tcp_client.send_message(sensor)
+                if index % (polls // sweeps) == 0:
+                    tcp_client.send_batch(sweep)
+            tcp_client.close_connection()
+        capture.close()
+        summary = replay_summary(path)
+    return {"frames": summary["frames"], "frames_per_s": summary["frames_per_s"]}
+
+
+def open_ui_root():
+    try:
+        import ttkbootstrap as ttk
+        root = ttk.Window(themename="flatly")
+        root.withdraw()
+        return root
+    except Exception as e:
+        return str(e)
+
+
+def bench_sensor_ui(root, frames=20000):
+    masks = [(index * 0x9E37) & 0xFFFF for index in range(256)]
+    responses = []
+    for mask in masks:
+        sensor_value_1, sensor_value_2 = encode_sensor_mask(mask)
+        responses.append(bytes([0x7E, 0xB0, sensor_value_1, sensor_value_2, 0xAA]))
+
+    start = time.perf_counter()
+    for index in range(frames):
+        response_sensor_mask(responses[index & 0xFF])
+    decode_us = (time.perf_counter() - start) / frames * 1e6
+
+    results = {"decode_us_per_frame": decode_us}
+    if isinstance(root, str):
+        results["ui"] = f"skipped: {root}"
+        return results
+
+    from GUI.firmware_tester_app import SensorStatusDisplay
+    display = SensorStatusDisplay(root)
+    start = time.perf_counter()
+    for index in range(frames // 10):
+        display.update_sensor_mask(response_sensor_mask(responses[index & 0xFF]))
+    root.update()
+    results["decode_and_update_us_per_frame"] = (time.perf_counter() - start) / (frames // 10) * 1e6
+    display.destroy()
+    return results
+
+
+def bench_dashboard(root, boards=64, frames=50):
+    if isinstance(root, str):
+        return {"redraw": f"skipped: {root}"}
+
+    from GUI.board_dashboard import BoardDashboard
+    names = [f"10.0.{index // 256}.{index % 256}:502" for index in range(boards)]
+    dashboard = BoardDashboard(root, names)
+    root.update()
+    dashboard.layout()
+    start = time.perf_counter()
+    for frame in range(frames):
+        # Every board changes every frame, the worst case for one redraw
+        for index, name in enumerate(names):
+            dashboard.update_sensor(name, (frame * 0x9E37 + index) & 0xFFFF)
+            dashboard.update_load_cells(name, [frame + cell * 0.01 for cell in range(MessageFormatter.LOAD_CELL_COUNT)])
+        dashboard.redraw()
+        root.update()
+    elapsed = time.perf_counter() - start
+    results = {"boards": boards, "visible_boards": len(dashboard.tiles), "ms_per_frame": elapsed / frames * 1000}
+    dashboard.close()
+    return results
+
+
+def bench_log_console(root, messages=50000):
+    if isinstance(root, str):
+        return {"drain": f"skipped: {root}"}
+
+    from GUI.log_console import LogConsole
+    log_queue = queue.Queue()
+    console = LogConsole(root, log_queue)
+    for index in range(messages):
+        log_queue.put(f"2024-01-01T00:00:00 DEBUG request: {index}\n")
+
+    ticks = 0
+    start = time.perf_counter()
+    while not log_queue.empty():
+        console.drain()
+        root.update()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    console.destroy()
+    return {"messages_per_s": messages / elapsed, "ticks": ticks, "ms_per_tick": elapsed / ticks * 1000}
+
+
+def bench_scaling(port, board_counts):
+    results = []
+    for count in board_counts:
+        with SimulatorThread(count, port=port):
+            engine = MultiBoardEngine([('127.0.0.1', port + index) for index in range(count)],
+                                      poll_interval=0.1, max_concurrency=count)
+            start = time.perf_counter()
+            board_results = engine.run()
+            elapsed = time.perf_counter() - start
+        results.append({
+            "boards": count,
+            "passed": sum(result.passed for result in board_results),
+            "elapsed_s": elapsed,
+            "boards_per_hour": count / elapsed * 3600,
+        })
+        port += count
+    return results
+
+
+def flatten(value, prefix=""):
+    if isinstance(value, dict):
+        items = {}
+        for key, item in value.items():
+            items.update(flatten(item, f"{prefix}{key}."))
+        return items
+    if isinstance(value, list):
+        items = {}
+        for index, item in enumerate(value):
+            items.update(flatten(item, f"{prefix}{index}."))
+        return items
+    return {prefix[:-1]: value}
+
+
+def compare(current, baseline, threshold):
+    """
+    :return: list of (metric, baseline, current, change) that got worse by more than threshold
+    """
+    regressions = []
+    current_values = flatten(current["results"])
+    for metric, old in flatten(baseline["results"]).items():
+        new = current_values.get(metric)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or isinstance(old, bool) or not old:
+            continue
+        name = metric.rpartition('.')[2]
+        if name in NOT_COMPARED:
+            continue
+        change = (new - old) / abs(old)
+        worse = -change if any(name.endswith(tag) for tag in HIGHER_IS_BETTER) else change
+        if worse > threshold:
+            regressions.append((metric, old, new, change))
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="BoardCertGUI benchmarks")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results",
+                                                         f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"))
+    parser.add_argument("--compare", help="previous result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change counted as a regression")
+    parser.add_argument("--port", type=int, default=15020)
+    parser.add_argument("--boards", default="1,10,50,100", help="board counts for the scaling benchmark")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_console_logger("WARNING")
+
+    root = open_ui_root()
+    results = {
+        "protocol": bench_protocol(),
+        "frame_decoder": bench_frame_decoder(),
+        "round_trip": bench_round_trip(args.port),
+        "replay": bench_replay(args.port + 1),
+        "sensor_ui": bench_sensor_ui(root),
+        "log_console": bench_log_console(root),
+        "dashboard": bench_dashboard(root),
+        "scaling": bench_scaling(args.port + 2, [int(count) for count in args.boards.split(',')]),
+    }
+    if not isinstance(root, str):
+        root.destroy()
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args.threshold)
+        for metric, old, new, change in regressions:
+            print(f"REGRESSION {metric}: {old:.4g} -> {new:.4g} ({change:+.0%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
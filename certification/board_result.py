@@ -0,0 +1,101 @@
+import math
+from dataclasses import asdict, dataclass, field
+
+from Log.logger_config import logger
+from certification.procedure import Exchange
+from message_formatter.message_formatter import MessageFormatter
+
+
+@dataclass
+class StepResult:
+    name: str
+    request: str
+    response: str = None
+    passed: bool = False
+    elapsed_ms: float = 0.0
+    value: float = None
+    message: str = None
+
+
+@dataclass
+class BoardResult:
+    host: str
+    port: int
+    connected: bool = False
+    steps: list = field(default_factory=list)
+    load_cells: dict = field(default_factory=dict)
+    sensor_samples: int = 0
+    last_sensor: str = None
+    actuation: dict = field(default_factory=dict)  # loopback edge -> latency summary
+    elapsed: float = 0.0
+
+    @property
+    def name(self):
+        return f"{self.host}:{self.port}"
+
+    @property
+    def passed(self):
+        return self.connected and all(step.passed for step in self.steps)
+
+
+def default_certification_steps():
+    """
+    Certification commands for one board, in execution order
+    :return: list of (step name, request frame)
+    """
+    steps = [("센서", MessageFormatter.sensor_message())]
+    for relay in range(1, MessageFormatter.RELAY_COUNT + 1):
+        steps.append((f"릴레이 {relay} ON", MessageFormatter.relay_on_message(relay)))
+        steps.append((f"릴레이 {relay} OFF", MessageFormatter.relay_off_message(relay)))
+    for motor in MessageFormatter.INTERNAL_MOTOR_PARAMETER:
+        steps.append((f"{motor} CW", MessageFormatter.internal_motor_cw_message(motor)))
+        steps.append((f"{motor} CCW", MessageFormatter.internal_motor_ccw_message(motor)))
+    for motor in MessageFormatter.EXTERNAL_MOTOR_PARAMETER:
+        steps.append((f"{motor} CONTROL", MessageFormatter.external_motor_control_message(motor)))
+    for cell in range(1, MessageFormatter.LOAD_CELL_COUNT + 1):
+        steps.append((f"로드셀 {cell}", MessageFormatter.get_loadcell_value_message(cell)))
+    return steps
+
+
+def evaluate_step(step, request, response, result):
+    """
+    Fill in a step from the board's response
+    :param step: StepResult to update
+    :param request: request frame
+    :param response: response frame, or None if the request failed
+    :param result: BoardResult collecting load cell values
+    """
+    if response is None:
+        return
+
+    step.response = response.hex(' ')
+    step.passed = True
+    if request[1] == MessageFormatter.LOAD_CELL_COMMAND:
+        step.value = MessageFormatter.parse_load_cell_response(response)
+        step.passed = math.isfinite(step.value)
+        result.load_cells[request[2] + 1] = step.value
+    elif request[1] == MessageFormatter.SENSOR_COMMAND:
+        result.last_sensor = step.response
+
+
+def steps_procedure(steps, result):
+    """
+    Procedure (see procedure.py) sending each (name, request) step on its own and
+    appending a StepResult per step to result
+    """
+    for name, request in steps:
+        step = StepResult(name, request.hex(' '))
+        exchange = Exchange([request])
+        yield exchange
+        if exchange.responses:
+            step.elapsed_ms = exchange.elapsed[0] * 1000
+        evaluate_step(step, request, exchange.responses[0] if exchange.responses else None, result)
+        result.steps.append(step)
+        if not step.passed:
+            logger.bind(board=result.name).warning(f"[{result.name}] {name} 실패")
+
+
+def board_result_to_dict(result):
+    report = asdict(result)
+    report["passed"] = result.passed
+    return report
@@ -0,0 +1,281 @@
+"""
+Multi-sample load-cell acquisition.
+
+A single 0xB4 reading cannot tell a good cell from a noisy or drifting one.
+acquire_load_cells() sweeps the selected cells at a fixed rate. For every cell it keeps
+running statistics, each updated in one numerically stable pass:
+
+- mean, variance and min/max (Welford)
+- the least-squares slope of the value against time, for drift
+- a count of outliers, which are left out of the statistics
+
+A cell is dropped from further sweeps as soon as its verdict is certain, i.e. the
+confidence interval of its mean (and of its drift, when limited) lies entirely inside or
+entirely outside the limits. Steady cells therefore finish after `min_samples` sweeps, and
+only the doubtful ones use up the full `samples`.
+
+The statistics are plain Python lists updated cell by cell; numpy is not a dependency of
+this tool, and with at most 16 cells per sweep the loop costs microseconds next to the
+board round trip.
+"""
+import math
+import time
+from dataclasses import dataclass
+
+from certification.board_result import StepResult
+from certification.procedure import Exchange, Pause, run_sync
+from message_formatter.message_formatter import MessageFormatter
+
+
+@dataclass
+class AcquisitionSettings:
+    samples: int = 50  # most sweeps per cell
+    min_samples: int = 5  # sweeps before a cell may be decided early
+    rate_hz: float = 20.0
+    low: float = -math.inf
+    high: float = math.inf
+    max_stdev: float = math.inf  # noise limit
+    max_drift: float = math.inf  # units per second
+    outlier_sigma: float = 4.0  # readings this many standard deviations off the mean are outliers
+    max_outliers: int = 2
+    confidence_z: float = 3.0  # width of the confidence intervals, in standard errors
+
+
+@dataclass
+class LoadCellVerdict:
+    cell: int
+    samples: int
+    mean: float
+    stdev: float
+    minimum: float
+    maximum: float
+    drift: float  # units per second
+    outliers: int
+    passed: bool
+    decided_early: bool
+    message: str = None
+
+
+class LoadCellStatistics:
+    """
+    Running statistics for several cells, kept as parallel lists indexed by slot. Each
+    add_sweep call loops over the sweep's cells in Python; it is not vectorised.
+    """
+
+    def __init__(self, cells):
+        self.cells = list(cells)
+        self.slots = {cell: slot for slot, cell in enumerate(self.cells)}
+        size = len(self.cells)
+        self.count = [0] * size
+        self.mean = [0.0] * size
+        self.m2 = [0.0] * size
+        self.minimum = [math.inf] * size
+        self.maximum = [-math.inf] * size
+        self.time_mean = [0.0] * size
+        self.time_m2 = [0.0] * size
+        self.co_moment = [0.0] * size  # sum of (t - mean t)(x - mean x)
+        self.outliers = [0] * size
+
+    def add_sweep(self, cells, values, timestamp, outlier_sigma=math.inf, min_samples=2):
+        """
+        Update each cell's statistics with its reading, one cell after another
+        :param cells: load cell numbers, in the order of values
+        :param values: one reading per cell
+        :param timestamp: seconds, shared by the whole sweep
+        :param outlier_sigma: readings further than this many standard deviations from the
+                              mean are counted as outliers, once min_samples are in
+        """
+        count, mean, m2 = self.count, self.mean, self.m2
+        for cell, value in zip(cells, values):
+            slot = self.slots[cell]
+            n = count[slot]
+            if not math.isfinite(value):
+                self.outliers[slot] += 1
+                continue
+            if n >= max(2, min_samples):
+                stdev = math.sqrt(m2[slot] / (n - 1))
+                if stdev > 0 and abs(value - mean[slot]) > outlier_sigma * stdev:
+                    self.outliers[slot] += 1
+                    continue
+
+            n += 1
+            count[slot] = n
+            delta = value - mean[slot]
+            mean[slot] += delta / n
+            m2[slot] += delta * (value - mean[slot])
+            time_delta = timestamp - self.time_mean[slot]
+            self.time_mean[slot] += time_delta / n
+            self.time_m2[slot] += time_delta * (timestamp - self.time_mean[slot])
+            self.co_moment[slot] += time_delta * (value - mean[slot])
+            if value < self.minimum[slot]:
+                self.minimum[slot] = value
+            if value > self.maximum[slot]:
+                self.maximum[slot] = value
+
+    def stdev(self, slot):
+        n = self.count[slot]
+        return math.sqrt(self.m2[slot] / (n - 1)) if n > 1 else 0.0
+
+    def drift(self, slot):
+        """
+        :return: (slope in units per second, its standard error)
+        """
+        n, time_m2 = self.count[slot], self.time_m2[slot]
+        if n < 3 or time_m2 <= 0:
+            return 0.0, math.inf
+        slope = self.co_moment[slot] / time_m2
+        residual = max(0.0, self.m2[slot] - slope * self.co_moment[slot]) / (n - 2)
+        return slope, math.sqrt(residual / time_m2)
+
+    def verdict(self, cell, settings, final=False):
+        """
+        :param final: no more samples will come, so decide on the point estimates
+        :return: LoadCellVerdict, or None while the cell is still undecided
+        """
+        slot = self.slots[cell]
+        n = self.count[slot]
+        stdev = self.stdev(slot)
+        slope, slope_error = self.drift(slot)
+        z = settings.confidence_z
+        margin = z * stdev / math.sqrt(n) if n else math.inf
+
+        def result(passed, message):
+            return LoadCellVerdict(cell, n, self.mean[slot] if n else math.nan, stdev, self.minimum[slot],
+                                   self.maximum[slot], slope, self.outliers[slot], passed, not final, message)
+
+        if self.outliers[slot] > settings.max_outliers:
+            return result(False, f"이상치 {self.outliers[slot]}회")
+        if not final and n < settings.min_samples:
+            return None
+        if not n:
+            return result(False, "유효한 값 없음")
+
+        mean = self.mean[slot]
+        if mean + margin < settings.low or mean - margin > settings.high:
+            return result(False, f"범위 초과 ({settings.low:g} ~ {settings.high:g})")
+        if final:
+            if not settings.low <= mean <= settings.high:
+                return result(False, f"범위 초과 ({settings.low:g} ~ {settings.high:g})")
+            if stdev > settings.max_stdev:
+                return result(False, f"노이즈 초과 (σ {stdev:.3g} > {settings.max_stdev:g})")
+            if abs(slope) > settings.max_drift:
+                return result(False, f"드리프트 초과 ({slope:+.3g}/s)")
+            return result(True, None)
+
+        # Large-sample bounds on sigma: the sample standard deviation has a relative error of about 1/sqrt(2(n - 1))
+        relative = z / math.sqrt(2 * (n - 1)) if n > 1 else math.inf
+        if stdev / (1 + relative) > settings.max_stdev:
+            return result(False, f"노이즈 초과 (σ {stdev:.3g} > {settings.max_stdev:g})")
+        if abs(slope) - z * slope_error > settings.max_drift:
+            return result(False, f"드리프트 초과 ({slope:+.3g}/s)")
+        inside = settings.low <= mean - margin and mean + margin <= settings.high
+        quiet = settings.max_stdev == math.inf or (relative < 1 and stdev / (1 - relative) <= settings.max_stdev)
+        if inside and quiet and abs(slope) + z * slope_error <= settings.max_drift:
+            return result(True, None)
+        return None
+
+
+class LoadCellAcquisition:
+    """
+    Sweep-by-sweep state of one acquisition, for callers that schedule the sweeps themselves
+    (the GUI sends each sweep through the dispatcher so other commands can run in between)
+    """
+
+    def __init__(self, cells, settings):
+        self.cells = list(cells)
+        self.settings = settings
+        self.statistics = LoadCellStatistics(self.cells)
+        self.verdicts = {}
+        self.pending = list(self.cells)  # cells still undecided
+        self.sweeps = 0
+        self.start = time.perf_counter()
+
+    @property
+    def done(self):
+        return not self.pending or self.sweeps >= self.settings.samples
+
+    def requests(self):
+        """
+        :return: request frames for the next sweep
+        """
+        return [MessageFormatter.get_loadcell_value_message(cell) for cell in self.pending]
+
+    def add_sweep(self, responses):
+        """
+        Fold the responses to requests() into the statistics and decide what can be decided
+        :return: (cells, values) of the sweep
+        """
+        cells = self.pending
+        values = MessageFormatter.parse_load_cell_responses(responses)
+        settings = self.settings
+        self.statistics.add_sweep(cells, values, time.perf_counter() - self.start, settings.outlier_sigma,
+                                  settings.min_samples)
+        self.sweeps += 1
+        for cell in cells:
+            verdict = self.statistics.verdict(cell, settings)
+            if verdict is not None:
+                self.verdicts[cell] = verdict
+        self.pending = [cell for cell in cells if cell not in self.verdicts]
+        return cells, values
+
+    def finish(self, lost=False):
+        """
+        :param lost: the board stopped answering, so undecided cells fail
+        :return: list of LoadCellVerdict in the order of cells
+        """
+        for cell in self.pending:
+            self.verdicts[cell] = self.statistics.verdict(cell, self.settings, final=True)
+            if lost:
+                self.verdicts[cell].passed = False
+                self.verdicts[cell].message = "응답 없음"
+        self.pending = []
+        return [self.verdicts[cell] for cell in self.cells]
+
+
+def acquisition_procedure(cells, settings, on_sweep=None):
+    """
+    Procedure (see procedure.py) sampling cells until each has a certain verdict or
+    settings.samples sweeps are done
+    :param cells: load cell numbers, 1-based
+    :param settings: AcquisitionSettings
+    :param on_sweep: optional callback(cells, values) after every sweep
+    :return: list of LoadCellVerdict in the order of cells
+    """
+    acquisition = LoadCellAcquisition(cells, settings)
+    period = 1.0 / settings.rate_hz if settings.rate_hz > 0 else 0.0
+    next_sweep = acquisition.start
+    while not acquisition.done:
+        exchange = Exchange(acquisition.requests())
+        yield exchange
+        if exchange.responses is None:
+            return acquisition.finish(lost=True)
+        swept = acquisition.add_sweep(exchange.responses)
+        if on_sweep is not None:
+            on_sweep(*swept)
+
+        next_sweep += period
+        delay = next_sweep - time.perf_counter()
+        if delay > 0 and not acquisition.done:
+            yield Pause(delay)
+    return acquisition.finish()
+
+
+def acquire_load_cells(tcp_client, cells, settings, on_sweep=None):
+    """
+    Blocking acquisition_procedure over a connected TcpClient
+    :return: list of LoadCellVerdict in the order of cells
+    """
+    return run_sync(acquisition_procedure(cells, settings, on_sweep), tcp_client)
+
+
+def verdict_step(verdict):
+    step = StepResult(f"로드셀 {verdict.cell} ({verdict.samples}회)",
+                      MessageFormatter.get_loadcell_value_message(verdict.cell).hex(' '), passed=verdict.passed)
+    if verdict.samples:
+        step.value = verdict.mean
+        summary = (f"평균 {verdict.mean:.3f}, σ {verdict.stdev:.3g}, {verdict.minimum:.3f} ~ {verdict.maximum:.3f}, "
+                   f"드리프트 {verdict.drift:+.3g}/s")
+        step.message = f"{verdict.message}: {summary}" if verdict.message else summary
+    else:
+        step.message = verdict.message
+    return step
@@ -0,0 +1,186 @@
+"""
+Relay and motor loopback timing.
+
+On the certification fixture relay n is wired back to sensor n, and internal motor m
+drives the limit switch on sensor 8 + m (CW onto the switch, CCW off it). For every
+channel the output is switched on and off `trials` times. After each switch the sensor
+mask is polled back to back until the sensor follows, and the latency is checked
+against the channel's limit.
+
+Timing: the board executes a request and reads its inputs somewhere within the request's
+round trip, so the command and every sensor sample are stamped at the midpoint of their
+round trips. The edge is placed halfway between the last sample that did not show it
+(or the command) and the first one that did. The half gap between them is reported as
+the resolution.
+"""
+import math
+import statistics
+from dataclasses import dataclass, field
+
+from Log.logger_config import logger
+from certification.board_result import StepResult
+from certification.procedure import Exchange, run_sync
+from message_formatter.message_formatter import MessageFormatter
+from message_formatter.sensor_decoder import response_sensor_mask
+
+DEFAULT_RELAY_LIMIT_MS = 20.0
+DEFAULT_MOTOR_LIMIT_MS = 500.0
+LIMIT_SENSOR_OFFSET = 8  # internal motor m -> sensor 8 + m
+
+ON = "ON"
+OFF = "OFF"
+
+
+@dataclass
+class LoopbackChannel:
+    name: str
+    sensor: int
+    actuate: bytes  # request that turns the sensor on
+    release: bytes  # request that turns it off again
+    limit_ms: float
+
+
+@dataclass
+class LoopbackTest:
+    channels: list
+    trials: int = 5
+    timeout: float = 1.0  # seconds to wait for one edge
+
+
+@dataclass
+class ActuationTiming:
+    channel: str
+    edge: str
+    limit_ms: float
+    request: bytes
+    latencies_ms: list = field(default_factory=list)
+    resolution_ms: float = 0.0  # worst half gap between the samples around an edge
+    failures: int = 0  # trials where the sensor did not follow within the timeout
+
+    @property
+    def name(self):
+        return f"{self.channel} {self.edge}"
+
+    @property
+    def passed(self):
+        return not self.failures and bool(self.latencies_ms) and max(self.latencies_ms) <= self.limit_ms
+
+    def summary(self):
+        latencies = sorted(self.latencies_ms)
+        summary = {"count": len(latencies), "failures": self.failures, "limit_ms": self.limit_ms,
+                   "resolution_ms": self.resolution_ms, "passed": self.passed}
+        if latencies:
+            summary.update(min_ms=latencies[0], p50_ms=_percentile(latencies, 0.50),
+                           p95_ms=_percentile(latencies, 0.95), max_ms=latencies[-1],
+                           mean_ms=statistics.fmean(latencies))
+        return summary
+
+
+def _percentile(sorted_values, fraction):
+    # Nearest rank, so small trial counts report an observed latency
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def default_channels(relay_limit_ms=DEFAULT_RELAY_LIMIT_MS, motor_limit_ms=DEFAULT_MOTOR_LIMIT_MS):
+    """
+    :return: list of LoopbackChannel for every relay and internal motor on the fixture
+    """
+    channels = [LoopbackChannel(f"릴레이 {relay}", relay, MessageFormatter.relay_on_message(relay),
+                                MessageFormatter.relay_off_message(relay), relay_limit_ms)
+                for relay in range(1, MessageFormatter.RELAY_COUNT + 1)]
+    for motor, number in MessageFormatter.INTERNAL_MOTOR_PARAMETER.items():
+        channels.append(LoopbackChannel(motor, LIMIT_SENSOR_OFFSET + number,
+                                        MessageFormatter.internal_motor_cw_message(motor),
+                                        MessageFormatter.internal_motor_ccw_message(motor), motor_limit_ms))
+    return channels
+
+
+def measure_edge(request_frame, sensor, state, timeout):
+    """
+    Procedure (see procedure.py): send request_frame, then poll the sensor mask until sensor reads state
+    :return: (latency ms, resolution ms), or None if the sensor did not follow or the board stopped answering
+    """
+    sensor_command = MessageFormatter.sensor_message()
+    bit = 1 << (sensor - 1)
+    expected = bit if state else 0
+
+    command = Exchange([request_frame])
+    yield command
+    if not command.responses:
+        return None
+    commanded = previous = command.sent + command.elapsed[0] / 2
+    while True:
+        poll = Exchange([sensor_command])
+        yield poll
+        if not poll.responses:
+            return None
+        received = poll.sent + poll.elapsed[0]
+        sampled = poll.sent + poll.elapsed[0] / 2
+        if response_sensor_mask(poll.responses[0]) & bit == expected:
+            edge = (previous + sampled) / 2
+            return (edge - commanded) * 1000, (sampled - previous) / 2 * 1000
+        if received - commanded > timeout:
+            return None
+        previous = sampled
+
+
+def loopback_procedure(test, result=None):
+    """
+    Procedure (see procedure.py) measuring the actuation latency of every channel in test
+    :param test: LoopbackTest
+    :param result: optional BoardResult that receives a StepResult and a summary per edge
+    :return: list of ActuationTiming, ON and OFF per channel
+    """
+    timings = []
+    for channel in test.channels:
+        on = ActuationTiming(channel.name, ON, channel.limit_ms, channel.actuate)
+        off = ActuationTiming(channel.name, OFF, channel.limit_ms, channel.release)
+        # Start from a released output; this first edge is not timed
+        if (yield from measure_edge(channel.release, channel.sensor, 0, test.timeout)) is None:
+            off.failures = 1  # stuck on; ON cannot be timed either
+        else:
+            for _ in range(test.trials):
+                for timing, request_frame, state in ((on, channel.actuate, 1), (off, channel.release, 0)):
+                    measured = yield from measure_edge(request_frame, channel.sensor, state, test.timeout)
+                    if measured is None:
+                        timing.failures += 1
+                        continue
+                    latency, resolution = measured
+                    timing.latencies_ms.append(latency)
+                    timing.resolution_ms = max(timing.resolution_ms, resolution)
+                if on.failures or off.failures:
+                    break  # a stuck channel would only repeat the same timeout
+        timings.extend((on, off))
+        if result is not None:
+            for timing in (on, off):
+                result.steps.append(actuation_step(timing))
+                result.actuation[timing.name] = timing.summary()
+                if not timing.passed:
+                    logger.bind(board=result.name).warning(f"[{result.name}] {timing.name} 지연 실패: "
+                                                           f"{result.steps[-1].message}")
+    return timings
+
+
+def run_loopback(tcp_client, test, result=None):
+    """
+    Measure actuation latency of every channel in test
+    :param tcp_client: connected TcpClient; nothing else may use it meanwhile
+    :param test: LoopbackTest
+    :param result: optional BoardResult that receives a StepResult and a summary per edge
+    :return: list of ActuationTiming, ON and OFF per channel
+    """
+    return run_sync(loopback_procedure(test, result), tcp_client)
+
+
+def actuation_step(timing):
+    summary = timing.summary()
+    step = StepResult(f"{timing.name} 지연", timing.request.hex(' '), passed=timing.passed)
+    if summary["count"]:
+        step.elapsed_ms = step.value = summary["max_ms"]
+        step.message = (f"p50 {summary['p50_ms']:.1f} / p95 {summary['p95_ms']:.1f} / max {summary['max_ms']:.1f} ms "
+                        f"(±{timing.resolution_ms:.1f}, 한계 {timing.limit_ms:g} ms)")
+    if timing.failures:
+        step.message = f"센서 응답 없음 {timing.failures}회" + (f", {step.message}" if step.message else "")
+    elif not summary["count"]:
+        step.message = "측정 안 됨"
+    return step
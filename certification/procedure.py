@@ -0,0 +1,79 @@
+"""
+Certification procedures written once for both transports.
+
+A procedure is a generator that yields what it needs from the board and gets it back in
+the yielded object:
+
+    Exchange(requests)  the requests are pipelined and the driver fills in responses
+                        (None if the board did not answer), sent and elapsed
+    Pause(seconds)      the driver sleeps
+
+run_sync drives a procedure over a blocking TcpClient (GUI dispatcher thread, scripts),
+run_async over an AsyncBoardClient (MultiBoardEngine), so sequences, the loopback test
+and load-cell sampling behave the same on both.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Exchange:
+    requests: list
+    responses: list = None  # one frame per request, or None when the board did not answer
+    sent: float = 0.0  # time.perf_counter() just before the send
+    elapsed: list = field(default_factory=list)  # seconds from the send to each response
+
+
+@dataclass
+class Pause:
+    seconds: float
+
+
+def request(message):
+    """
+    Single request, for use as `response = yield from request(message)`
+    :return: response frame, or None
+    """
+    exchange = Exchange([message])
+    yield exchange
+    return exchange.responses[0] if exchange.responses else None
+
+
+def run_sync(procedure, tcp_client):
+    """
+    :param procedure: procedure generator
+    :param tcp_client: connected TcpClient
+    :return: the procedure's return value
+    """
+    try:
+        step = next(procedure)
+        while True:
+            if isinstance(step, Pause):
+                if step.seconds > 0:
+                    time.sleep(step.seconds)
+            else:
+                step.sent = time.perf_counter()
+                step.responses = tcp_client.send_batch(step.requests, elapsed=step.elapsed)
+            step = procedure.send(None)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_async(procedure, client):
+    """
+    :param procedure: procedure generator
+    :param client: connected AsyncBoardClient
+    :return: the procedure's return value
+    """
+    try:
+        step = next(procedure)
+        while True:
+            if isinstance(step, Pause):
+                await asyncio.sleep(max(0.0, step.seconds))
+            else:
+                step.sent = time.perf_counter()
+                step.responses = await client.send_batch(step.requests, elapsed=step.elapsed)
+            step = procedure.send(None)
+    except StopIteration as stop:
+        return stop.value
@@ -0,0 +1,366 @@
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from Log.logger_config import LOG_DIRECTORY, logger
+
+DEFAULT_DB_PATH = os.path.join(LOG_DIRECTORY, "results.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    session_key TEXT NOT NULL UNIQUE,
+    source TEXT,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS boards (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    family TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    board_id INTEGER NOT NULL REFERENCES boards(id),
+    started REAL NOT NULL,
+    elapsed REAL,
+    connected INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    sequence TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(id),
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    board_id INTEGER NOT NULL REFERENCES boards(id),
+    time REAL NOT NULL,
+    name TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    elapsed_ms REAL,
+    value REAL,
+    message TEXT,
+    request TEXT,
+    response TEXT
+);
+CREATE TABLE IF NOT EXISTS load_cells (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    board_id INTEGER NOT NULL REFERENCES boards(id),
+    time REAL NOT NULL,
+    cell INTEGER NOT NULL,
+    value REAL
+);
+CREATE TABLE IF NOT EXISTS sensor_events (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    board_id INTEGER NOT NULL REFERENCES boards(id),
+    time REAL NOT NULL,
+    mask INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS boards_family ON boards(family);
+CREATE INDEX IF NOT EXISTS runs_board_time ON runs(board_id, started);
+CREATE INDEX IF NOT EXISTS runs_time ON runs(started);
+CREATE INDEX IF NOT EXISTS steps_board_time ON steps(board_id, time);
+CREATE INDEX IF NOT EXISTS steps_run ON steps(run_id);
+CREATE INDEX IF NOT EXISTS steps_failed_board_time ON steps(board_id, time) WHERE passed = 0;
+CREATE INDEX IF NOT EXISTS steps_failed_time ON steps(time) WHERE passed = 0;
+CREATE INDEX IF NOT EXISTS load_cells_board_time ON load_cells(board_id, time);
+CREATE INDEX IF NOT EXISTS sensor_events_board_time ON sensor_events(board_id, time);
+"""
+
+
+def connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL with synchronous=NORMAL only fsyncs at checkpoints; a power cut loses the last
+    # batches at most, never corrupts the database
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    return connection
+
+
+def migrate(connection):
+    """
+    Bring a database created by an older version up to SCHEMA
+    """
+    columns = {row[1]: row for row in connection.execute("PRAGMA table_info(load_cells)")}
+    if columns["value"][3]:
+        # load_cells.value used to be NOT NULL, which rejected NaN readings; SQLite cannot
+        # drop a constraint in place, so copy the table
+        connection.executescript("""
+            BEGIN;
+            ALTER TABLE load_cells RENAME TO load_cells_old;
+            CREATE TABLE load_cells (
+                id INTEGER PRIMARY KEY,
+                session_id INTEGER NOT NULL REFERENCES sessions(id),
+                board_id INTEGER NOT NULL REFERENCES boards(id),
+                time REAL NOT NULL,
+                cell INTEGER NOT NULL,
+                value REAL
+            );
+            INSERT INTO load_cells SELECT * FROM load_cells_old;
+            DROP TABLE load_cells_old;
+            CREATE INDEX IF NOT EXISTS load_cells_board_time ON load_cells(board_id, time);
+            COMMIT;
+        """)
+
+
+def _finite_or_none(value):
+    return value if value is not None and math.isfinite(value) else None
+
+
+class ResultsStore:
+    """
+    SQLite store of sessions, boards, certification runs, steps, load-cell readings and
+    sensor events.
+
+    record_* calls only enqueue; one writer thread owns the write connection and commits
+    whatever is queued in a single transaction every flush_interval (or batch_size
+    operations), so callers never wait on the disk. Every operation runs in its own
+    savepoint, so one rejected row only loses its own operation, not the whole batch. Queries use their own connection and
+    read concurrently thanks to WAL.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=1000, flush_interval=0.25):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = connect(path)
+        connection.executescript(SCHEMA)
+        migrate(connection)
+        connection.close()
+
+        self._queue = queue.Queue()
+        self._session_ids = {}
+        self._board_ids = {}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Writer side
+
+    def start_session(self, session_key, source=None, started=None):
+        self._queue.put((self._insert_session, (session_key, source, started or time.time())))
+
+    def register_board(self, board, family=None):
+        self._queue.put((self._upsert_board, (board, family)))
+
+    def record_board_result(self, session_key, result, sequence=None, started=None):
+        """
+        :param result: BoardResult of one certification run
+        """
+        started = started or time.time() - result.elapsed
+        self._queue.put((self._insert_run, (session_key, result, sequence, started)))
+
+    def record_step(self, session_key, board, step, timestamp=None):
+        """
+        Step outside a certification run, e.g. an operator command from the GUI
+        :param step: StepResult
+        """
+        self._queue.put((self._insert_steps, (session_key, board, None, [(timestamp or time.time(), step)])))
+
+    def record_load_cells(self, session_key, board, values, first_index=1, timestamp=None):
+        timestamp = timestamp or time.time()
+        rows = [(timestamp, index, value) for index, value in enumerate(values, start=first_index)]
+        self._queue.put((self._insert_load_cells, (session_key, board, rows)))
+
+    def record_sensor_event(self, session_key, board, mask, timestamp=None):
+        self._queue.put((self._insert_sensor_events, (session_key, board, [(timestamp or time.time(), mask)])))
+
+    def flush(self, timeout=None):
+        """
+        Block until everything queued so far is committed
+        """
+        done = threading.Event()
+        self._queue.put((None, done))
+        return done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """
+        Commit what is queued and stop the writer thread
+        :param timeout: most seconds to wait for the writer; it is a daemon thread, so a writer
+                        stuck on a locked database does not keep the process alive
+        :return: True if the writer finished
+        """
+        if self._thread is None:
+            return True
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.error(f"결과 저장 종료 시간 초과 ({self._queue.qsize()}건 대기)")
+                return False
+        self._thread = None
+        return True
+
+    def _run(self):
+        connection = connect(self.path)
+        cursor = connection.cursor()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters = []
+            try:
+                with connection:
+                    cursor.execute("BEGIN")
+                    for item in batch:
+                        if item is None:
+                            running = False
+                            break
+                        operation, args = item
+                        if operation is None:
+                            waiters.append(args)
+                        else:
+                            self._apply(cursor, operation, args)
+            except Exception as e:
+                # The writer thread must outlive any batch; flush() and close() wait on it
+                logger.error(f"결과 저장 실패 ({len(batch)}건): {e}")
+                # ids cached during a rolled back transaction may not exist
+                self._session_ids.clear()
+                self._board_ids.clear()
+            finally:
+                for done in waiters:
+                    done.set()
+        connection.close()
+
+    def _apply(self, cursor, operation, args):
+        cursor.execute("SAVEPOINT operation")
+        try:
+            operation(cursor, *args)
+        except Exception as e:
+            # A bad record (database error or malformed value) only loses its own operation
+            cursor.execute("ROLLBACK TO operation")
+            logger.error(f"결과 저장 실패 ({operation.__name__.lstrip('_')}): {e}")
+            # ids cached inside the rolled back savepoint may not exist
+            self._session_ids.clear()
+            self._board_ids.clear()
+        finally:
+            cursor.execute("RELEASE operation")
+
+    def _insert_session(self, cursor, session_key, source, started):
+        cursor.execute("INSERT OR IGNORE INTO sessions (session_key, source, started) VALUES (?, ?, ?)",
+                       (session_key, source, started))
+
+    def _session_id(self, cursor, session_key):
+        session_id = self._session_ids.get(session_key)
+        if session_id is None:
+            self._insert_session(cursor, session_key, None, time.time())
+            session_id = cursor.execute("SELECT id FROM sessions WHERE session_key = ?", (session_key,)).fetchone()[0]
+            self._session_ids[session_key] = session_id
+        return session_id
+
+    def _upsert_board(self, cursor, board, family):
+        cursor.execute("INSERT INTO boards (name, family) VALUES (?, ?) "
+                       "ON CONFLICT(name) DO UPDATE SET family = COALESCE(excluded.family, family)", (board, family))
+
+    def _board_id(self, cursor, board):
+        board_id = self._board_ids.get(board)
+        if board_id is None:
+            cursor.execute("INSERT OR IGNORE INTO boards (name) VALUES (?)", (board,))
+            board_id = cursor.execute("SELECT id FROM boards WHERE name = ?", (board,)).fetchone()[0]
+            self._board_ids[board] = board_id
+        return board_id
+
+    def _insert_run(self, cursor, session_key, result, sequence, started):
+        session_id = self._session_id(cursor, session_key)
+        board_id = self._board_id(cursor, result.name)
+        cursor.execute("INSERT INTO runs (session_id, board_id, started, elapsed, connected, passed, sequence) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (session_id, board_id, started, result.elapsed, result.connected, result.passed, sequence))
+        run_id = cursor.lastrowid
+        # Steps carry no timestamps of their own; spread them by their elapsed times
+        timestamps = []
+        step_time = started
+        for step in result.steps:
+            timestamps.append(step_time)
+            step_time += (step.elapsed_ms or 0.0) / 1000
+        self._insert_steps(cursor, session_key, result.name, run_id, zip(timestamps, result.steps))
+        self._insert_load_cells(cursor, session_key, result.name,
+                                [(started, cell, value) for cell, value in result.load_cells.items()])
+
+    def _insert_steps(self, cursor, session_key, board, run_id, timed_steps):
+        session_id = self._session_id(cursor, session_key)
+        board_id = self._board_id(cursor, board)
+        cursor.executemany(
+            "INSERT INTO steps (run_id, session_id, board_id, time, name, passed, elapsed_ms, value, message, "
+            "request, response) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, session_id, board_id, timestamp, step.name, step.passed, step.elapsed_ms,
+              _finite_or_none(step.value), step.message, step.request, step.response)
+             for timestamp, step in timed_steps])
+
+    def _insert_load_cells(self, cursor, session_key, board, rows):
+        session_id = self._session_id(cursor, session_key)
+        board_id = self._board_id(cursor, board)
+        cursor.executemany("INSERT INTO load_cells (session_id, board_id, time, cell, value) VALUES (?, ?, ?, ?, ?)",
+                           [(session_id, board_id, timestamp, cell, _finite_or_none(value))
+                            for timestamp, cell, value in rows])
+
+    def _insert_sensor_events(self, cursor, session_key, board, rows):
+        session_id = self._session_id(cursor, session_key)
+        board_id = self._board_id(cursor, board)
+        cursor.executemany("INSERT INTO sensor_events (session_id, board_id, time, mask) VALUES (?, ?, ?, ?)",
+                           [(session_id, board_id, timestamp, mask) for timestamp, mask in rows])
+
+    # Reader side
+
+    def query(self, sql, parameters=()):
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            connection.row_factory = sqlite3.Row
+            return [dict(row) for row in connection.execute(sql, parameters)]
+        finally:
+            connection.close()
+
+    def failures(self, board=None, family=None, since=None, until=None, limit=1000):
+        """
+        Failed steps, newest first, e.g. failures(family="A-rev2", since=time.time() - 7 * 86400)
+        """
+        conditions = ["steps.passed = 0"]
+        parameters = []
+        if board is not None:
+            conditions.append("steps.board_id = (SELECT id FROM boards WHERE name = ?)")
+            parameters.append(board)
+        if family is not None:
+            conditions.append("steps.board_id IN (SELECT id FROM boards WHERE family = ?)")
+            parameters.append(family)
+        if since is not None:
+            conditions.append("steps.time >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("steps.time < ?")
+            parameters.append(until)
+        parameters.append(limit)
+        return self.query(
+            "SELECT boards.name AS board, boards.family, sessions.session_key AS session, steps.time, steps.name, "
+            "steps.elapsed_ms, steps.value, steps.message, steps.request, steps.response "
+            "FROM steps JOIN boards ON boards.id = steps.board_id JOIN sessions ON sessions.id = steps.session_id "
+            f"WHERE {' AND '.join(conditions)} ORDER BY steps.time DESC LIMIT ?", parameters)
+
+    def runs(self, board=None, since=None, limit=1000):
+        conditions = ["1"]
+        parameters = []
+        if board is not None:
+            conditions.append("runs.board_id = (SELECT id FROM boards WHERE name = ?)")
+            parameters.append(board)
+        if since is not None:
+            conditions.append("runs.started >= ?")
+            parameters.append(since)
+        parameters.append(limit)
+        return self.query(
+            "SELECT boards.name AS board, sessions.session_key AS session, runs.started, runs.elapsed, "
+            "runs.connected, runs.passed, runs.sequence "
+            "FROM runs JOIN boards ON boards.id = runs.board_id JOIN sessions ON sessions.id = runs.session_id "
+            f"WHERE {' AND '.join(conditions)} ORDER BY runs.started DESC LIMIT ?", parameters)
@@ -0,0 +1,306 @@
+"""
+Scripted certification sequences.
+
+A sequence is a JSON (or YAML, with PyYAML installed) document:
+
+    {
+      "name": "relay loopback",
+      "stop_on_failure": true,
+      "steps": [
+        {"type": "relay", "relay": [1, 2], "state": "on"},
+        {"type": "wait_sensor", "sensors": {"1": "on", "2": "on"}, "timeout": 1.0},
+        {"type": "motor", "motor": "Internal Motor 1", "direction": "cw"},
+        {"type": "load_cell", "cells": "all", "min": 50, "max": 150},
+        {"type": "load_cell", "cells": [1, 2], "min": 95, "max": 105, "samples": 50, "max_stdev": 0.2},
+        {"type": "relay", "relay": [1, 2], "state": "off"}
+      ]
+    }
+
+compile_sequence turns it into an ExecutionPlan: consecutive commands are grouped into
+pipelined batches (the board answers in request order, so they stay ordered), and every
+wait_sensor step is a barrier between batches. A load_cell step with "samples" (optionally
+"rate", "max_stdev", "max_drift") is a multi-sample acquisition, see load_cell_stats.py,
+and is a barrier too.
+"""
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field
+
+from Log.logger_config import logger
+from certification.board_result import StepResult
+from certification.load_cell_stats import AcquisitionSettings, acquisition_procedure, verdict_step
+from certification.procedure import Exchange, request, run_sync
+from message_formatter.message_formatter import MessageFormatter
+from message_formatter.sensor_decoder import response_sensor_mask
+
+COMMAND = "command"
+LOAD_CELL = "load_cell"
+LOAD_CELL_SAMPLES = "load_cell_samples"
+WAIT_SENSOR = "wait_sensor"
+BARRIERS = (WAIT_SENSOR, LOAD_CELL_SAMPLES)
+
+SENSOR_COUNT = 16
+MAX_BATCH = 32
+
+
+@dataclass
+class PlanStep:
+    name: str
+    kind: str
+    request: bytes = None
+    low: float = None  # load cell limits
+    high: float = None
+    sensor_mask: int = 0  # sensors that must match
+    sensor_state: int = 0  # their expected states
+    timeout: float = 0.0
+    cells: list = None  # multi-sample load cell acquisition
+    acquisition: AcquisitionSettings = None
+
+
+@dataclass
+class ExecutionPlan:
+    name: str
+    stages: list = field(default_factory=list)  # lists of PlanStep; barrier steps are stages of their own
+    stop_on_failure: bool = True
+
+    @property
+    def steps(self):
+        return [step for stage in self.stages for step in stage]
+
+
+def load_sequence(path):
+    """
+    :return: sequence dict read from a .json, .yaml or .yml file
+    """
+    with open(path, encoding="utf-8") as sequence_file:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError(f"{path}: YAML sequences need PyYAML (pip install pyyaml)")
+            try:
+                return yaml.safe_load(sequence_file)
+            except yaml.YAMLError as e:
+                raise ValueError(f"{path}: {e}")
+        return json.load(sequence_file)
+
+
+def _state(value, where):
+    if isinstance(value, str):
+        value = value.lower()
+    if value in ("on", 1, True):
+        return 1
+    if value in ("off", 0, False):
+        return 0
+    raise ValueError(f"{where}: state must be on or off, got {value!r}")
+
+
+def _numbers(value, count, where):
+    if value == "all":
+        return list(range(1, count + 1))
+    numbers = value if isinstance(value, list) else [value]
+    for number in numbers:
+        if not isinstance(number, int) or isinstance(number, bool) or not 1 <= number <= count:
+            raise ValueError(f"{where}: expected 1-{count}, got {number!r}")
+    return numbers
+
+
+def _real(entry, key, default, where):
+    value = entry.get(key, default)
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or math.isnan(value):
+        raise ValueError(f"{where}: {key} must be a number, got {value!r}")
+    return float(value)
+
+
+def _limits(entry, where):
+    low = _real(entry, "min", -math.inf, where)
+    high = _real(entry, "max", math.inf, where)
+    if low > high:
+        raise ValueError(f"{where}: min {low:g} is above max {high:g}")
+    return low, high
+
+
+def _compile_step(entry, where):
+    if not isinstance(entry, dict):
+        raise ValueError(f"{where}: a step must be a mapping, got {entry!r}")
+    kind = entry.get("type")
+    name = entry.get("name")
+
+    if kind == "relay":
+        on = _state(entry.get("state"), where)
+        return [PlanStep(name or f"릴레이 {relay} {'ON' if on else 'OFF'}", COMMAND,
+                         MessageFormatter.relay_on_message(relay) if on else MessageFormatter.relay_off_message(relay))
+                for relay in _numbers(entry.get("relay"), MessageFormatter.RELAY_COUNT, where)]
+
+    if kind == "motor":
+        motor = entry.get("motor")
+        direction = str(entry.get("direction", "control")).lower()
+        if not isinstance(motor, str):
+            raise ValueError(f"{where}: motor must be a motor name, got {motor!r}")
+        if motor in MessageFormatter.INTERNAL_MOTOR_PARAMETER and direction in ("cw", "ccw"):
+            request = (MessageFormatter.internal_motor_cw_message(motor) if direction == "cw"
+                       else MessageFormatter.internal_motor_ccw_message(motor))
+        elif motor in MessageFormatter.EXTERNAL_MOTOR_PARAMETER and direction == "control":
+            request = MessageFormatter.external_motor_control_message(motor)
+        else:
+            raise ValueError(f"{where}: unknown motor/direction {motor!r} {direction!r}")
+        return [PlanStep(name or f"{motor} {direction.upper()}", COMMAND, request)]
+
+    if kind == "load_cell":
+        low, high = _limits(entry, where)
+        cells = _numbers(entry.get("cells", "all"), MessageFormatter.LOAD_CELL_COUNT, where)
+        if "samples" in entry:
+            samples = entry["samples"]
+            if not isinstance(samples, int) or isinstance(samples, bool):
+                raise ValueError(f"{where}: samples must be a whole number, got {samples!r}")
+            acquisition = AcquisitionSettings(samples=samples, low=low, high=high,
+                                              rate_hz=_real(entry, "rate", 20.0, where),
+                                              max_stdev=_real(entry, "max_stdev", math.inf, where),
+                                              max_drift=_real(entry, "max_drift", math.inf, where))
+            if acquisition.samples < 1 or acquisition.rate_hz <= 0:
+                raise ValueError(f"{where}: samples and rate must be positive")
+            acquisition.min_samples = min(acquisition.min_samples, acquisition.samples)
+            return [PlanStep(name or f"로드셀 측정 ({len(cells)}개)", LOAD_CELL_SAMPLES, low=low, high=high,
+                             cells=cells, acquisition=acquisition)]
+        return [PlanStep(name or f"로드셀 {cell}", LOAD_CELL, MessageFormatter.get_loadcell_value_message(cell),
+                         low=low, high=high)
+                for cell in cells]
+
+    if kind == "wait_sensor":
+        sensors = entry.get("sensors") or {}
+        if not isinstance(sensors, dict):
+            raise ValueError(f"{where}: sensors must map sensor numbers to states, got {sensors!r}")
+        if not sensors:
+            raise ValueError(f"{where}: wait_sensor needs at least one sensor")
+        timeout = _real(entry, "timeout", 1.0, where)
+        mask = state = 0
+        for key, value in sensors.items():
+            try:
+                sensor = int(key)
+            except (TypeError, ValueError):
+                sensor = None
+            if sensor is None or not 1 <= sensor <= SENSOR_COUNT:
+                raise ValueError(f"{where}: sensor must be 1-{SENSOR_COUNT}, got {key!r}")
+            mask |= 1 << (sensor - 1)
+            state |= _state(value, where) << (sensor - 1)
+        label = ', '.join(f"{sensor}={value}" for sensor, value in sensors.items())
+        return [PlanStep(name or f"센서 대기 ({label})", WAIT_SENSOR, MessageFormatter.sensor_message(),
+                         sensor_mask=mask, sensor_state=state, timeout=timeout)]
+
+    raise ValueError(f"{where}: unknown step type {kind!r}")
+
+
+def compile_sequence(sequence, max_batch=MAX_BATCH):
+    """
+    :param sequence: sequence dict, see load_sequence
+    :param max_batch: most requests pipelined in one batch
+    :return: ExecutionPlan
+    """
+    if not isinstance(sequence, dict) or not isinstance(sequence.get("steps"), list):
+        raise ValueError("sequence must be a mapping with a list of steps")
+    plan = ExecutionPlan(sequence.get("name", "sequence"), stop_on_failure=sequence.get("stop_on_failure", True))
+    batch = []
+    for number, entry in enumerate(sequence["steps"], start=1):
+        for step in _compile_step(entry, f"step {number}"):
+            if step.kind in BARRIERS:
+                if batch:
+                    plan.stages.append(batch)
+                    batch = []
+                plan.stages.append([step])
+                continue
+            batch.append(step)
+            if len(batch) == max_batch:
+                plan.stages.append(batch)
+                batch = []
+    if batch:
+        plan.stages.append(batch)
+    return plan
+
+
+def _run_batch(stage, result):
+    exchange = Exchange([step.request for step in stage])
+    yield exchange
+    responses = exchange.responses
+    for index, step in enumerate(stage):
+        step_result = StepResult(step.name, step.request.hex(' '))
+        response = responses[index] if responses else None
+        if response is None:
+            step_result.message = "응답 없음"
+        else:
+            step_result.response = response.hex(' ')
+            step_result.elapsed_ms = exchange.elapsed[index] * 1000
+            step_result.passed = True
+            if step.kind == LOAD_CELL:
+                step_result.value = MessageFormatter.parse_load_cell_response(response)
+                result.load_cells[step.request[2] + 1] = step_result.value
+                step_result.passed = math.isfinite(step_result.value) and step.low <= step_result.value <= step.high
+                if not step_result.passed:
+                    step_result.message = f"범위 초과 ({step.low} ~ {step.high})"
+        result.steps.append(step_result)
+
+
+def _run_wait(step, result):
+    step_result = StepResult(step.name, step.request.hex(' '))
+    start = time.perf_counter()
+    deadline = start + step.timeout
+    while True:
+        response = yield from request(step.request)
+        now = time.perf_counter()
+        if response is None:
+            step_result.message = "응답 없음"
+            break
+        result.sensor_samples += 1
+        result.last_sensor = step_result.response = response.hex(' ')
+        mask = response_sensor_mask(response)
+        if mask & step.sensor_mask == step.sensor_state:
+            step_result.passed = True
+            break
+        if now >= deadline:
+            step_result.message = f"시간 초과 (센서 {mask:016b})"
+            break
+    step_result.elapsed_ms = step_result.value = (time.perf_counter() - start) * 1000
+    result.steps.append(step_result)
+
+
+def _run_sampling(step, result):
+    for verdict in (yield from acquisition_procedure(step.cells, step.acquisition)):
+        if verdict.samples:
+            result.load_cells[verdict.cell] = verdict.mean
+        result.steps.append(verdict_step(verdict))
+
+
+def plan_procedure(plan, result):
+    """
+    Procedure (see procedure.py) running a plan, appending a StepResult per step to result
+    :param plan: ExecutionPlan
+    :param result: BoardResult
+    :return: True if every step passed
+    """
+    for stage in plan.stages:
+        start = len(result.steps)
+        if stage[0].kind == WAIT_SENSOR:
+            yield from _run_wait(stage[0], result)
+        elif stage[0].kind == LOAD_CELL_SAMPLES:
+            yield from _run_sampling(stage[0], result)
+        else:
+            yield from _run_batch(stage, result)
+
+        failed = [step for step in result.steps[start:] if not step.passed]
+        for step in failed:
+            logger.bind(board=result.name).warning(f"[{result.name}] {step.name} 실패: {step.message}")
+        if failed and plan.stop_on_failure:
+            return False
+    return all(step.passed for step in result.steps)
+
+
+def run_plan(tcp_client, plan, result):
+    """
+    Run a plan on a connected board, appending a StepResult per step to result
+    :param tcp_client: connected TcpClient
+    :param plan: ExecutionPlan
+    :param result: BoardResult
+    :return: True if every step passed
+    """
+    return run_sync(plan_procedure(plan, result), tcp_client)
@@ -0,0 +1,104 @@
+"""
+Headless board certification.
+
+    python certify.py 192.168.0.110 192.168.0.111:502 --report report.json
+    python certify.py 192.168.0.110 --sequence sequences/relay_loopback.json
+    python certify.py 192.168.0.110 --loopback --trials 20 --relay-limit 15
+
+Exit code 0 when every board passes, 1 when any board fails, 2 on usage errors.
+Never imports tkinter/ttkbootstrap; everything past argument parsing is imported lazily
+so that --help and usage errors return immediately.
+"""
+import argparse
+import sys
+
+DEFAULT_PORT = 502
+
+
+def parse_board(value):
+    host, _, port = value.partition(':')
+    try:
+        return host, int(port) if port else DEFAULT_PORT
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid board address: {value}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="보드 인증 (headless)")
+    parser.add_argument("boards", nargs="+", type=parse_board, metavar="HOST[:PORT]")
+    parser.add_argument("--timeout", type=float, default=2.0, help="per-request timeout in seconds")
+    parser.add_argument("--workers", type=int, default=32, help="boards certified in parallel")
+    parser.add_argument("--sequence", help="JSON/YAML test sequence to run instead of the default steps")
+    parser.add_argument("--loopback", action="store_true",
+                        help="also time relay/motor to sensor loopback actuation")
+    parser.add_argument("--trials", type=int, default=5, help="loopback switch cycles per channel")
+    parser.add_argument("--relay-limit", type=float, default=20.0, help="relay actuation limit in ms")
+    parser.add_argument("--motor-limit", type=float, default=500.0, help="motor limit switch limit in ms")
+    parser.add_argument("--report", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--db", help="results database, default logs/results.db")
+    parser.add_argument("--no-db", action="store_true", help="do not store results in the database")
+    parser.add_argument("--family", help="board family recorded with the results")
+    parser.add_argument("--log-level", default="INFO")
+    parser.add_argument("--log-dir", help="also keep session log files in this directory")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    import json
+
+    from Log.logger_config import new_session_id, setup_console_logger, setup_file_logging, flush_logs
+    from certification.board_result import board_result_to_dict
+    from certification.loopback import LoopbackTest, default_channels
+    from certification.results_store import DEFAULT_DB_PATH, ResultsStore
+    from certification.sequence import compile_sequence, load_sequence
+    from headless.certification_runner import CertificationRunner
+
+    plan = None
+    if args.sequence:
+        try:
+            plan = compile_sequence(load_sequence(args.sequence))
+        except (OSError, ValueError) as e:
+            print(f"certify.py: {e}", file=sys.stderr)
+            return 2
+
+    setup_console_logger(args.log_level)
+    session_id = new_session_id()
+    if args.log_dir:
+        setup_file_logging(session_id, log_directory=args.log_dir)
+
+    loopback = None
+    if args.loopback:
+        loopback = LoopbackTest(default_channels(args.relay_limit, args.motor_limit), trials=args.trials,
+                                timeout=max(1.0, args.motor_limit / 1000 * 2))
+
+    results = CertificationRunner(args.boards, timeout=args.timeout, max_workers=args.workers, plan=plan,
+                                  loopback=loopback).run()
+    if not args.no_db:
+        store = ResultsStore(args.db or DEFAULT_DB_PATH)
+        store.start_session(session_id, "certify")
+        for result in results:
+            store.register_board(result.name, args.family)
+            store.record_board_result(session_id, result, plan.name if plan is not None else None)
+        store.close()
+    report = {
+        "passed": all(result.passed for result in results),
+        "boards": [board_result_to_dict(result) for result in results],
+    }
+    if plan is not None:
+        report["sequence"] = plan.name
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            report_file.write(text)
+    else:
+        print(text)
+
+    flush_logs()
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
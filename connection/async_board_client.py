@@ -0,0 +1,226 @@
+import asyncio
+import time
+from collections import deque
+
+from Log.logger_config import logger
+from connection.frame_decoder import FrameDecoder
+from connection.transport_profile import LOW_LATENCY, apply_profile
+from message_formatter.message_formatter import MessageFormatter
+
+
+class BoardProtocol(asyncio.BufferedProtocol):
+    """
+    Feeds the event loop's reads straight into a FrameDecoder buffer and forwards
+    complete frames to the owning client.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.decoder = FrameDecoder()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        return self.decoder.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes):
+        self.decoder.buffer_updated(nbytes)
+        for frame in self.decoder.frames():
+            self.client.frame_received(frame)
+
+    def connection_lost(self, exc):
+        self.client.connection_lost(self, exc)
+
+
+class AsyncBoardClient:
+    """
+    asyncio connection to a single board.
+
+    One I/O task owns the stream: it serves queued commands first and issues a sensor
+    poll whenever the poll interval elapses, so commands and polls never interleave on
+    the socket. A command may be a batch of requests, written in one go and answered in
+    order.
+    """
+
+    def __init__(self, host, port=502, poll_interval=0.5, timeout=2.0, sample_history=256, profile=LOW_LATENCY):
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.profile = profile
+        self.transport = None
+        self.command_queue = asyncio.Queue()
+        self.sensor_samples = deque(maxlen=sample_history)
+        self.sensor_count = 0
+        self.on_sensor = None
+        self._protocol = None
+        self._pending = deque()  # (command byte, future) of the requests awaiting a response, in order
+        self._io_task = None
+        self.logger = logger.bind(board=self.name)
+
+    @property
+    def name(self):
+        return f"{self.host}:{self.port}"
+
+    def is_connected(self):
+        return self.transport is not None and not self.transport.is_closing()
+
+    async def connect(self):
+        await self.close_connection()
+        loop = asyncio.get_running_loop()
+        try:
+            self.transport, self._protocol = await asyncio.wait_for(
+                loop.create_connection(lambda: BoardProtocol(self), self.host, self.port), self.timeout)
+            apply_profile(self.transport.get_extra_info('socket'), self.profile)
+            return True
+        except (OSError, asyncio.TimeoutError) as e:
+            self.logger.error(f"[{self.name}] 연결 실패: {e!r}")
+            self.transport = self._protocol = None
+        return False
+
+    def start(self):
+        if self._io_task is None:
+            self._io_task = asyncio.create_task(self._io_loop())
+
+    async def send_message(self, message):
+        """
+        Queue a request on the command channel
+        :param message: request frame
+        :return: response frame, or None on failure
+        """
+        responses = await self.send_batch([message])
+        return responses[0] if responses else None
+
+    async def send_batch(self, messages, elapsed=None):
+        """
+        Queue several requests to be pipelined back to back on the command channel
+        :param messages: request frames
+        :param elapsed: optional list that receives, per response, the seconds since the send
+        :return: list of response frames, or None on failure
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.command_queue.put((list(messages), future, elapsed))
+        return await future
+
+    async def read_sensor(self):
+        return await self.send_message(MessageFormatter.sensor_message())
+
+    async def read_load_cell(self, cell_index):
+        response = await self.send_message(MessageFormatter.get_loadcell_value_message(cell_index))
+        if response is None:
+            return None
+        return MessageFormatter.parse_load_cell_response(response)
+
+    async def read_load_cells(self):
+        """
+        Pipelined sweep of every load cell
+        :return: list of values, or None on failure
+        """
+        responses = await self.send_batch(MessageFormatter.load_cell_sweep_messages())
+        if responses is None:
+            return None
+        return MessageFormatter.parse_load_cell_responses(responses)
+
+    async def _io_loop(self):
+        next_poll = time.monotonic()
+        while True:
+            try:
+                # Queued commands always go first, even when a poll is overdue
+                messages, future, elapsed = self.command_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = max(0.0, next_poll - time.monotonic()) if self.poll_interval else None
+                try:
+                    messages, future, elapsed = await asyncio.wait_for(self.command_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    messages, future, elapsed = [MessageFormatter.sensor_message()], None, None
+                    next_poll = time.monotonic() + self.poll_interval
+
+            try:
+                responses = await self._transact(messages, elapsed)
+            except asyncio.CancelledError:
+                if future is not None and not future.done():
+                    future.set_result(None)
+                raise
+            except Exception as e:
+                self.logger.error(f"[{self.name}] TCP 통신 에러: {e!r}")
+                await self.close_connection()
+                responses = None
+            if future is not None:
+                if not future.done():
+                    future.set_result(responses)
+            elif responses is not None:
+                response = responses[0]
+                self.sensor_samples.append(response)
+                self.sensor_count += 1
+                if self.on_sensor is not None:
+                    self.on_sensor(self, response)
+
+    async def _transact(self, messages, elapsed=None):
+        """
+        :return: list of response frames, or None if any of them failed
+        """
+        if not self.is_connected() and not await self.connect():
+            return None
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in messages]
+        self._pending.extend((message[1], future) for message, future in zip(messages, futures))
+        start = time.perf_counter()
+        deadline = loop.time() + self.timeout
+        try:
+            self.transport.write(b''.join(messages))
+            responses = []
+            for future in futures:
+                response = await asyncio.wait_for(future, max(0.0, deadline - loop.time()))
+                if response is None:
+                    return None
+                responses.append(response)
+                if elapsed is not None:
+                    elapsed.append(time.perf_counter() - start)
+            return responses
+        except (OSError, asyncio.TimeoutError) as e:
+            self.logger.info(f"[{self.name}] 요청 전송 실패: {e!r}")
+            await self.close_connection()
+        finally:
+            self._pending.clear()
+        return None
+
+    def frame_received(self, frame):
+        pending = self._pending
+        if pending and frame[1] == pending[0][0]:
+            _, future = pending.popleft()
+            if not future.done():
+                future.set_result(bytes(frame))
+        else:
+            self.logger.debug(f"[{self.name}] 응답 불일치, 폐기: {frame.hex(' ')}")
+
+    def connection_lost(self, protocol, exc):
+        if protocol is not self._protocol:
+            return
+        self.transport = self._protocol = None
+        for _, future in self._pending:
+            if not future.done():
+                future.set_result(None)
+
+    async def close_connection(self):
+        transport, self.transport, self._protocol = self.transport, None, None
+        if transport is not None:
+            try:
+                transport.close()
+            except Exception as e:
+                self.logger.error(f"[{self.name}] 연결 종료 실패: {e}")
+
+    async def stop(self):
+        if self._io_task is not None:
+            self._io_task.cancel()
+            try:
+                await self._io_task
+            except asyncio.CancelledError:
+                pass
+            self._io_task = None
+        while not self.command_queue.empty():
+            _, future, _ = self.command_queue.get_nowait()
+            if not future.done():
+                future.set_result(None)
+        await self.close_connection()
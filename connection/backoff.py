@@ -0,0 +1,29 @@
+import random
+
+
+class ExponentialBackoff:
+    """
+    Reconnect delays that double after every failure up to `maximum`, each scaled by a
+    random factor in [1 - jitter, 1] so many clients that lost the same board do not
+    retry in lockstep.
+    """
+
+    def __init__(self, initial=0.5, maximum=30.0, multiplier=2.0, jitter=0.5, seed=None):
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.failures = 0
+        self._random = random.Random(seed)
+
+    def reset(self):
+        self.failures = 0
+
+    def next_delay(self):
+        """
+        :return: seconds to wait before the next attempt; counts one more failure
+        """
+        delay = min(self.maximum, self.initial * self.multiplier ** self.failures)
+        if delay < self.maximum:
+            self.failures += 1
+        return delay * (1 - self.jitter * self._random.random())
@@ -0,0 +1,151 @@
+"""
+Find boards on the local network.
+
+    python -m connection.board_discovery 192.168.0.0/24
+    python -m connection.board_discovery 192.168.0.100-150 --port 502 --timeout 0.5
+
+Every address gets a time-limited connect on the board port; open ports are confirmed by
+sending the sensor request and checking that a well-formed sensor response comes back,
+so other Modbus/TCP devices on port 502 are not mistaken for boards.
+"""
+import argparse
+import asyncio
+import ipaddress
+import sys
+import time
+from dataclasses import dataclass
+
+from message_formatter import protocol_schema
+from message_formatter.message_formatter import MessageFormatter
+from message_formatter.sensor_decoder import response_sensor_mask
+
+DEFAULT_PORT = 502
+MAX_HOSTS = 65536  # a /16; larger ranges are almost certainly typos
+
+
+@dataclass
+class DiscoveredBoard:
+    host: str
+    port: int
+    rtt_ms: float
+    sensor_mask: int
+
+    @property
+    def name(self):
+        return f"{self.host}:{self.port}"
+
+
+def parse_targets(spec, max_hosts=MAX_HOSTS):
+    """
+    :param spec: "192.168.0.0/24", "192.168.0.100-192.168.0.150", "192.168.0.100-150" or a
+                 single address; several may be separated by commas
+    :param max_hosts: ranges adding up to more addresses raise ValueError before expanding
+    :return: list of host strings
+    """
+    hosts = []
+    for part in spec.split(','):
+        part = part.strip()
+        if '/' in part:
+            network = ipaddress.ip_network(part, strict=False)
+            _check_size(len(hosts) + network.num_addresses, max_hosts, spec)
+            hosts.extend(str(host) for host in (network.hosts() if network.num_addresses > 2 else network))
+        elif '-' in part:
+            first, last = part.split('-', 1)
+            first = ipaddress.ip_address(first)
+            if '.' not in last:
+                last = '.'.join(str(first).split('.')[:3] + [last])
+            last = ipaddress.ip_address(last)
+            if last < first:
+                raise ValueError(f"empty address range: {part}")
+            _check_size(len(hosts) + int(last) - int(first) + 1, max_hosts, spec)
+            hosts.extend(str(first + offset) for offset in range(int(last) - int(first) + 1))
+        elif part:
+            _check_size(len(hosts) + 1, max_hosts, spec)
+            hosts.append(str(ipaddress.ip_address(part)))
+    return hosts
+
+
+def _check_size(count, max_hosts, spec):
+    if count > max_hosts:
+        raise ValueError(f"{spec}: {count:,} addresses, at most {max_hosts:,} may be searched")
+
+
+async def probe(host, port=DEFAULT_PORT, timeout=0.5):
+    """
+    :return: DiscoveredBoard if a board answers the sensor request, otherwise None
+    """
+    writer = None
+    try:
+        start = time.perf_counter()
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(MessageFormatter.sensor_message())
+        response = await asyncio.wait_for(
+            reader.readexactly(protocol_schema.RESPONSE_LENGTH[protocol_schema.SENSOR_COMMAND]), timeout)
+        rtt_ms = (time.perf_counter() - start) * 1000
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if (response[0] != protocol_schema.REQUEST_HEAD or response[1] != protocol_schema.SENSOR_COMMAND
+            or response[-1] != protocol_schema.END_BYTE):
+        return None
+    return DiscoveredBoard(host, port, rtt_ms, response_sensor_mask(response))
+
+
+async def discover(hosts, port=DEFAULT_PORT, timeout=0.5, concurrency=256, on_found=None):
+    """
+    Probe all hosts, at most `concurrency` at a time
+    :param on_found: optional callback(DiscoveredBoard) as each board is confirmed
+    :return: list of DiscoveredBoard sorted by address
+    """
+    # A fixed pool of workers, so a large range does not create a coroutine per address up front
+    pending = iter(hosts)
+    boards = []
+
+    async def worker():
+        for host in pending:
+            board = await probe(host, port, timeout)
+            if board is not None:
+                boards.append(board)
+                if on_found is not None:
+                    on_found(board)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return sorted(boards, key=lambda board: ipaddress.ip_address(board.host))
+
+
+def discover_boards(spec, port=DEFAULT_PORT, timeout=0.5, concurrency=256, on_found=None):
+    """
+    Blocking wrapper around discover() for threads and scripts
+    """
+    return asyncio.run(discover(parse_targets(spec), port, timeout, concurrency, on_found))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="보드 검색")
+    parser.add_argument("targets", help="subnet (192.168.0.0/24), range (192.168.0.100-150) or addresses")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--timeout", type=float, default=0.5, help="per-step timeout in seconds")
+    parser.add_argument("--concurrency", type=int, default=256)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        hosts = parse_targets(args.targets)
+    except ValueError as e:
+        print(f"board_discovery: {e}", file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    boards = asyncio.run(discover(hosts, args.port, args.timeout, args.concurrency))
+    for board in boards:
+        print(f"{board.name}\t{board.rtt_ms:.1f} ms\tsensor {board.sensor_mask:016b}")
+    print(f"{len(boards)}/{len(hosts)} boards found in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0 if boards else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from Log.logger_config import logger
+from certification.board_result import BoardResult, default_certification_steps, steps_procedure
+from certification.loopback import loopback_procedure
+from certification.procedure import run_async
+from certification.sequence import plan_procedure
+from connection.async_board_client import AsyncBoardClient
+
+
+class MultiBoardEngine:
+    """
+    Certifies many boards concurrently from a single event loop, one AsyncBoardClient
+    (connection, poll loop and command channel) per board. Each board runs the
+    certification steps, or a compiled sequence plan, and optionally the loopback timing
+    test; these are the same procedures the GUI runs over its TcpClient.
+    """
+
+    def __init__(self, boards, poll_interval=0.5, timeout=2.0, max_concurrency=64, steps=None, plan=None,
+                 loopback=None):
+        self.boards = [(host, int(port)) for host, port in boards]
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.steps = steps if steps is not None else default_certification_steps()
+        self.plan = plan
+        self.loopback = loopback
+        self.on_result = None
+        self.on_sensor = None
+
+    def run(self):
+        """
+        :return: list of BoardResult, in the order the boards were given
+        """
+        return asyncio.run(self.certify_all())
+
+    async def certify_all(self):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def certify(host, port):
+            async with semaphore:
+                result = await self.certify_board(host, port)
+            if self.on_result is not None:
+                self.on_result(result)
+            return result
+
+        return await asyncio.gather(*(certify(host, port) for host, port in self.boards))
+
+    async def certify_board(self, host, port):
+        result = BoardResult(host, port)
+        client = AsyncBoardClient(host, port, poll_interval=self.poll_interval, timeout=self.timeout)
+        client.on_sensor = self.on_sensor
+        start = time.perf_counter()
+        try:
+            result.connected = await client.connect()
+            if not result.connected:
+                return result
+            client.start()
+            if self.plan is not None:
+                await run_async(plan_procedure(self.plan, result), client)
+            else:
+                await run_async(steps_procedure(self.steps, result), client)
+            if self.loopback is not None:
+                await run_async(loopback_procedure(self.loopback, result), client)
+        finally:
+            await client.stop()
+            # Background polls on top of the sensor reads the procedures made themselves
+            result.sensor_samples += client.sensor_count
+            if client.sensor_samples:
+                result.last_sensor = client.sensor_samples[-1].hex(' ')
+            result.elapsed = time.perf_counter() - start
+            logger.bind(board=result.name).info(f"[{result.name}] 인증 {'통과' if result.passed else '실패'} "
+                                                f"({result.elapsed:.2f}s)")
+        return result
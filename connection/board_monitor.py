@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+from Log.logger_config import logger
+from connection.async_board_client import AsyncBoardClient
+from connection.backoff import ExponentialBackoff
+from message_formatter.sensor_decoder import response_sensor_mask
+
+
+class BoardMonitor:
+    """
+    Polls many boards for display from one event loop thread: each board gets an
+    AsyncBoardClient polling its sensors, plus a load-cell sweep every load_cell_interval.
+    Boards that drop off are reconnected with exponential backoff. Callbacks run on the
+    monitor thread and get the board name ("host:port") first.
+    """
+
+    def __init__(self, boards, poll_interval=0.2, load_cell_interval=1.0, timeout=2.0):
+        self.boards = [(host, int(port)) for host, port in boards]
+        self.poll_interval = poll_interval
+        self.load_cell_interval = load_cell_interval
+        self.timeout = timeout
+        self.on_sensor = None  # callback(board, sensor mask)
+        self.on_load_cells = None  # callback(board, values)
+        self.on_status = None  # callback(board, connected)
+        self._loop = None
+        self._stop = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=3.0):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        clients = [AsyncBoardClient(host, port, poll_interval=self.poll_interval, timeout=self.timeout)
+                   for host, port in self.boards]
+        tasks = [asyncio.create_task(self._monitor(client)) for client in clients]
+        await self._stop.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*(client.stop() for client in clients), return_exceptions=True)
+
+    async def _monitor(self, client):
+        if self.on_sensor is not None:
+            client.on_sensor = lambda board, response: self.on_sensor(board.name, response_sensor_mask(response))
+        backoff = ExponentialBackoff()
+        connected = None
+        while True:
+            if not await client.connect():
+                connected = self._status(client, connected, False)
+                await asyncio.sleep(backoff.next_delay())
+                continue
+            backoff.reset()
+            connected = self._status(client, connected, True)
+            client.start()
+            while client.is_connected():
+                await asyncio.sleep(self.load_cell_interval)
+                values = await client.read_load_cells()
+                if values and self.on_load_cells is not None:
+                    self.on_load_cells(client.name, values)
+            # The poll loop would retry the connection on every poll; back off here instead
+            await client.stop()
+
+    def _status(self, client, previous, connected):
+        if connected != previous:
+            if not connected:
+                logger.bind(board=client.name).warning(f"[{client.name}] 대시보드 연결 끊김")
+            if self.on_status is not None:
+                self.on_status(client.name, connected)
+        return connected
@@ -0,0 +1,83 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+
+from Log.logger_config import logger
+
+
+class CommandDispatcher:
+    """
+    Single owner of a TcpClient socket.
+
+    Every request goes through one priority queue served by one worker thread, so only
+    one request is on the wire at a time and each response is matched to the request
+    that produced it. Operator commands use PRIORITY_COMMAND and overtake background
+    sensor polls queued with PRIORITY_POLL.
+    """
+
+    PRIORITY_CONNECT = 0
+    PRIORITY_COMMAND = 1
+    PRIORITY_POLL = 2
+
+    def __init__(self, tcp_client):
+        self.tcp_client = tcp_client
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            # Sentinel sorts after everything already queued
+            self._queue.put((float('inf'), next(self._sequence), None, None))
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def submit(self, message, priority=PRIORITY_COMMAND):
+        """
+        Queue a request frame
+        :param message: request frame
+        :param priority: PRIORITY_COMMAND for operator actions, PRIORITY_POLL for background polls
+        :return: Future resolving to the response frame, or None on failure
+        """
+        return self.submit_call(self.tcp_client.send_message, message, priority=priority)
+
+    def submit_batch(self, messages, priority=PRIORITY_COMMAND):
+        """
+        Queue several request frames to be pipelined back to back
+        :return: Future resolving to the list of response frames, or None on failure
+        """
+        return self.submit_call(self.tcp_client.send_batch, messages, priority=priority)
+
+    def connect(self):
+        return self.submit_call(self.tcp_client.connect, priority=self.PRIORITY_CONNECT)
+
+    def submit_call(self, function, *args, priority=PRIORITY_COMMAND):
+        future = Future()
+        self._queue.put((priority, next(self._sequence), (function, args), future))
+        return future
+
+    def _run(self):
+        while True:
+            _, _, operation, future = self._queue.get()
+            if operation is None:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            function, args = operation
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                logger.error(f"TCP 통신 에러: {e}")
+                future.set_exception(e)
+
+        # Release anybody still waiting on requests that will never be sent
+        while not self._queue.empty():
+            _, _, operation, future = self._queue.get_nowait()
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(None)
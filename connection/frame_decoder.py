@@ -0,0 +1,109 @@
+from message_formatter.message_formatter import MessageFormatter
+
+
+class FrameDecoder:
+    """
+    Reassembles 0x7E ... 0xAA frames from a TCP byte stream.
+
+    Bytes are received straight into a preallocated buffer (recv_into / BufferedProtocol)
+    and complete frames are handed out as memoryview slices of that buffer, so no bytes
+    object is allocated per read or per frame. A frame view is only valid until the next
+    get_buffer()/feed() call; copy it with bytes() if it has to outlive that.
+    """
+
+    MAX_FRAME_LENGTH = 64
+
+    def __init__(self, buffer_size=4096):
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self.discarded = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def reset(self):
+        self._start = self._end = 0
+
+    def get_buffer(self, sizehint=-1):
+        """
+        Free space at the tail of the receive buffer
+        :param sizehint: minimum number of free bytes wanted
+        :return: writable memoryview to receive into
+        """
+        wanted = max(sizehint, self.MAX_FRAME_LENGTH)
+        if len(self._buffer) - self._end < wanted:
+            pending = self._end - self._start
+            # Only the tail of an incomplete frame is ever carried over, so this copy is tiny
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._start, self._end = 0, pending
+            if len(self._buffer) - pending < wanted:
+                raise BufferError("frame buffer full, consume frames before receiving more")
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes):
+        self._end += nbytes
+
+    def feed(self, data):
+        size = len(data)
+        self.get_buffer(size)[:size] = data
+        self.buffer_updated(size)
+
+    def recv_from(self, sock):
+        """
+        Receive whatever the socket has into the buffer
+        :param sock: connected blocking socket
+        :return: number of bytes received
+        """
+        nbytes = sock.recv_into(self.get_buffer())
+        if nbytes == 0:
+            raise ConnectionError("connection closed by peer")
+        self.buffer_updated(nbytes)
+        return nbytes
+
+    def next_frame(self):
+        """
+        Pop the next complete frame from the buffer
+        :return: memoryview of the frame, or None if no complete frame is buffered yet
+        """
+        buffer = self._buffer
+        while True:
+            head = buffer.find(MessageFormatter.REQUEST_HEAD, self._start, self._end)
+            if head < 0:
+                self.discarded += self._end - self._start
+                self._start = self._end
+                return None
+            self.discarded += head - self._start
+            self._start = head
+            if self._end - head < 2:
+                return None
+
+            length = MessageFormatter.RESPONSE_LENGTH.get(buffer[head + 1])
+            if length:
+                if self._end - head < length:
+                    return None
+                end = head + length - 1
+                if buffer[end] != MessageFormatter.END_BYTE:
+                    # Not a real frame start, resync on the next head byte
+                    self._start += 1
+                    self.discarded += 1
+                    continue
+            else:
+                end = buffer.find(MessageFormatter.END_BYTE, head + 2, self._end)
+                if end < 0:
+                    if self._end - head >= self.MAX_FRAME_LENGTH:
+                        self._start += 1
+                        self.discarded += 1
+                        continue
+                    return None
+
+            self._start = end + 1
+            return self._view[head:end + 1]
+
+    def frames(self):
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return
+            yield frame
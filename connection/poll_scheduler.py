@@ -0,0 +1,120 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class PollScheduler:
+    """
+    Fixed-rate deadline scheduler for a polling loop.
+
+    Deadlines are spaced exactly one period apart from the first tick, so the time spent
+    on the round-trip is absorbed instead of added to the period. When a poll overruns
+    one or more deadlines they are counted as missed and the schedule skips ahead rather
+    than bursting to catch up.
+    """
+
+    MAX_RATE = 1000.0
+
+    def __init__(self, rate_hz=10.0, window=512, spin_threshold=0.0):
+        """
+        :param spin_threshold: seconds before each deadline spent busy-waiting instead of
+                               sleeping, for sub-millisecond precision at the cost of a CPU
+                               core; 0 sleeps all the way
+        """
+        self._lock = threading.Lock()
+        self.period = 1.0
+        self.spin_threshold = spin_threshold
+        self.missed = 0
+        self.ticks = 0
+        self._next_deadline = None
+        self._tick_times = deque(maxlen=window)
+        self._lateness = deque(maxlen=window)
+        self.set_rate(rate_hz)
+
+    @property
+    def rate_hz(self):
+        return 1.0 / self.period
+
+    def set_rate(self, rate_hz):
+        """
+        Safe to call from another thread while wait() blocks; a wait in progress ends at its
+        old deadline and the schedule restarts at the new rate from there
+        """
+        rate_hz = min(max(float(rate_hz), 0.01), self.MAX_RATE)
+        with self._lock:
+            self.period = 1.0 / rate_hz
+            self._next_deadline = None
+
+    def reset(self):
+        with self._lock:
+            self._next_deadline = None
+            self._tick_times.clear()
+            self._lateness.clear()
+
+    def wait(self, stop_event=None):
+        """
+        Block until the next deadline
+        :param stop_event: optional threading.Event that aborts the wait when set
+        :return: False if stop_event was set, True otherwise
+        """
+        now = time.perf_counter()
+        with self._lock:
+            period = self.period
+            if self._next_deadline is None:
+                self._next_deadline = now
+            deadline = self._next_deadline
+            if now >= deadline + period:
+                skipped = int((now - deadline) / period)
+                self.missed += skipped
+                deadline += skipped * period
+            self._next_deadline = deadline
+
+        delay = deadline - now - self.spin_threshold
+        if delay > 0:
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+        if self.spin_threshold > 0:
+            # OS sleep granularity is coarse, finish the last stretch by spinning
+            while time.perf_counter() < deadline:
+                pass
+
+        actual = time.perf_counter()
+        with self._lock:
+            # Left at None when set_rate ran meanwhile, so the next wait starts the new schedule
+            if self._next_deadline == deadline:
+                self._next_deadline = deadline + period
+            self.ticks += 1
+            self._tick_times.append(actual)
+            self._lateness.append(actual - deadline)
+        return True
+
+    def stats(self):
+        """
+        :return: dict with target/achieved rate (Hz), jitter and worst lateness (ms), missed deadlines
+        """
+        with self._lock:
+            tick_times = list(self._tick_times)
+            lateness = list(self._lateness)
+
+        achieved = 0.0
+        if len(tick_times) > 1 and tick_times[-1] > tick_times[0]:
+            achieved = (len(tick_times) - 1) / (tick_times[-1] - tick_times[0])
+
+        jitter = max_late = 0.0
+        if lateness:
+            mean = sum(lateness) / len(lateness)
+            jitter = math.sqrt(sum((x - mean) ** 2 for x in lateness) / len(lateness))
+            max_late = max(lateness)
+
+        return {
+            "target_hz": self.rate_hz,
+            "achieved_hz": achieved,
+            "jitter_ms": jitter * 1000,
+            "max_late_ms": max_late * 1000,
+            "missed": self.missed,
+            "ticks": self.ticks,
+        }
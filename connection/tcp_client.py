@@ -1,60 +1,203 @@
+import select
 import socket
+import time
 from Log.logger_config import logger
+from connection.frame_decoder import FrameDecoder
+from connection.transport_metrics import TransportMetrics
+from connection.transport_profile import LOW_LATENCY, apply_profile
 
 
 class TcpClient:
 
-    def __init__(self, host='192.168.0.110', port=502):
+    def __init__(self, host='192.168.0.110', port=502, timeout=None, metrics=None, connect_timeout=3.0,
+                 send_timeout=None, profile=LOW_LATENCY, capture=None):
+        """
+        :param timeout: seconds to wait for a response
+        :param connect_timeout: seconds to wait for the connection to open
+        :param send_timeout: seconds a send may block, defaults to timeout
+        :param profile: TransportProfile applied after connecting
+        :param capture: optional WireCapture that receives every sent and received frame
+        """
         self.host = host
         self.port = port
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.send_timeout = timeout if send_timeout is None else send_timeout
+        self.profile = profile
+        self.capture = capture
         self.client_socket = None
         self.reconnected = None
+        self.has_connected = False  # a connect() after the first successful one is a reconnect
+        self.decoder = FrameDecoder()
+        self.metrics = metrics if metrics is not None else TransportMetrics()
+        self.logger = logger.bind(board=f"{host}:{port}")
+
+    @property
+    def name(self):
+        return f"{self.host}:{self.port}"
+
+    def set_address(self, host, port):
+        # Point the client at another board; the next request connects to it
+        self.close_connection()
+        self.host = host
+        self.port = port
+        self.logger = logger.bind(board=f"{host}:{port}")
+        self.has_connected = False
+        self.metrics.reset()
 
     def connect(self):
         if self.client_socket is not None:
             self.close_connection()
         self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Bound the connect separately; an unplugged cable would otherwise wait for the OS timeout
+        self.client_socket.settimeout(self.connect_timeout)
+        self.decoder.reset()
         try:
             self.client_socket.connect((self.host, self.port))
+            self.client_socket.settimeout(self.timeout)
+            apply_profile(self.client_socket, self.profile)
+            # Counted here so reconnects driven from outside send_message (the GUI worker) count too
+            if self.has_connected:
+                self.metrics.record_reconnect()
+            self.has_connected = True
             if self.reconnected:
-                logger.info(f"재연결 완료")
+                self.logger.info(f"재연결 완료")
                 self.reconnected = False
             return True
         except Exception as e:
-            logger.error(f"연결 실패: {e}")
+            self.logger.error(f"연결 실패: {e}")
+            self.client_socket.close()
             self.client_socket = None
         return False
 
     def is_connected(self):
-        # Check if the socket is None or closed
+        """
+        Non-blocking liveness check. Between requests nothing should be readable, so a
+        readable socket holds stale bytes or the board's FIN/RST: pending bytes are read and
+        discarded, so a late response to an earlier request is never taken for the reply to
+        the next one, and an empty read or error means the board is gone. A MSG_PEEK alone
+        would not see a FIN queued behind stale bytes.
+        """
         if self.client_socket is None:
             return False
+        drained = 0
         try:
-            pass
-        except socket.error:
+            while select.select([self.client_socket], [], [], 0)[0]:
+                drained += self.decoder.recv_from(self.client_socket)
+        except (OSError, ValueError, BufferError):
             return False
+        finally:
+            self.decoder.reset()
+            self.metrics.record_received(drained)
+            if drained:
+                self._capture_reset()
         return True
 
+    def _capture_reset(self):
+        # Outstanding requests will not be answered; tells replay to stop waiting for them
+        if self.capture is not None:
+            self.capture.record_reset()
+
+    def _send(self, data):
+        if self.send_timeout == self.timeout:
+            self.client_socket.sendall(data)
+        else:
+            self.client_socket.settimeout(self.send_timeout)
+            try:
+                self.client_socket.sendall(data)
+            finally:
+                self.client_socket.settimeout(self.timeout)
+        self.metrics.record_sent(len(data))
+
     def send_message(self, message):
         if not self.is_connected():
-            logger.warning("연결 에러. 재연결 시도 중...")
+            self.logger.warning("연결 에러. 재연결 시도 중...")
             self.reconnected = True
             self.connect()
 
         if self.client_socket:
             try:
-                self.client_socket.sendall(message)
+                start = time.perf_counter()
+                self._send(message)
+                if self.capture is not None:
+                    self.capture.record_sent((message,))
 
-                return self.client_socket.recv(1024)
+                response = self.receive_frame(message[1])
+                self.metrics.record_round_trip(message[1], time.perf_counter() - start)
+                return response
+            except socket.timeout as e:
+                self.metrics.record_timeout(message[1])
+                self.logger.info(f"응답 시간 초과: {e}")
+                self.client_socket = None
+                self._capture_reset()
             except Exception as e:
-                logger.info(f"요청 전송 실패: {e}")
+                self.metrics.record_failure(message[1])
+                self.logger.info(f"요청 전송 실패: {e}")
                 self.client_socket = None  # Set socket to None to trigger reconnection next time
+                self._capture_reset()
+
+    def send_batch(self, messages, elapsed=None):
+        """
+        Pipeline several requests in one sendall and collect their responses in order
+        :param messages: request frames
+        :param elapsed: optional list that receives, per response, the seconds since the send
+        :return: list of response frames, or None on failure
+        """
+        if not self.is_connected():
+            self.logger.warning("연결 에러. 재연결 시도 중...")
+            self.reconnected = True
+            self.connect()
+
+        if self.client_socket:
+            try:
+                start = time.perf_counter()
+                self._send(b''.join(messages))
+                if self.capture is not None:
+                    self.capture.record_sent(messages)
+
+                responses = []
+                previous = start
+                for message in messages:
+                    responses.append(self.receive_frame(message[1]))
+                    received = time.perf_counter()
+                    # Per-command latency is the board's time for this request alone, i.e. since the
+                    # previous response; since the send it would grow with the request's batch position
+                    self.metrics.record_round_trip(message[1], received - previous)
+                    previous = received
+                    if elapsed is not None:
+                        elapsed.append(received - start)
+                return responses
+            except socket.timeout as e:
+                self.metrics.record_timeout(messages[0][1])
+                self.logger.info(f"응답 시간 초과: {e}")
+                self.client_socket = None
+                self._capture_reset()
+            except Exception as e:
+                self.metrics.record_failure(messages[0][1])
+                self.logger.info(f"요청 전송 실패: {e}")
+                self.client_socket = None
+                self._capture_reset()
+
+    def receive_frame(self, command=None):
+        """
+        Block until a complete response frame arrives
+        :param command: expected command byte; stale frames for other commands are dropped
+        :return: response frame
+        """
+        while True:
+            for frame in self.decoder.frames():
+                if self.capture is not None:
+                    self.capture.record_received(frame)
+                if command is None or frame[1] == command:
+                    return bytes(frame)
+                self.logger.debug(f"응답 불일치, 폐기: {frame.hex(' ')}")
+            self.metrics.record_received(self.decoder.recv_from(self.client_socket))
 
     def close_connection(self):
         if self.client_socket:
             try:
                 self.client_socket.close()
             except Exception as e:
-                logger.error(f"연결 종료 실패: {e}")
+                self.logger.error(f"연결 종료 실패: {e}")
             finally:
                 self.client_socket = None
@@ -0,0 +1,185 @@
+import bisect
+import math
+import os
+import threading
+
+from message_formatter.protocol_schema import COMMAND_NAMES
+
+
+def _log_bounds(lowest, decades, per_decade):
+    return tuple(lowest * 10 ** (index / per_decade) for index in range(decades * per_decade + 1))
+
+
+class LatencyHistogram:
+    """
+    Fixed log-spaced buckets from 10 us to 10 s, so recording is O(log buckets) and memory
+    does not grow with the number of samples. Percentiles are accurate to one bucket (~12%).
+    """
+
+    BOUNDS = _log_bounds(lowest=1e-5, decades=6, per_decade=20)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.BOUNDS[min(index, len(self.BOUNDS) - 1)], self.maximum)
+        return self.maximum
+
+
+class CommandMetrics:
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.timeouts = 0
+        self.failures = 0
+
+
+class TransportMetrics:
+    """
+    Thread-safe transport counters: per-command RTT histograms, timeouts and failures,
+    plus reconnects and bytes sent/received for the connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._export_thread = None
+        self._export_stop = threading.Event()
+        self.reset()
+
+    def reset(self):
+        # Start counting afresh, e.g. when the client moves to another board
+        with self._lock:
+            self.commands = {name: CommandMetrics() for name in COMMAND_NAMES.values()}
+            self.reconnects = 0
+            self.bytes_sent = 0
+            self.bytes_received = 0
+
+    def _command(self, code):
+        name = COMMAND_NAMES.get(code, f"0x{code:02x}")
+        metrics = self.commands.get(name)
+        if metrics is None:
+            metrics = self.commands[name] = CommandMetrics()
+        return metrics
+
+    def record_round_trip(self, code, seconds):
+        with self._lock:
+            self._command(code).latency.record(seconds)
+
+    def record_timeout(self, code):
+        with self._lock:
+            self._command(code).timeouts += 1
+
+    def record_failure(self, code):
+        with self._lock:
+            self._command(code).failures += 1
+
+    def record_reconnect(self):
+        with self._lock:
+            self.reconnects += 1
+
+    def record_sent(self, nbytes):
+        with self._lock:
+            self.bytes_sent += nbytes
+
+    def record_received(self, nbytes):
+        with self._lock:
+            self.bytes_received += nbytes
+
+    def snapshot(self):
+        """
+        :return: dict of totals and, per command, count/p50/p95/p99/max in ms, timeouts and failures
+        """
+        with self._lock:
+            commands = {}
+            for name, metrics in self.commands.items():
+                latency = metrics.latency
+                commands[name] = {
+                    "count": latency.count,
+                    "p50_ms": latency.percentile(0.50) * 1000,
+                    "p95_ms": latency.percentile(0.95) * 1000,
+                    "p99_ms": latency.percentile(0.99) * 1000,
+                    "max_ms": latency.maximum * 1000,
+                    "timeouts": metrics.timeouts,
+                    "failures": metrics.failures,
+                }
+            return {
+                "commands": commands,
+                "reconnects": self.reconnects,
+                "bytes_sent": self.bytes_sent,
+                "bytes_received": self.bytes_received,
+            }
+
+    def to_text(self, labels=None):
+        """
+        Prometheus text exposition format
+        :param labels: extra labels for every sample, e.g. {"board": "192.168.0.110:502"}
+        """
+        base = ','.join(f'{key}="{value}"' for key, value in (labels or {}).items())
+        snapshot = self.snapshot()
+        lines = []
+
+        def sample(name, value, **sample_labels):
+            label_text = ','.join(filter(None, [base] + [f'{key}="{item}"' for key, item in sample_labels.items()]))
+            lines.append(f"boardcert_{name}{{{label_text}}} {value}")
+
+        for command, values in snapshot["commands"].items():
+            sample("requests_total", values["count"], command=command)
+            sample("timeouts_total", values["timeouts"], command=command)
+            sample("failures_total", values["failures"], command=command)
+            for quantile in ("p50", "p95", "p99"):
+                sample("rtt_ms", f"{values[f'{quantile}_ms']:.3f}", command=command, quantile=quantile)
+        sample("reconnects_total", snapshot["reconnects"])
+        sample("bytes_sent_total", snapshot["bytes_sent"])
+        sample("bytes_received_total", snapshot["bytes_received"])
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path, labels=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.to_text(labels))
+        os.replace(temporary, path)
+
+    def start_export(self, path, interval=10.0, labels=None):
+        """
+        Rewrite the metrics file every `interval` seconds from a background thread
+        :param labels: dict of labels, or a callable returning one on every write so the
+                       labels can follow the board the client is connected to
+        """
+        if self._export_thread is not None:
+            return
+
+        def run():
+            while not self._export_stop.wait(interval):
+                try:
+                    self.export(path, labels() if callable(labels) else labels)
+                except OSError:
+                    pass
+
+        self._export_stop.clear()
+        self._export_thread = threading.Thread(target=run, daemon=True)
+        self._export_thread.start()
+
+    def stop_export(self):
+        if self._export_thread is not None:
+            self._export_stop.set()
+            self._export_thread.join(timeout=1)
+            self._export_thread = None
@@ -0,0 +1,53 @@
+import socket
+from dataclasses import dataclass
+
+from Log.logger_config import logger
+
+
+@dataclass(frozen=True)
+class TransportProfile:
+    """
+    Socket options applied right after connecting.
+
+    Every request is a few bytes that waits for its response, so Nagle's algorithm only
+    adds delay, and keepalive probes find a board that vanished without a FIN or RST
+    (cable pulled, power cut) while the link is otherwise idle.
+    """
+
+    nodelay: bool = True
+    keepalive: bool = True
+    keepalive_idle: float = 5.0  # seconds idle before the first probe
+    keepalive_interval: float = 1.0  # seconds between probes
+    keepalive_count: int = 3  # unanswered probes before the connection is dropped
+
+
+LOW_LATENCY = TransportProfile()
+SYSTEM_DEFAULT = TransportProfile(nodelay=False, keepalive=False)
+
+
+def apply_profile(sock, profile):
+    """
+    :param sock: connected socket (or asyncio transport socket)
+    :param profile: TransportProfile
+    """
+    try:
+        if profile.nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if not profile.keepalive:
+            return
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        idle = max(1, int(profile.keepalive_idle))
+        interval = max(1, int(profile.keepalive_interval))
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval)
+            if hasattr(socket, "TCP_KEEPCNT"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, profile.keepalive_count)
+        elif hasattr(socket, "SIO_KEEPALIVE_VALS"):
+            # Older Windows: probe count is fixed by the OS
+            sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, idle * 1000, interval * 1000))
+        elif hasattr(socket, "TCP_KEEPALIVE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, idle)
+    except (OSError, AttributeError) as e:
+        logger.debug(f"소켓 옵션 설정 실패: {e}")
+
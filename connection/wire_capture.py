@@ -0,0 +1,272 @@
+"""
+Capture of the raw request/response frames a TcpClient exchanges, and paced replay of
+such captures.
+
+    python -m connection.wire_capture dump logs/captures/20240101_120000_192.168.0.110_502.cap
+    python -m connection.wire_capture replay capture.cap --speed max
+
+File layout:
+
+    magic b'BWCAP1\\n'
+    header: uint16 label length, label (UTF-8 board name), float64 wall-clock start time
+    per frame: float64 monotonic seconds, uint8 direction (0 sent, 1 received, 2 reset), uint16 length, frame bytes
+
+A reset entry (no frame bytes) marks the point where the client gave up on outstanding
+responses, after a timeout or when stale bytes were discarded, so replay stops pairing
+later responses with those requests.
+
+Replay yields the frames with their original spacing divided by `speed`, or as fast as
+possible, so the GUI decode and display path can be driven without a board.
+"""
+import argparse
+import os
+import struct
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from Log.logger_config import LOG_DIRECTORY
+from message_formatter import protocol_schema
+from message_formatter.sensor_decoder import response_sensor_mask
+
+CAPTURE_DIRECTORY = os.path.join(LOG_DIRECTORY, "captures")
+CAPTURE_MAGIC = b'BWCAP1\n'
+LABEL_LENGTH = struct.Struct('<H')
+STARTED = struct.Struct('<d')
+FRAME_HEADER = struct.Struct('<dBH')
+
+SENT = 0
+RECEIVED = 1
+RESET = 2
+
+
+@dataclass
+class CapturedFrame:
+    timestamp: float  # time.monotonic() when the frame was sent or completed
+    direction: int
+    frame: bytes
+
+
+def capture_path(session_id, board, directory=CAPTURE_DIRECTORY):
+    return os.path.join(directory, f"{session_id}_{board.replace(':', '_')}.cap")
+
+
+class WireCapture:
+    """
+    Appends frames to a capture file. Thread-safe; frames recorded after close() are dropped.
+    """
+
+    def __init__(self, path, label="-"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.closed = False
+        self.frames = 0
+        self._file = open(path, "wb", buffering=1 << 16)
+        encoded = label.encode("utf-8")
+        self._file.write(CAPTURE_MAGIC + LABEL_LENGTH.pack(len(encoded)) + encoded + STARTED.pack(time.time()))
+
+    def record(self, direction, frame, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            if self.closed:
+                return
+            self._file.write(FRAME_HEADER.pack(timestamp, direction, len(frame)))
+            self._file.write(frame)
+            self.frames += 1
+
+    def record_sent(self, messages):
+        timestamp = time.monotonic()
+        for message in messages:
+            self.record(SENT, message, timestamp)
+
+    def record_received(self, frame):
+        self.record(RECEIVED, frame)
+
+    def record_reset(self):
+        self.record(RESET, b'')
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._file.close()
+
+
+class CaptureReader:
+    """
+    Iterates the frames of a capture file without loading it into memory
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as capture_file:
+            if capture_file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+                raise ValueError(f"{path}: not a wire capture")
+            length = LABEL_LENGTH.unpack(capture_file.read(LABEL_LENGTH.size))[0]
+            self.label = capture_file.read(length).decode("utf-8")
+            self.started = STARTED.unpack(capture_file.read(STARTED.size))[0]
+            self._data_offset = capture_file.tell()
+
+    def __iter__(self):
+        with open(self.path, "rb", buffering=1 << 16) as capture_file:
+            capture_file.seek(self._data_offset)
+            while True:
+                header = capture_file.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    return  # a capture cut short by a crash ends at the last whole frame
+                timestamp, direction, length = FRAME_HEADER.unpack(header)
+                frame = capture_file.read(length)
+                if len(frame) < length:
+                    return
+                yield CapturedFrame(timestamp, direction, frame)
+
+
+def replay(frames, speed=1.0, stop_event=None):
+    """
+    Re-emit captured frames with their original timing
+    :param frames: iterable of CapturedFrame, e.g. a CaptureReader
+    :param speed: time scale, 2.0 replays twice as fast; None or 0 for no pacing
+    :param stop_event: optional threading.Event that ends the replay early
+    :return: generator of CapturedFrame
+    """
+    first = None
+    start = time.perf_counter()
+    for captured in frames:
+        if stop_event is not None and stop_event.is_set():
+            return
+        if speed:
+            if first is None:
+                first = captured.timestamp
+            delay = (captured.timestamp - first) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        return
+                else:
+                    time.sleep(delay)
+        yield captured
+
+
+class ReplayDecoder:
+    """
+    Pairs received frames with the requests that caused them. Load-cell responses do not
+    carry the cell number, so it is taken from the oldest unanswered load-cell request.
+    """
+
+    def __init__(self):
+        self.pending_load_cells = deque()
+
+    def feed(self, captured):
+        """
+        :return: (command, load cell number or None, frame) for received frames, None for sent
+                 frames and resets
+        """
+        frame = captured.frame
+        if captured.direction == RESET:
+            # Responses to the requests still waiting will never come
+            self.pending_load_cells.clear()
+            return None
+        if captured.direction == SENT:
+            if frame[1] == protocol_schema.LOAD_CELL_COMMAND:
+                self.pending_load_cells.append(frame[2] + 1)
+            return None
+        if frame[1] == protocol_schema.LOAD_CELL_COMMAND:
+            return frame[1], self.pending_load_cells.popleft() if self.pending_load_cells else None, frame
+        return frame[1], None, frame
+
+
+def parse_speed(value):
+    return None if value in ("max", "0") else float(value)
+
+
+def dump(path, output=sys.stdout):
+    reader = CaptureReader(path)
+    print(f"# {reader.label}, started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reader.started))}",
+          file=output)
+    first = None
+    for captured in reader:
+        if first is None:
+            first = captured.timestamp
+        direction = {SENT: "TX", RECEIVED: "RX"}.get(captured.direction, "--")
+        print(f"{(captured.timestamp - first) * 1000:12.3f} {direction} {captured.frame.hex(' ') or 'reset'}",
+              file=output)
+
+
+def replay_summary(path, speed=None):
+    """
+    Drive a capture through the protocol decoders
+    :return: dict of frame counts, sensor changes, load-cell ranges and throughput
+    """
+    decoder = ReplayDecoder()
+    counts = Counter()
+    sensor_changes = 0
+    last_mask = None
+    load_cells = {}
+    frames = 0
+    start = time.perf_counter()
+    for captured in replay(CaptureReader(path), speed):
+        frames += 1
+        event = decoder.feed(captured)
+        if event is None:
+            continue
+        command, index, frame = event
+        counts[protocol_schema.COMMAND_NAMES.get(command, hex(command))] += 1
+        if command == protocol_schema.SENSOR_COMMAND:
+            mask = response_sensor_mask(frame)
+            if last_mask is not None:
+                sensor_changes += bin(last_mask ^ mask).count("1")
+            last_mask = mask
+        elif command == protocol_schema.LOAD_CELL_COMMAND and index is not None:
+            value = protocol_schema.decode_load_cell(frame)
+            low, high = load_cells.get(index, (value, value))
+            load_cells[index] = (min(low, value), max(high, value))
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frames,
+        "responses": dict(counts),
+        "sensor_changes": sensor_changes,
+        "load_cells": {index: load_cells[index] for index in sorted(load_cells)},
+        "elapsed_s": elapsed,
+        "frames_per_s": frames / elapsed if elapsed else 0.0,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="통신 캡처 확인/재생")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    dump_parser = subparsers.add_parser("dump", help="print every frame as hex")
+    dump_parser.add_argument("capture")
+    replay_parser = subparsers.add_parser("replay", help="decode a capture and print a summary")
+    replay_parser.add_argument("capture")
+    replay_parser.add_argument("--speed", type=parse_speed, default=None, help="time scale, or max (default)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.action == "dump":
+            dump(args.capture)
+            return 0
+        summary = replay_summary(args.capture, args.speed)
+    except (OSError, ValueError) as e:
+        print(f"wire_capture: {e}", file=sys.stderr)
+        return 2
+    print(f"{summary['frames']:,} frames in {summary['elapsed_s']:.2f}s ({summary['frames_per_s']:,.0f} frames/s)")
+    for name, count in sorted(summary["responses"].items()):
+        print(f"  {name}: {count:,}")
+    print(f"  sensor changes: {summary['sensor_changes']:,}")
+    for index, (low, high) in summary["load_cells"].items():
+        print(f"  load cell {index}: {low:.3f} .. {high:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+from certification.board_result import default_certification_steps
+from connection.board_engine import MultiBoardEngine
+
+
+class CertificationRunner:
+    """
+    Runs the certification steps, or a compiled sequence plan, and optionally the loopback
+    timing test against one or more boards without any GUI, on the asyncio MultiBoardEngine.
+    """
+
+    def __init__(self, boards, timeout=2.0, steps=None, max_workers=32, plan=None, loopback=None,
+                 poll_interval=0.5):
+        """
+        :param max_workers: most boards certified at the same time
+        :param poll_interval: seconds between background sensor polls of each board
+        """
+        self.boards = boards
+        self.timeout = timeout
+        self.steps = steps if steps is not None else default_certification_steps()
+        self.max_workers = max_workers
+        self.plan = plan
+        self.loopback = loopback
+        self.poll_interval = poll_interval
+
+    def run(self):
+        """
+        :return: list of BoardResult, in the order the boards were given
+        """
+        engine = MultiBoardEngine(self.boards, poll_interval=self.poll_interval, timeout=self.timeout,
+                                  max_concurrency=max(1, self.max_workers), steps=self.steps, plan=self.plan,
+                                  loopback=self.loopback)
+        return engine.run()
@@ -1,8 +1,30 @@
 from Log.logger_config import logger
+from message_formatter import protocol_schema
+from message_formatter.protocol_schema import (
+    FRAME_TABLE, SENSOR_COMMAND, RELAY_COMMAND, INTERNAL_MOTOR_COMMAND, EXTERNAL_MOTOR_COMMAND,
+    LOAD_CELL_COMMAND, RELAY_ON, RELAY_OFF, MOTOR_CW, MOTOR_CCW, MOTOR_CONTROL,
+    encode_batch, decode_sensor, decode_load_cell, decode_load_cells
+)
 
 
 class MessageFormatter:
 
+    REQUEST_HEAD = protocol_schema.REQUEST_HEAD
+    END_BYTE = protocol_schema.END_BYTE
+
+    SENSOR_COMMAND = SENSOR_COMMAND
+    RELAY_COMMAND = RELAY_COMMAND
+    INTERNAL_MOTOR_COMMAND = INTERNAL_MOTOR_COMMAND
+    EXTERNAL_MOTOR_COMMAND = EXTERNAL_MOTOR_COMMAND
+    LOAD_CELL_COMMAND = LOAD_CELL_COMMAND
+
+    # Responses whose payload may legitimately contain END_BYTE have a fixed length
+    # (HEAD + COMMAND + payload + END). Everything else is delimited by END_BYTE.
+    RESPONSE_LENGTH = protocol_schema.RESPONSE_LENGTH
+
+    RELAY_COUNT = protocol_schema.RELAY_COUNT
+    LOAD_CELL_COUNT = protocol_schema.LOAD_CELL_COUNT
+
     INTERNAL_MOTOR_PARAMETER = {
         "Internal Motor 1": 0x01,
         "Internal Motor 2": 0x02,
@@ -44,106 +66,55 @@ class MessageFormatter:
 
     @staticmethod
     def sensor_message():
-        # REQUEST_HEAD
-        request = bytearray()
-        request.append(0x7E)
-        # COMMAND
-        request.append(0xB0)
-        # END BYTE
-        request.append(0XAA)
-
-        return bytes(request)
+        return FRAME_TABLE[(SENSOR_COMMAND,)]
 
     @staticmethod
     def relay_on_message(relay_number):
-        # REQUEST_HEAD
-        request = bytearray()
-        request.append(0x7E)
-        # COMMAND
-        request.append(0xB1)
-        # RELAY NUMBER
-        request.append(int(relay_number))
-        # CONTROL
-        request.append(0x01)
-        # END BYTE
-        request.append(0XAA)
-
-        return bytes(request)
+        return FRAME_TABLE[(RELAY_COMMAND, int(relay_number), RELAY_ON)]
 
     @staticmethod
     def relay_off_message(relay_number):
-        # REQUEST_HEAD
-        request = bytearray()
-        request.append(0x7E)
-        # COMMAND
-        request.append(0xB1)
-        # RELAY NUMBER
-        request.append(int(relay_number))
-        # CONTROL
-        request.append(0x00)
-        # END BYTE
-        request.append(0XAA)
-
-        return bytes(request)
+        return FRAME_TABLE[(RELAY_COMMAND, int(relay_number), RELAY_OFF)]
 
     @staticmethod
     def internal_motor_cw_message(motor_number):
-        # REQUEST_HEAD
-        request = bytearray()
-        request.append(0x7E)
-        # COMMAND
-        request.append(0xB2)
-        # RELAY NUMBER
-        request.append(MessageFormatter.INTERNAL_MOTOR_PARAMETER[motor_number])
-        # CW
-        request.append(0x00)
-        # END BYTE
-        request.append(0XAA)
-
-        return bytes(request)
+        return FRAME_TABLE[(INTERNAL_MOTOR_COMMAND, MessageFormatter.INTERNAL_MOTOR_PARAMETER[motor_number], MOTOR_CW)]
 
     @staticmethod
     def internal_motor_ccw_message(motor_number):
-        # REQUEST_HEAD
-        request = bytearray()
-        request.append(0x7E)
-        # COMMAND
-        request.append(0xB2)
-        # RELAY NUMBER
-        request.append(MessageFormatter.INTERNAL_MOTOR_PARAMETER[motor_number])
-        # CW
-        request.append(0xff)
-        # END BYTE
-        request.append(0XAA)
-
-        return bytes(request)
+        return FRAME_TABLE[(INTERNAL_MOTOR_COMMAND, MessageFormatter.INTERNAL_MOTOR_PARAMETER[motor_number], MOTOR_CCW)]
 
     @staticmethod
     def external_motor_control_message(motor_number):
-        # REQUEST_HEAD
-        request = bytearray()
-        request.append(0x7E)
-        # COMMAND
-        request.append(0xB3)
-        # RELAY NUMBER
-        request.append(MessageFormatter.EXTERNAL_MOTOR_PARAMETER[motor_number])
-        # CW
-        request.append(0x00)
-        # END BYTE
-        request.append(0XAA)
-
-        return bytes(request)
+        return FRAME_TABLE[(EXTERNAL_MOTOR_COMMAND, MessageFormatter.EXTERNAL_MOTOR_PARAMETER[motor_number],
+                            MOTOR_CONTROL)]
 
     @staticmethod
     def get_loadcell_value_message(cell_index):
-        # REQUEST_HEAD
-        request = bytearray()
-        request.append(0x7E)
-        # COMMAND
-        request.append(0xB4)
-        # INDEX
-        request.append(cell_index-1)
-        # END BYTE
-        request.append(0XAA)
-
-        return bytes(request)
+        return FRAME_TABLE[(LOAD_CELL_COMMAND, cell_index - 1)]
+
+    @staticmethod
+    def load_cell_sweep_messages():
+        return [MessageFormatter.get_loadcell_value_message(index)
+                for index in range(1, protocol_schema.LOAD_CELL_COUNT + 1)]
+
+    @staticmethod
+    def batch_message(keys):
+        """
+        Encode several commands into one buffer
+        :param keys: iterable of FRAME_TABLE keys, e.g. (LOAD_CELL_COMMAND, 0)
+        :return: concatenated request frames
+        """
+        return encode_batch(keys)
+
+    @staticmethod
+    def parse_sensor_response(response):
+        return decode_sensor(response)
+
+    @staticmethod
+    def parse_load_cell_response(response):
+        return decode_load_cell(response)
+
+    @staticmethod
+    def parse_load_cell_responses(responses):
+        return decode_load_cells(responses)
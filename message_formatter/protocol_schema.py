@@ -0,0 +1,99 @@
+import struct
+from collections import namedtuple
+from types import MappingProxyType
+
+REQUEST_HEAD = 0x7E
+END_BYTE = 0xAA
+
+SENSOR_COMMAND = 0xB0
+RELAY_COMMAND = 0xB1
+INTERNAL_MOTOR_COMMAND = 0xB2
+EXTERNAL_MOTOR_COMMAND = 0xB3
+LOAD_CELL_COMMAND = 0xB4
+
+RELAY_OFF = 0x00
+RELAY_ON = 0x01
+MOTOR_CW = 0x00
+MOTOR_CCW = 0xFF
+MOTOR_CONTROL = 0x00
+
+RELAY_COUNT = 7
+INTERNAL_MOTOR_COUNT = 6
+EXTERNAL_MOTOR_COUNT = 4
+LOAD_CELL_COUNT = 16
+
+# HEAD, COMMAND, payload..., END
+SENSOR_RESPONSE = struct.Struct('<BBBBB')
+LOAD_CELL_RESPONSE = struct.Struct('<BBfB')
+
+# code: command byte
+# parameters: every valid parameter tuple that goes between COMMAND and END
+# response: Struct of a fixed-length response, None if it is only delimited by END_BYTE
+CommandSpec = namedtuple('CommandSpec', ['name', 'code', 'parameters', 'response'])
+
+COMMANDS = (
+    CommandSpec('sensor', SENSOR_COMMAND, ((),), SENSOR_RESPONSE),
+    CommandSpec('relay', RELAY_COMMAND,
+                tuple((relay, state) for relay in range(1, RELAY_COUNT + 1) for state in (RELAY_OFF, RELAY_ON)),
+                None),
+    CommandSpec('internal_motor', INTERNAL_MOTOR_COMMAND,
+                tuple((motor, direction) for motor in range(1, INTERNAL_MOTOR_COUNT + 1)
+                      for direction in (MOTOR_CW, MOTOR_CCW)),
+                None),
+    CommandSpec('external_motor', EXTERNAL_MOTOR_COMMAND,
+                tuple((motor, MOTOR_CONTROL) for motor in range(1, EXTERNAL_MOTOR_COUNT + 1)),
+                None),
+    CommandSpec('load_cell', LOAD_CELL_COMMAND, tuple((index,) for index in range(LOAD_CELL_COUNT)),
+                LOAD_CELL_RESPONSE),
+)
+
+COMMAND_NAMES = MappingProxyType({spec.code: spec.name for spec in COMMANDS})
+
+RESPONSE_LENGTH = MappingProxyType({spec.code: spec.response.size for spec in COMMANDS if spec.response})
+
+
+def build_frame(code, parameters=()):
+    return bytes((REQUEST_HEAD, code, *parameters, END_BYTE))
+
+
+# (code, *parameters) -> request frame, built once for the whole command set
+FRAME_TABLE = MappingProxyType({
+    (spec.code, *parameters): build_frame(spec.code, parameters)
+    for spec in COMMANDS
+    for parameters in spec.parameters
+})
+
+
+def encode_batch(keys):
+    """
+    Encode several commands into one contiguous buffer for a single sendall
+    :param keys: iterable of FRAME_TABLE keys
+    :return: concatenated request frames
+    """
+    return b''.join([FRAME_TABLE[key] for key in keys])
+
+
+def decode_sensor(response):
+    """
+    :param response: sensor response frame
+    :return: (sensor_value_1, sensor_value_2)
+    """
+    _, _, sensor_value_1, sensor_value_2, _ = SENSOR_RESPONSE.unpack_from(response)
+    return sensor_value_1, sensor_value_2
+
+
+def decode_load_cell(response):
+    """
+    :param response: load cell response frame
+    :return: load cell value
+    """
+    return LOAD_CELL_RESPONSE.unpack_from(response)[2]
+
+
+def decode_load_cells(responses):
+    """
+    Decode a whole sweep of load cell responses in one pass
+    :param responses: load cell response frames, in request order
+    :return: list of load cell values
+    """
+    return [value for _, _, value, _ in LOAD_CELL_RESPONSE.iter_unpack(b''.join(responses))]
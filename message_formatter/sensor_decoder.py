@@ -0,0 +1,63 @@
+# Sensor numbers carried by bits 7..0 of each sensor byte in the 0xB0 response
+SENSOR_VALUE_1_ORDER = (1, 2, 3, 4, 9, 10, 11, 12)
+SENSOR_VALUE_2_ORDER = (5, 6, 7, 8, 13, 14, 15, 16)
+
+SENSOR_COUNT = 16
+
+
+def _build_table(order):
+    table = []
+    for value in range(256):
+        mask = 0
+        for bit, sensor in enumerate(order):
+            if (value >> (7 - bit)) & 1:
+                mask |= 1 << (sensor - 1)
+        table.append(mask)
+    return tuple(table)
+
+
+# byte value -> 16-bit sensor mask, bit (n - 1) set when sensor n is on
+SENSOR_VALUE_1_TABLE = _build_table(SENSOR_VALUE_1_ORDER)
+SENSOR_VALUE_2_TABLE = _build_table(SENSOR_VALUE_2_ORDER)
+
+
+def sensor_mask(sensor_value_1, sensor_value_2):
+    return SENSOR_VALUE_1_TABLE[sensor_value_1] | SENSOR_VALUE_2_TABLE[sensor_value_2]
+
+
+def response_sensor_mask(response):
+    """
+    :param response: sensor response frame
+    :return: 16-bit sensor mask
+    """
+    return SENSOR_VALUE_1_TABLE[response[2]] | SENSOR_VALUE_2_TABLE[response[3]]
+
+
+def sensor_state(mask, sensor_number):
+    return (mask >> (sensor_number - 1)) & 1
+
+
+def changed_sensors(old_mask, new_mask):
+    """
+    Sensors whose state differs between two masks
+    :return: iterator of (sensor number, new state)
+    """
+    diff = old_mask ^ new_mask
+    while diff:
+        lowest = diff & -diff
+        index = lowest.bit_length() - 1
+        yield index + 1, (new_mask >> index) & 1
+        diff ^= lowest
+
+
+def encode_sensor_mask(mask):
+    """
+    Inverse of sensor_mask, for producing sensor responses
+    :param mask: 16-bit sensor mask
+    :return: (sensor_value_1, sensor_value_2)
+    """
+    sensor_value_1 = sensor_value_2 = 0
+    for bit in range(8):
+        sensor_value_1 |= sensor_state(mask, SENSOR_VALUE_1_ORDER[bit]) << (7 - bit)
+        sensor_value_2 |= sensor_state(mask, SENSOR_VALUE_2_ORDER[bit]) << (7 - bit)
+    return sensor_value_1, sensor_value_2
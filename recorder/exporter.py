@@ -0,0 +1,260 @@
+"""
+Streaming export of recorded sensor and load-cell history.
+
+    python -m recorder.exporter --session 20240101_120000 --board 192.168.0.110:502 \\
+        --start 2024-01-01T12:00 --end 2024-01-01T13:00 --format csv --output export/run1
+
+Writes <output>_sensor.<ext> and <output>_load_cell.<ext>. Records are read from the
+memory-mapped recordings in fixed-size chunks and written out chunk by chunk, so memory
+use does not depend on how much is exported.
+
+The columnar format (.bcc) is a sequence of row groups, one per chunk:
+
+    magic b'BCCOL1\\n'
+    per row group: uint32 metadata length, metadata JSON {"session", "board", "rows", "columns"}
+                   per column: uint32 length, zlib-compressed little-endian array
+"""
+import argparse
+import csv
+import glob
+import gzip
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+
+from message_formatter.sensor_decoder import sensor_mask
+from recorder.stream_recorder import LOAD_CELL_RECORD, RECORDING_DIRECTORY, SENSOR_RECORD, RecordFile
+
+CHUNK_RECORDS = 1 << 16
+COLUMNAR_MAGIC = b'BCCOL1\n'
+LENGTH = struct.Struct('<I')
+
+SENSOR = "sensor"
+LOAD_CELL = "load_cell"
+STREAMS = {
+    SENSOR: (SENSOR_RECORD, ("time", "sensor_mask")),
+    LOAD_CELL: (LOAD_CELL_RECORD, ("time", "load_cell", "value")),
+}
+
+
+@dataclass
+class Recording:
+    session: str
+    board: str
+    stream: str
+    path: str
+
+
+def find_recordings(directory=RECORDING_DIRECTORY, session=None, board=None, stream=None):
+    """
+    :return: list of Recording matching the filters, ordered by session
+    """
+    recordings = []
+    for name, (record, _) in STREAMS.items():
+        if stream is not None and name != stream:
+            continue
+        for path in sorted(glob.glob(os.path.join(directory, session or "*", f"*_{name}.bin"))):
+            record_file = RecordFile(path, record)
+            label = record_file.label
+            record_file.close()
+            if board is None or label == board:
+                recordings.append(Recording(os.path.basename(os.path.dirname(path)), label, name, path))
+    return sorted(recordings, key=lambda recording: (recording.session, recording.board, recording.stream))
+
+
+def iter_chunks(record_file, start_time=None, end_time=None, chunk_records=CHUNK_RECORDS):
+    """
+    :return: generator of record tuple lists, at most chunk_records long, within the time range
+    """
+    start = 0 if start_time is None else record_file.bisect(start_time)
+    stop = len(record_file) if end_time is None else record_file.bisect(end_time)
+    for position in range(start, stop, chunk_records):
+        yield record_file.read(position, min(position + chunk_records, stop))
+
+
+def count_records(recordings, start_time=None, end_time=None):
+    total = 0
+    for recording in recordings:
+        record_file = RecordFile(recording.path, STREAMS[recording.stream][0])
+        start = 0 if start_time is None else record_file.bisect(start_time)
+        stop = len(record_file) if end_time is None else record_file.bisect(end_time)
+        total += max(0, stop - start)
+        record_file.close()
+    return total
+
+
+def _columns(stream, chunk):
+    # Column arrays of one chunk; sensor bytes are turned into the 16-bit sensor mask
+    if stream == SENSOR:
+        times, sensor_values_1, sensor_values_2 = zip(*chunk)
+        return [array('d', times), array('H', map(sensor_mask, sensor_values_1, sensor_values_2))]
+    times, cells, values = zip(*chunk)
+    return [array('d', times), array('B', cells), array('f', values)]
+
+
+def iter_column_chunks(recordings, start_time=None, end_time=None, chunk_records=CHUNK_RECORDS):
+    """
+    :return: generator of (Recording, column arrays) per chunk
+    """
+    for recording in recordings:
+        record_file = RecordFile(recording.path, STREAMS[recording.stream][0])
+        try:
+            for chunk in iter_chunks(record_file, start_time, end_time, chunk_records):
+                yield recording, _columns(recording.stream, chunk)
+        finally:
+            record_file.close()
+
+
+class CsvWriter:
+
+    def __init__(self, path, stream):
+        self.file = (gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=1) if path.endswith(".gz")
+                     else open(path, "w", newline="", encoding="utf-8"))
+        csv.writer(self.file).writerow(("session", "board") + STREAMS[stream][1])
+
+    def write(self, recording, columns):
+        # One formatted string per chunk; session and board go through csv quoting once
+        prefix = ','.join(_csv_field(field) for field in (recording.session, recording.board))
+        if len(columns) == 2:
+            lines = [f"{prefix},{timestamp:.6f},{mask}\n" for timestamp, mask in zip(*columns)]
+        else:
+            lines = [f"{prefix},{timestamp:.6f},{cell},{value:.6g}\n" for timestamp, cell, value in zip(*columns)]
+        self.file.write(''.join(lines))
+
+    def close(self):
+        self.file.close()
+
+
+def _csv_field(value):
+    if any(character in value for character in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+class ColumnarWriter:
+
+    def __init__(self, path, stream):
+        self.stream = stream
+        self.file = open(path, "wb")
+        self.file.write(COLUMNAR_MAGIC)
+
+    def write(self, recording, columns):
+        metadata = json.dumps({
+            "session": recording.session,
+            "board": recording.board,
+            "rows": len(columns[0]),
+            "columns": [[name, column.typecode] for name, column in zip(STREAMS[self.stream][1], columns)],
+        }).encode()
+        self.file.write(LENGTH.pack(len(metadata)))
+        self.file.write(metadata)
+        for column in columns:
+            if sys.byteorder != "little":
+                column.byteswap()
+            data = zlib.compress(column.tobytes(), 1)
+            self.file.write(LENGTH.pack(len(data)))
+            self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+
+def read_columnar(path):
+    """
+    :return: generator of (metadata dict, {column name: array}) per row group
+    """
+    with open(path, "rb") as columnar_file:
+        if columnar_file.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path}: not a columnar export")
+        while True:
+            header = columnar_file.read(LENGTH.size)
+            if not header:
+                return
+            metadata = json.loads(columnar_file.read(LENGTH.unpack(header)[0]))
+            columns = {}
+            for name, typecode in metadata["columns"]:
+                length = LENGTH.unpack(columnar_file.read(LENGTH.size))[0]
+                column = array(typecode)
+                column.frombytes(zlib.decompress(columnar_file.read(length)))
+                if sys.byteorder != "little":
+                    column.byteswap()
+                columns[name] = column
+            yield metadata, columns
+
+
+WRITERS = {"csv": (CsvWriter, ".csv"), "csv.gz": (CsvWriter, ".csv.gz"), "columnar": (ColumnarWriter, ".bcc")}
+
+
+def export_history(output, export_format="csv", directory=RECORDING_DIRECTORY, session=None, board=None,
+                   start_time=None, end_time=None, chunk_records=CHUNK_RECORDS, progress=None):
+    """
+    :param output: output path prefix; _sensor and _load_cell files are written next to it
+    :param export_format: "csv", "csv.gz" or "columnar"
+    :param progress: optional callback(records done, records total) after every chunk
+    :return: list of written file paths
+    """
+    writer_class, extension = WRITERS[export_format]
+    recordings = find_recordings(directory, session, board)
+    total = count_records(recordings, start_time, end_time)
+    done = 0
+    paths = []
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    for stream in STREAMS:
+        stream_recordings = [recording for recording in recordings if recording.stream == stream]
+        path = f"{output}_{stream}{extension}"
+        writer = writer_class(path, stream)
+        try:
+            for recording, columns in iter_column_chunks(stream_recordings, start_time, end_time, chunk_records):
+                writer.write(recording, columns)
+                done += len(columns[0])
+                if progress is not None:
+                    progress(done, total)
+        finally:
+            writer.close()
+        paths.append(path)
+    return paths
+
+
+def parse_time(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="기록 내보내기")
+    parser.add_argument("--output", required=True, help="output path prefix")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--directory", default=RECORDING_DIRECTORY)
+    parser.add_argument("--session")
+    parser.add_argument("--board", help="HOST:PORT")
+    parser.add_argument("--start", type=parse_time, help="ISO time or unix timestamp")
+    parser.add_argument("--end", type=parse_time, help="ISO time or unix timestamp")
+    parser.add_argument("--chunk", type=int, default=CHUNK_RECORDS, help="records per chunk")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    def report(done, total):
+        print(f"\r{done:,}/{total:,} records ({done / max(total, 1):.0%})", end="", file=sys.stderr, flush=True)
+
+    paths = export_history(args.output, args.format, args.directory, args.session, args.board,
+                           args.start, args.end, args.chunk, report)
+    print(file=sys.stderr)
+    for path in paths:
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
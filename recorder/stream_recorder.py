@@ -0,0 +1,288 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+
+from Log.logger_config import LOG_DIRECTORY
+from message_formatter.sensor_decoder import sensor_mask
+
+SENSOR_RECORD = struct.Struct('<dBB')  # timestamp, response[2], response[3]
+LOAD_CELL_RECORD = struct.Struct('<dBf')  # timestamp, load cell index (1-16), value
+
+RECORDING_DIRECTORY = os.path.join(LOG_DIRECTORY, "recordings")
+
+SENSOR_CAPACITY = 1 << 22  # most records kept on disk, ~40 MB; 4.8 days at 10 Hz
+LOAD_CELL_CAPACITY = 1 << 22  # ~50 MB; 3 days of 16-cell sweeps at 1 Hz
+INITIAL_SLOTS = 1 << 14  # record files start this small and double until they reach capacity
+
+# Record timestamps are wall-clock seconds, but slices bisect on them, so they must never
+# go backwards: they follow the monotonic clock from the wall-clock time at startup and
+# ignore later adjustments of the system clock
+_CLOCK_ORIGIN = time.time() - time.monotonic()
+
+
+def wall_clock():
+    """
+    :return: seconds since the epoch that never decrease, for timestamps of recorded samples
+    """
+    return _CLOCK_ORIGIN + time.monotonic()
+
+
+def recording_paths(session_id, board, directory=RECORDING_DIRECTORY):
+    """
+    :return: (sensor file path, load-cell file path) of one board in one session
+    """
+    prefix = os.path.join(directory, session_id, board.replace(':', '_'))
+    return f"{prefix}_sensor.bin", f"{prefix}_load_cell.bin"
+
+
+class RecordFile:
+    """
+    File of fixed-length records used as a ring: once `capacity` records have been written
+    the oldest are overwritten, so the file never grows past capacity during long runs. The
+    slots are allocated as they fill, doubling from INITIAL_SLOTS, so short sessions take
+    little disk space.
+
+    Layout: header (magic, version, record size, capacity, records written, label) followed
+    by up to `capacity` record slots. Records are in time order when read from the oldest slot.
+    """
+
+    MAGIC = b'BCTS'
+    VERSION = 2  # 1 had no label in the header
+    HEADER = struct.Struct('<4sHHIQ64s')
+    WRITTEN_OFFSET = 12
+
+    def __init__(self, path, record, capacity=None, writable=False, label=""):
+        """
+        :param path: record file
+        :param record: struct.Struct of one record, its first field must be the timestamp
+        :param capacity: record slots; required when writable, read from the header otherwise
+        :param writable: create (truncating) the file instead of opening an existing one
+        :param label: short text kept in the header, e.g. the board address
+        """
+        self.path = path
+        self.record = record
+        self.writable = writable
+        self.label = label
+        if writable:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.file = open(path, 'w+b')
+            self.capacity = capacity
+            self.slots = min(capacity, INITIAL_SLOTS)
+            self.file.truncate(self.HEADER.size + self.slots * record.size)
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            self.written = 0
+            self.HEADER.pack_into(self.map, 0, self.MAGIC, self.VERSION, record.size, capacity, 0, label.encode())
+        else:
+            self.file = open(path, 'rb')
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version = struct.unpack_from('<4sH', self.map, 0) if len(self.map) >= 6 else (None, None)
+            if magic != self.MAGIC:
+                self.close()
+                raise ValueError(f"{path}: not a record file")
+            if version != self.VERSION:
+                self.close()
+                raise ValueError(f"{path}: record file version {version}, expected {self.VERSION}")
+            _, _, record_size, self.capacity, self.written, label = self.HEADER.unpack_from(self.map, 0)
+            self.label = label.rstrip(b'\0').decode(errors="replace")
+            if record_size != record.size:
+                self.close()
+                raise ValueError(f"{path}: not a {record.format} record file")
+            self.slots = (len(self.map) - self.HEADER.size) // record.size
+            if min(self.written, self.capacity) > self.slots:
+                # A live recording grew after it was mapped: read the records the mapped
+                # slots hold, which the writer filled in order before growing past them
+                self.written = self.slots
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def _offset(self, position):
+        # position 0 is the oldest record still on disk
+        return self.HEADER.size + (self.written - len(self) + position) % self.capacity * self.record.size
+
+    def write(self, records):
+        """
+        :param records: iterable of record tuples in time order
+        """
+        pack_into = self.record.pack_into
+        for fields in records:
+            if self.written == self.slots < self.capacity:
+                self._grow()
+            pack_into(self.map, self.HEADER.size + self.written % self.capacity * self.record.size, *fields)
+            self.written += 1
+        struct.pack_into('<Q', self.map, self.WRITTEN_OFFSET, self.written)
+
+    def _grow(self):
+        self.slots = min(self.capacity, self.slots * 2)
+        self.map.close()
+        self.file.truncate(self.HEADER.size + self.slots * self.record.size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+    def timestamp(self, position):
+        return struct.unpack_from('<d', self.map, self._offset(position))[0]
+
+    def bisect(self, timestamp):
+        """
+        :return: first position whose timestamp is >= timestamp
+        """
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def read(self, start=0, stop=None):
+        """
+        :return: record tuples for positions start..stop
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        records = []
+        while start < stop:
+            offset = self._offset(start)
+            # contiguous up to the end of the slot area
+            count = min(stop - start, (len(self.map) - offset) // self.record.size)
+            records.extend(self.record.iter_unpack(self.map[offset:offset + count * self.record.size]))
+            start += count
+        return records
+
+    def slice(self, start_time=None, end_time=None):
+        """
+        :return: records with start_time <= timestamp < end_time
+        """
+        start = 0 if start_time is None else self.bisect(start_time)
+        stop = len(self) if end_time is None else self.bisect(end_time)
+        return self.read(start, stop)
+
+    def flush(self):
+        if self.writable and not self.map.closed:
+            self.map.flush()
+
+    def close(self):
+        if not self.map.closed:
+            self.flush()
+            self.map.close()
+        self.file.close()
+
+
+class ChannelBuffer:
+    """
+    In-memory ring of the newest records, one typed array per field, so appends allocate
+    nothing. Full buffers are spilled to the channel's RecordFile.
+    """
+
+    def __init__(self, typecodes, size):
+        self.columns = [array(typecode, bytes(array(typecode).itemsize * size)) for typecode in typecodes]
+        self.size = size
+        self.count = 0
+
+    def append(self, fields):
+        for column, value in zip(self.columns, fields):
+            column[self.count] = value
+        self.count += 1
+        return self.count == self.size
+
+    def drain(self):
+        records = zip(*(column[:self.count] for column in self.columns))
+        self.count = 0
+        return records
+
+
+class StreamRecorder:
+    """
+    Timestamped history of the sensor bitmask and load-cell values of one board in one
+    session, stored as <directory>/<session>/<board>_sensor.bin and _load_cell.bin.
+
+    Appends go to small array buffers and are spilled to two memory-mapped ring files,
+    so memory stays flat no matter how long the session runs. Any time range can be read
+    back with sensor_slice/load_cell_slice, also from a finished session via open().
+    """
+
+    def __init__(self, session_id, board="-", directory=RECORDING_DIRECTORY, sensor_capacity=SENSOR_CAPACITY,
+                 load_cell_capacity=LOAD_CELL_CAPACITY, buffer_size=1024):
+        self._lock = threading.Lock()
+        self.closed = False
+        self.board = board
+        sensor_path, load_cell_path = recording_paths(session_id, board, directory)
+        self.sensor_file = RecordFile(sensor_path, SENSOR_RECORD, sensor_capacity, writable=True, label=board)
+        self.load_cell_file = RecordFile(load_cell_path, LOAD_CELL_RECORD, load_cell_capacity, writable=True,
+                                         label=board)
+        self.sensor_buffer = ChannelBuffer('dBB', buffer_size)
+        self.load_cell_buffer = ChannelBuffer('dBf', buffer_size)
+
+    @classmethod
+    def open(cls, session_id, board="-", directory=RECORDING_DIRECTORY):
+        """
+        :return: (sensor RecordFile, load-cell RecordFile) of a recorded session, read-only
+        """
+        sensor_path, load_cell_path = recording_paths(session_id, board, directory)
+        return RecordFile(sensor_path, SENSOR_RECORD), RecordFile(load_cell_path, LOAD_CELL_RECORD)
+
+    def record_sensor(self, response, timestamp=None):
+        """
+        :param response: sensor response frame
+        """
+        timestamp = wall_clock() if timestamp is None else timestamp
+        with self._lock:
+            if self.closed:
+                return
+            if self.sensor_buffer.append((timestamp, response[2], response[3])):
+                self.sensor_file.write(self.sensor_buffer.drain())
+
+    def record_load_cells(self, values, first_index=1, timestamp=None):
+        """
+        :param values: load-cell values, values[0] belongs to load cell first_index
+        :param timestamp: defaults to wall_clock(); explicit timestamps must not decrease either
+        """
+        timestamp = wall_clock() if timestamp is None else timestamp
+        with self._lock:
+            if self.closed:
+                return
+            for index, value in enumerate(values, start=first_index):
+                if self.load_cell_buffer.append((timestamp, index, value)):
+                    self.load_cell_file.write(self.load_cell_buffer.drain())
+
+    def flush(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.sensor_file.write(self.sensor_buffer.drain())
+            self.load_cell_file.write(self.load_cell_buffer.drain())
+
+    def sensor_slice(self, start_time=None, end_time=None):
+        """
+        :return: list of (timestamp, sensor mask) with bit n-1 set when sensor n is on
+        """
+        self.flush()
+        with self._lock:  # a write may remap the file when it grows
+            records = self.sensor_file.slice(start_time, end_time)
+        return [(timestamp, sensor_mask(sensor_value_1, sensor_value_2))
+                for timestamp, sensor_value_1, sensor_value_2 in records]
+
+    def load_cell_slice(self, start_time=None, end_time=None, load_cell_index=None):
+        """
+        :return: list of (timestamp, load cell index, value)
+        """
+        self.flush()
+        with self._lock:
+            records = self.load_cell_file.slice(start_time, end_time)
+        if load_cell_index is not None:
+            records = [record for record in records if record[1] == load_cell_index]
+        return records
+
+    def close(self):
+        # Late appends from other threads are dropped once closed
+        self.flush()
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.sensor_file.close()
+            self.load_cell_file.close()
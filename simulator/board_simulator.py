@@ -0,0 +1,277 @@
+"""
+Local stand-in for the certification board.
+
+    python -m simulator.board_simulator --boards 100 --port 15020 --latency 0.002 --jitter 0.001
+
+Each simulated board listens on its own port (port, port + 1, ...) and answers the full
+MessageFormatter command set. All boards share one event loop, so thousands of them fit
+in a single process.
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+
+from message_formatter import protocol_schema
+from message_formatter.sensor_decoder import encode_sensor_mask
+
+
+@dataclass
+class SimulatorConfig:
+    latency: float = 0.0  # seconds before a response is written
+    jitter: float = 0.0  # extra uniform random delay, seconds
+    command_latency: dict = field(default_factory=dict)  # command code -> latency override
+    fragment: bool = False  # write each response in several small pieces
+    merge_window: float = 0.0  # hold responses this long and write them together
+    drop_probability: float = 0.0  # chance per request of aborting the connection instead
+    relay_delay: float = 0.005  # relay n switches sensor n after this long
+    relay_delays: dict = field(default_factory=dict)  # relay -> relay_delay override
+    motor_delay: float = 0.05  # internal motor m reaches (CW) or leaves (CCW) its limit sensor (8 + m) after this long
+    sensor_toggle_mask: int = 0  # sensors flipped every sensor_toggle_period
+    sensor_toggle_period: float = 1.0
+    load_cell_base: float = 100.0
+    load_cell_amplitude: float = 0.5
+    load_cell_frequency: float = 0.2  # Hz
+    load_cell_drift: float = 0.0  # units per second
+    load_cell_noise: float = 0.05  # standard deviation
+
+
+class SimulatedBoard:
+    """
+    Board state: relay outputs, motor limit switches, and the sensor and load-cell signals
+    derived from them over time.
+    """
+
+    def __init__(self, config, seed=None):
+        self.config = config
+        self.random = random.Random(seed)
+        self.started = time.monotonic()
+        self.relay_changes = {}  # relay -> (state, time)
+        self.motor_changes = {}  # motor -> (direction, time, at limit before the change)
+        self.load_cell_offsets = [self.random.uniform(-10, 10) for _ in range(protocol_schema.LOAD_CELL_COUNT)]
+
+    def sensor_mask(self, now):
+        config = self.config
+        mask = 0
+        for relay, (state, changed) in self.relay_changes.items():
+            on = state == protocol_schema.RELAY_ON
+            if now - changed < config.relay_delays.get(relay, config.relay_delay):
+                on = not on  # contact has not moved yet
+            if on:
+                mask |= 1 << (relay - 1)
+        for motor in self.motor_changes:
+            if self.motor_at_limit(motor, now):
+                mask |= 1 << (8 + motor - 1)
+        if config.sensor_toggle_mask and int((now - self.started) / config.sensor_toggle_period) % 2:
+            mask ^= config.sensor_toggle_mask
+        return mask & 0xFFFF
+
+    def motor_at_limit(self, motor, now):
+        if motor not in self.motor_changes:
+            return False
+        direction, changed, previous = self.motor_changes[motor]
+        if now - changed < self.config.motor_delay:
+            return previous  # still travelling
+        return direction == protocol_schema.MOTOR_CW
+
+    def load_cell_value(self, index, now):
+        config = self.config
+        elapsed = now - self.started
+        return (config.load_cell_base + self.load_cell_offsets[index] + config.load_cell_drift * elapsed
+                + config.load_cell_amplitude * math.sin(2 * math.pi * config.load_cell_frequency * elapsed + index)
+                + self.random.gauss(0.0, config.load_cell_noise))
+
+    def respond(self, request):
+        """
+        :param request: complete request frame
+        :return: response frame, or None for unknown commands
+        """
+        now = time.monotonic()
+        command = request[1]
+        if command == protocol_schema.SENSOR_COMMAND:
+            sensor_value_1, sensor_value_2 = encode_sensor_mask(self.sensor_mask(now))
+            return protocol_schema.SENSOR_RESPONSE.pack(protocol_schema.REQUEST_HEAD, command, sensor_value_1,
+                                                        sensor_value_2, protocol_schema.END_BYTE)
+        if command == protocol_schema.LOAD_CELL_COMMAND and len(request) == 4:
+            index = request[2]
+            if index >= protocol_schema.LOAD_CELL_COUNT:
+                return None
+            return protocol_schema.LOAD_CELL_RESPONSE.pack(protocol_schema.REQUEST_HEAD, command,
+                                                           self.load_cell_value(index, now), protocol_schema.END_BYTE)
+        if command == protocol_schema.RELAY_COMMAND and len(request) == 5:
+            self.relay_changes[request[2]] = (request[3], now)
+            return bytes(request)
+        if command == protocol_schema.INTERNAL_MOTOR_COMMAND and len(request) == 5:
+            self.motor_changes[request[2]] = (request[3], now, self.motor_at_limit(request[2], now))
+            return bytes(request)
+        if command == protocol_schema.EXTERNAL_MOTOR_COMMAND and len(request) == 5:
+            return bytes(request)
+        return None
+
+
+class BoardSimulatorProtocol(asyncio.Protocol):
+
+    def __init__(self, board, stats):
+        self.board = board
+        self.config = board.config
+        self.stats = stats
+        self.transport = None
+        self.buffer = bytearray()
+        self.pending = bytearray()
+        self.flush_handle = None
+        self.last_send_at = 0.0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.stats["connections"] += 1
+
+    def connection_lost(self, exc):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+        self.transport = None
+
+    def data_received(self, data):
+        self.buffer += data
+        while True:
+            end = self.buffer.find(protocol_schema.END_BYTE)
+            if end < 0:
+                break
+            head = self.buffer.rfind(protocol_schema.REQUEST_HEAD, 0, end)
+            request = bytes(self.buffer[head:end + 1]) if head >= 0 else None
+            del self.buffer[:end + 1]
+            if request is not None and len(request) >= 3:
+                self.handle_request(request)
+
+    def handle_request(self, request):
+        self.stats["requests"] += 1
+        config = self.config
+        if config.drop_probability and self.board.random.random() < config.drop_probability:
+            self.stats["drops"] += 1
+            self.transport.abort()
+            return
+
+        response = self.board.respond(request)
+        if response is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        delay = config.command_latency.get(request[1], config.latency)
+        if config.jitter:
+            delay += self.board.random.uniform(0.0, config.jitter)
+        # Responses must leave in request order even when jitter says otherwise
+        send_at = max(loop.time() + delay, self.last_send_at)
+        self.last_send_at = send_at
+        if send_at <= loop.time():
+            self.queue_response(response)
+        else:
+            loop.call_at(send_at, self.queue_response, response)
+
+    def queue_response(self, response):
+        if self.transport is None:
+            return
+        if self.config.merge_window:
+            self.pending += response
+            if self.flush_handle is None:
+                self.flush_handle = asyncio.get_running_loop().call_later(self.config.merge_window, self.flush)
+        else:
+            self.write(response)
+
+    def flush(self):
+        self.flush_handle = None
+        if self.pending:
+            data, self.pending = bytes(self.pending), bytearray()
+            self.write(data)
+
+    def write(self, data):
+        if self.transport is None:
+            return
+        self.stats["responses"] += 1
+        if not self.config.fragment or len(data) < 2:
+            self.transport.write(data)
+            return
+        # asyncio sockets run with TCP_NODELAY, so separate writes go out as separate segments
+        position = 0
+        while position < len(data):
+            size = self.board.random.randint(1, max(1, len(data) // 2))
+            self.transport.write(data[position:position + size])
+            position += size
+
+
+class BoardSimulator:
+    """
+    Runs `count` simulated boards on consecutive ports of one host.
+    """
+
+    def __init__(self, count=1, host='127.0.0.1', port=15020, config=None, seed=None):
+        self.count = count
+        self.host = host
+        self.port = port
+        self.config = config or SimulatorConfig()
+        self.seed = seed
+        self.boards = []
+        self.servers = []
+        self.stats = {"connections": 0, "requests": 0, "responses": 0, "drops": 0}
+
+    @property
+    def addresses(self):
+        return [(self.host, self.port + index) for index in range(self.count)]
+
+    async def start(self):
+        for index, (host, port) in enumerate(self.addresses):
+            board = SimulatedBoard(self.config, None if self.seed is None else self.seed + index)
+            server = await asyncio.get_running_loop().create_server(
+                lambda board=board: BoardSimulatorProtocol(board, self.stats), host, port, backlog=128)
+            self.boards.append(board)
+            self.servers.append(server)
+        return self
+
+    async def stop(self):
+        for server in self.servers:
+            server.close()
+        for server in self.servers:
+            await server.wait_closed()
+        self.servers.clear()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="보드 시뮬레이터")
+    parser.add_argument("--boards", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=15020, help="port of the first board")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fragment", action="store_true")
+    parser.add_argument("--merge-window", type=float, default=0.0)
+    parser.add_argument("--drop-probability", type=float, default=0.0)
+    parser.add_argument("--sensor-toggle-mask", type=lambda value: int(value, 0), default=0)
+    parser.add_argument("--sensor-toggle-period", type=float, default=1.0)
+    parser.add_argument("--load-cell-drift", type=float, default=0.0)
+    parser.add_argument("--load-cell-noise", type=float, default=0.05)
+    parser.add_argument("--seed", type=int)
+    return parser
+
+
+async def serve_forever(args):
+    config = SimulatorConfig(latency=args.latency, jitter=args.jitter, fragment=args.fragment,
+                             merge_window=args.merge_window, drop_probability=args.drop_probability,
+                             sensor_toggle_mask=args.sensor_toggle_mask,
+                             sensor_toggle_period=args.sensor_toggle_period,
+                             load_cell_drift=args.load_cell_drift, load_cell_noise=args.load_cell_noise)
+    async with BoardSimulator(args.boards, args.host, args.port, config, args.seed) as simulator:
+        print(f"{simulator.count} boards on {args.host}:{args.port}-{args.port + args.boards - 1}", flush=True)
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve_forever(build_parser().parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+from connection.board_discovery import MAX_HOSTS, parse_targets
+
+
+def test_forms_expand_to_hosts():
+    assert parse_targets("192.168.0.10") == ["192.168.0.10"]
+    assert parse_targets("192.168.0.10-12") == ["192.168.0.10", "192.168.0.11", "192.168.0.12"]
+    assert parse_targets("10.0.0.254-10.0.1.1") == ["10.0.0.254", "10.0.0.255", "10.0.1.0", "10.0.1.1"]
+    assert parse_targets("192.168.0.0/30, 192.168.1.5") == ["192.168.0.1", "192.168.0.2", "192.168.1.5"]
+
+
+def test_empty_range_is_rejected():
+    with pytest.raises(ValueError):
+        parse_targets("192.168.0.20-10")
+
+
+def test_cap_allows_a_slash_16():
+    assert len(parse_targets("10.1.0.0/16")) == MAX_HOSTS - 2
+
+
+@pytest.mark.parametrize("spec", ["10.0.0.0/8", "10.0.0.0-10.255.255.255", "10.0.0.0/16, 10.1.0.0/29"])
+def test_oversized_targets_fail_before_expanding(spec):
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match="at most"):
+        parse_targets(spec)
+    # Expanding a /8 would take seconds and gigabytes
+    assert time.perf_counter() - start < 0.5
+
+
+def test_cap_counts_across_parts():
+    with pytest.raises(ValueError):
+        parse_targets("192.168.0.1-3, 192.168.0.9", max_hosts=3)
+    assert len(parse_targets("192.168.0.1-3", max_hosts=3)) == 3
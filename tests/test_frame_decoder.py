@@ -0,0 +1,68 @@
+import struct
+
+from connection.frame_decoder import FrameDecoder
+from message_formatter.message_formatter import MessageFormatter
+
+
+def load_cell_frame(value):
+    return struct.pack('<BBfB', MessageFormatter.REQUEST_HEAD, MessageFormatter.LOAD_CELL_COMMAND, value,
+                       MessageFormatter.END_BYTE)
+
+
+def sensor_frame(mask):
+    return bytes((MessageFormatter.REQUEST_HEAD, MessageFormatter.SENSOR_COMMAND, mask & 0xFF, mask >> 8,
+                  MessageFormatter.END_BYTE))
+
+
+def decode(decoder):
+    return [bytes(frame) for frame in decoder.frames()]
+
+
+def test_frame_split_across_reads():
+    frame = load_cell_frame(1.5)
+    decoder = FrameDecoder()
+    for byte in frame[:-1]:
+        decoder.feed(bytes((byte,)))
+        assert decode(decoder) == []
+    decoder.feed(frame[-1:])
+    assert decode(decoder) == [frame]
+    assert len(decoder) == 0
+
+
+def test_several_frames_in_one_read():
+    frames = [sensor_frame(0x0102), load_cell_frame(2.0), sensor_frame(0xFFFF)]
+    decoder = FrameDecoder()
+    decoder.feed(b''.join(frames))
+    assert decode(decoder) == frames
+    assert decoder.discarded == 0
+
+
+def test_resync_after_garbage():
+    frame = load_cell_frame(3.25)
+    decoder = FrameDecoder()
+    # Leading noise, then a head byte whose fixed length does not end on END_BYTE
+    decoder.feed(bytes((1, 2, MessageFormatter.REQUEST_HEAD, MessageFormatter.LOAD_CELL_COMMAND, 0, 0)))
+    decoder.feed(frame)
+    assert decode(decoder) == [frame]
+    assert decoder.discarded == 6
+
+
+def test_incomplete_tail_kept_across_buffer_compaction():
+    frame = sensor_frame(0x00FF)
+    decoder = FrameDecoder(buffer_size=FrameDecoder.MAX_FRAME_LENGTH + 8)
+    decoded = []
+    for _ in range(20):
+        decoder.feed(frame[:3])
+        decoded += decode(decoder)
+        decoder.feed(frame[3:])
+        decoded += decode(decoder)
+    assert decoded == [frame] * 20
+
+
+def test_reset_drops_partial_frame():
+    frame = load_cell_frame(4.0)
+    decoder = FrameDecoder()
+    decoder.feed(frame[:4])
+    decoder.reset()
+    decoder.feed(frame)
+    assert decode(decoder) == [frame]
@@ -0,0 +1,76 @@
+import math
+import statistics
+import struct
+
+import pytest
+
+from certification.load_cell_stats import AcquisitionSettings, LoadCellStatistics, acquisition_procedure
+from certification.procedure import Exchange
+from message_formatter.message_formatter import MessageFormatter
+
+
+def load_cell_response(value):
+    return struct.pack('<BBfB', MessageFormatter.REQUEST_HEAD, MessageFormatter.LOAD_CELL_COMMAND, value,
+                       MessageFormatter.END_BYTE)
+
+
+def run(procedure, reading):
+    """
+    Drive a procedure without a board; reading(cell, sweep) gives each cell's value
+    """
+    sweeps = 0
+    try:
+        step = next(procedure)
+        while True:
+            if isinstance(step, Exchange):
+                step.responses = [load_cell_response(reading(request[2] + 1, sweeps)) for request in step.requests]
+                sweeps += 1
+            step = procedure.send(None)
+    except StopIteration as stop:
+        return stop.value, sweeps
+
+
+def test_welford_matches_two_pass_statistics():
+    values = [10.0 + 1e-3 * ((i * 7919) % 101) for i in range(200)]
+    stats = LoadCellStatistics([4])
+    for i, value in enumerate(values):
+        stats.add_sweep([4], [value], float(i))
+    assert stats.count[0] == len(values)
+    assert stats.mean[0] == pytest.approx(statistics.fmean(values), rel=1e-12)
+    assert stats.stdev(0) == pytest.approx(statistics.stdev(values), rel=1e-9)
+    assert (stats.minimum[0], stats.maximum[0]) == (min(values), max(values))
+
+
+def test_drift_is_the_least_squares_slope():
+    stats = LoadCellStatistics([1, 2])
+    for i in range(50):
+        t = i * 0.1
+        stats.add_sweep([1, 2], [5.0 + 0.25 * t, 5.0], t)
+    slope, error = stats.drift(0)
+    assert slope == pytest.approx(0.25)
+    assert error == pytest.approx(0.0, abs=1e-9)
+    assert stats.drift(1)[0] == pytest.approx(0.0, abs=1e-12)
+
+
+def test_non_finite_readings_are_outliers_not_samples():
+    stats = LoadCellStatistics([1])
+    stats.add_sweep([1], [math.nan], 0.0)
+    stats.add_sweep([1], [1.0], 1.0)
+    assert stats.count[0] == 1
+    assert stats.outliers[0] == 1
+
+
+def test_steady_cells_are_decided_early():
+    settings = AcquisitionSettings(samples=50, min_samples=5, rate_hz=0, low=9.0, high=11.0)
+    verdicts, sweeps = run(acquisition_procedure([1, 2, 3], settings), lambda cell, sweep: 10.0)
+    assert sweeps == settings.min_samples
+    assert all(verdict.passed and verdict.decided_early for verdict in verdicts)
+
+
+def test_drifting_cell_fails():
+    settings = AcquisitionSettings(samples=30, min_samples=5, rate_hz=0, max_drift=1e-6)
+    verdicts, _ = run(acquisition_procedure([1, 2], settings),
+                      lambda cell, sweep: 10.0 + (0.5 * sweep if cell == 2 else 0.0))
+    assert verdicts[0].passed
+    assert not verdicts[1].passed
+    assert verdicts[1].drift > 0
@@ -0,0 +1,48 @@
+import math
+import sqlite3
+
+from certification.board_result import BoardResult, StepResult
+from certification.results_store import SCHEMA, ResultsStore
+
+
+def test_nan_values_are_stored_as_null(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    result = BoardResult("127.0.0.1", 5000, connected=True)
+    result.steps.append(StepResult("로드셀 1", "7e b4 00 aa", passed=False, value=math.nan))
+    result.load_cells = {1: math.nan, 2: 3.5, 3: math.inf}
+    store.record_board_result("session", result)
+    assert store.flush(5)
+    assert store.close()
+    assert store.query("SELECT cell, value FROM load_cells ORDER BY cell") == [
+        {"cell": 1, "value": None}, {"cell": 2, "value": 3.5}, {"cell": 3, "value": None}]
+    assert store.query("SELECT value FROM steps") == [{"value": None}]
+
+
+def test_failed_operation_does_not_drop_the_batch(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    store.record_load_cells("session", "a:1", [1.0])
+    store.record_load_cells("session", "a:1", ["bad"])  # TypeError inside the writer
+    store.record_load_cells("session", "a:1", [2.0])
+    assert store.flush(5)
+    assert store.close()
+    assert [row["value"] for row in store.query("SELECT value FROM load_cells ORDER BY id")] == [1.0, 2.0]
+
+
+def test_old_not_null_table_is_migrated(tmp_path):
+    path = str(tmp_path / "results.db")
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA.replace("    cell INTEGER NOT NULL,\n    value REAL\n",
+                                            "    cell INTEGER NOT NULL,\n    value REAL NOT NULL\n"))
+    connection.execute("INSERT INTO sessions (session_key, started) VALUES ('old', 0)")
+    connection.execute("INSERT INTO boards (name) VALUES ('a:1')")
+    connection.execute("INSERT INTO load_cells (session_id, board_id, time, cell, value) VALUES (1, 1, 0, 1, 4.0)")
+    connection.commit()
+    assert connection.execute("PRAGMA table_info(load_cells)").fetchall()[5][3] == 1
+    connection.close()
+
+    store = ResultsStore(path)
+    store.record_load_cells("new", "a:1", [math.nan])
+    assert store.flush(5)
+    assert store.close()
+    assert [row["value"] for row in store.query("SELECT value FROM load_cells ORDER BY id")] == [4.0, None]
+    assert store.query("PRAGMA table_info(load_cells)")[5]["notnull"] == 0
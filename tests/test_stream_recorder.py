@@ -0,0 +1,74 @@
+import struct
+
+import pytest
+
+from recorder import stream_recorder
+from recorder.stream_recorder import RecordFile
+
+RECORD = struct.Struct('<dI')
+
+
+@pytest.fixture
+def small_slots(monkeypatch):
+    monkeypatch.setattr(stream_recorder, "INITIAL_SLOTS", 4)
+
+
+def size_of(slots):
+    return RecordFile.HEADER.size + slots * RECORD.size
+
+
+def test_file_grows_as_it_fills(tmp_path, small_slots):
+    path = str(tmp_path / "sensor.rec")
+    record_file = RecordFile(path, RECORD, capacity=64, writable=True, label="a:1")
+    assert record_file.slots == 4
+    record_file.write((float(i), i) for i in range(5))
+    assert record_file.slots == 8
+    record_file.write((float(i), i) for i in range(5, 20))
+    assert record_file.slots == 32
+    record_file.close()
+
+    reader = RecordFile(path, RECORD)
+    assert reader.label == "a:1"
+    assert len(reader) == 20
+    assert reader.read() == [(float(i), i) for i in range(20)]
+    reader.close()
+
+
+def test_ring_wraps_at_capacity(tmp_path, small_slots):
+    path = str(tmp_path / "sensor.rec")
+    record_file = RecordFile(path, RECORD, capacity=10, writable=True)
+    record_file.write((float(i), i) for i in range(25))
+    assert record_file.slots == 10
+    record_file.close()
+
+    reader = RecordFile(path, RECORD)
+    assert len(reader) == 10
+    assert reader.read() == [(float(i), i) for i in range(15, 25)]
+    assert reader.slice(17.0, 20.0) == [(17.0, 17), (18.0, 18), (19.0, 19)]
+    assert reader.bisect(100.0) == 10
+    reader.close()
+
+
+def test_reader_stays_inside_the_mapped_slots(tmp_path, small_slots):
+    # What an exporter sees when the recording grew after the file was mapped
+    path = str(tmp_path / "sensor.rec")
+    record_file = RecordFile(path, RECORD, capacity=64, writable=True)
+    record_file.write((float(i), i) for i in range(10))
+    record_file.close()
+    with open(path, "r+b") as data:
+        data.truncate(size_of(4))
+
+    reader = RecordFile(path, RECORD)
+    assert len(reader) == 4
+    assert reader.read() == [(float(i), i) for i in range(4)]
+    reader.close()
+
+
+def test_old_version_is_rejected(tmp_path):
+    path = str(tmp_path / "sensor.rec")
+    RecordFile(path, RECORD, capacity=8, writable=True).close()
+    with open(path, "r+b") as data:
+        data.seek(4)
+        data.write(struct.pack('<H', 1))
+    with pytest.raises(ValueError, match="version"):
+        RecordFile(path, RECORD)
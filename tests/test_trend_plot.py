@@ -0,0 +1,48 @@
+from GUI.trend_plot import MinMaxHistory
+
+
+def envelope(entries):
+    return min(low for _, low, _ in entries), max(high for _, _, high in entries)
+
+
+def test_view_returns_raw_samples_when_they_fit():
+    history = MinMaxHistory(capacity=64, factor=4, levels=3)
+    for i in range(20):
+        history.append(float(i), float(i))
+    assert history.view(5.0, 10.0, max_entries=100) == [(float(i), float(i), float(i)) for i in range(5, 10)]
+
+
+def test_view_keeps_spike_when_decimated():
+    history = MinMaxHistory(capacity=64, factor=4, levels=4)
+    for i in range(1000):
+        history.append(float(i), 1000.0 if i == 613 else 0.0)
+    entries = history.view(0.0, 1000.0, max_entries=100)
+    assert len(entries) <= 100 + 4 * 3
+    assert envelope(entries) == (0.0, 1000.0)
+
+
+def test_view_includes_bin_overlapping_window_start():
+    history = MinMaxHistory(capacity=1024, factor=8, levels=3)
+    for i in range(512):
+        history.append(float(i), -5.0 if i == 100 else 0.0)
+    # The level-1 bin starting at 96 holds sample 100 although it starts before the window
+    entries = history.view(98.0, 500.0, max_entries=60)
+    assert envelope(entries)[0] == -5.0
+
+
+def test_view_includes_samples_newer_than_the_last_closed_bin():
+    history = MinMaxHistory(capacity=64, factor=4, levels=3)
+    for i in range(203):
+        history.append(float(i), 7.0 if i == 202 else 0.0)
+    entries = history.view(0.0, 300.0, max_entries=20)
+    assert entries[-1][0] == 202.0
+    assert envelope(entries)[1] == 7.0
+
+
+def test_old_samples_fall_back_to_coarse_levels():
+    history = MinMaxHistory(capacity=16, factor=4, levels=3)
+    for i in range(200):
+        history.append(float(i), float(i))
+    assert history.oldest() < 200 - 16
+    entries = history.view(history.oldest(), 200.0, max_entries=1000)
+    assert envelope(entries) == (history.oldest(), 199.0)
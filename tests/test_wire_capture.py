@@ -0,0 +1,60 @@
+import struct
+
+from connection.wire_capture import RECEIVED, RESET, SENT, CaptureReader, CapturedFrame, ReplayDecoder, WireCapture
+from message_formatter.message_formatter import MessageFormatter
+
+
+def load_cell_response(value):
+    return struct.pack('<BBfB', MessageFormatter.REQUEST_HEAD, MessageFormatter.LOAD_CELL_COMMAND, value,
+                       MessageFormatter.END_BYTE)
+
+
+def sent(cell):
+    return CapturedFrame(0.0, SENT, MessageFormatter.get_loadcell_value_message(cell))
+
+
+def received(value):
+    return CapturedFrame(0.0, RECEIVED, load_cell_response(value))
+
+
+def test_pipelined_responses_attributed_in_request_order():
+    decoder = ReplayDecoder()
+    for cell in (3, 7, 11):
+        assert decoder.feed(sent(cell)) is None
+    cells = [decoder.feed(received(float(value)))[1] for value in range(3)]
+    assert cells == [3, 7, 11]
+
+
+def test_sensor_response_does_not_consume_pending_cell():
+    decoder = ReplayDecoder()
+    decoder.feed(sent(5))
+    decoder.feed(CapturedFrame(0.0, SENT, MessageFormatter.sensor_message()))
+    sensor = bytes((MessageFormatter.REQUEST_HEAD, MessageFormatter.SENSOR_COMMAND, 0, 0, MessageFormatter.END_BYTE))
+    assert decoder.feed(CapturedFrame(0.0, RECEIVED, sensor))[:2] == (MessageFormatter.SENSOR_COMMAND, None)
+    assert decoder.feed(received(1.0))[1] == 5
+
+
+def test_reset_drops_requests_that_timed_out():
+    decoder = ReplayDecoder()
+    decoder.feed(sent(1))
+    decoder.feed(sent(2))
+    assert decoder.feed(CapturedFrame(0.0, RESET, b'')) is None
+    decoder.feed(sent(9))
+    assert decoder.feed(received(1.0))[1] == 9
+
+
+def test_reset_marker_survives_the_capture_file(tmp_path):
+    path = tmp_path / "board.cap"
+    capture = WireCapture(str(path), label="127.0.0.1:5000")
+    capture.record_sent([MessageFormatter.get_loadcell_value_message(cell) for cell in (1, 2)])
+    capture.record_received(load_cell_response(1.0))
+    capture.record_reset()
+    capture.record_sent([MessageFormatter.get_loadcell_value_message(4)])
+    capture.record_received(load_cell_response(4.0))
+    capture.close()
+
+    reader = CaptureReader(str(path))
+    assert reader.label == "127.0.0.1:5000"
+    decoder = ReplayDecoder()
+    cells = [decoded[1] for decoded in map(decoder.feed, reader) if decoded is not None]
+    assert cells == [1, 4]